@@ -3,20 +3,28 @@ import time
 import torch
 from torchtext.experimental.datasets.raw import AG_NEWS
 from torchtext.experimental.transforms import basic_english_normalize
-from torchtext.data.utils import get_tokenizer
+from torchtext.data.utils import get_tokenizer, _python_basic_english_normalize
 
 
 def benchmark_basic_english_normalize():
-    def _run_benchmark_lookup(train, tokenizer):
+    def _run_benchmark_lookup(train, tokenizer, batched=False):
         t0 = time.monotonic()
         for (_, text) in train:
-            tokenizer(text)
+            if batched:
+                tokenizer([text])
+            else:
+                tokenizer(text)
         print("Tokenization time:", time.monotonic() - t0)
 
     existing_basic_english_tokenizer = get_tokenizer("basic_english")
     experimental_basic_english_normalize = basic_english_normalize()
     experimental_jit_basic_english_normalize = torch.jit.script(experimental_basic_english_normalize.to_ivalue())
 
+    # pure python lookup
+    train, _ = AG_NEWS()
+    print("BasicEnglishNormalize - Python")
+    _run_benchmark_lookup(train, _python_basic_english_normalize)
+
     # existing eager lookup
     train, _ = AG_NEWS()
     print("BasicEnglishNormalize - Eager Mode")
@@ -25,12 +33,12 @@ def benchmark_basic_english_normalize():
     # experimental eager lookup
     train, _ = AG_NEWS()
     print("BasicEnglishNormalize Experimental - Eager Mode")
-    _run_benchmark_lookup(train, experimental_basic_english_normalize)
+    _run_benchmark_lookup(train, experimental_basic_english_normalize, batched=True)
 
     # experimental jit lookup
     train, _ = AG_NEWS()
     print("BasicEnglishNormalize Experimental - Jit Mode")
-    _run_benchmark_lookup(train, experimental_jit_basic_english_normalize)
+    _run_benchmark_lookup(train, experimental_jit_basic_english_normalize, batched=True)
 
 
 if __name__ == "__main__":
@@ -54,6 +54,10 @@ def _get_include_dirs():
     return [
         str(_CSRC_DIR),
         str(_TP_INSTALL_DIR / 'include'),
+        # SentencePiece does not install the headers of its protobuf messages (e.g. SentencePieceText),
+        # they are compiled into the static library from its builtin copies.
+        str(_TP_BASE_DIR / 'sentencepiece' / 'src' / 'builtin_pb'),
+        str(_TP_BASE_DIR / 'sentencepiece' / 'third_party' / 'protobuf-lite'),
     ]
 
 
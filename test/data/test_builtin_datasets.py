@@ -103,6 +103,64 @@ class TestDataset(TorchtextTestCase):
         self.assertEqual(ag_news_test[-1][1][:10],
                          torch.tensor([2351, 758, 96, 38581, 2351, 220, 5, 396, 3, 14786]).long())
 
+    def test_text_classification_cache(self):
+        # the processed ag_news dataset is reloaded from the dataset cache
+        from torchtext.utils import clear_dataset_cache
+
+        datadir = os.path.join(self.project_root, ".data")
+        if not os.path.exists(datadir):
+            os.makedirs(datadir)
+        clear_dataset_cache(datadir)
+        ag_news_train, ag_news_test = AG_NEWS(root=datadir, ngrams=2)
+        cached_train, cached_test = AG_NEWS(root=datadir, ngrams=2)
+        self.assertEqual(cached_train.get_vocab().itos, ag_news_train.get_vocab().itos)
+        self.assertEqual(cached_train.get_labels(), ag_news_train.get_labels())
+        self.assertEqual(len(cached_test), len(ag_news_test))
+        self.assertEqual(cached_test[-1][0], ag_news_test[-1][0])
+        self.assertEqual(cached_test[-1][1], ag_news_test[-1][1])
+        clear_dataset_cache(datadir)
+
+    def test_text_classification_streaming(self):
+        from torchtext.experimental.datasets import AG_NEWS as ExperimentalAG_NEWS
+        # smoke test to ensure the streaming ag_news dataset matches the in-memory one
+
+        datadir = os.path.join(self.project_root, ".data")
+        if not os.path.exists(datadir):
+            os.makedirs(datadir)
+        train_dataset, test_dataset = ExperimentalAG_NEWS(root=datadir)
+        stream_train_dataset, stream_test_dataset = ExperimentalAG_NEWS(root=datadir, streaming=True)
+        self.assertEqual(stream_train_dataset.get_vocab().itos, train_dataset.get_vocab().itos)
+        self.assertEqual(set(label.item() for label in stream_test_dataset.get_labels()),
+                         set(label.item() for label in test_dataset.get_labels()))
+        # the labels are collected when the datasets are set up, get_labels does not read them again
+        self.assertEqual(stream_train_dataset.labels, {1, 2, 3, 4})
+        num_items = 0
+        for i, (label, text) in enumerate(stream_test_dataset):
+            self.assertEqual(label, test_dataset[i][0])
+            self.assertEqual(text, test_dataset[i][1])
+            num_items += 1
+        self.assertEqual(num_items, len(test_dataset))
+
+    def test_text_classification_experimental_cache(self):
+        from torchtext.experimental.datasets import AG_NEWS as ExperimentalAG_NEWS
+        from torchtext.utils import clear_dataset_cache
+        # the processed experimental ag_news dataset matches the one processed without the cache
+
+        datadir = os.path.join(self.project_root, ".data")
+        if not os.path.exists(datadir):
+            os.makedirs(datadir)
+        clear_dataset_cache(datadir)
+        train_dataset, test_dataset = ExperimentalAG_NEWS(root=datadir, use_cache=False)
+        ExperimentalAG_NEWS(root=datadir)
+        cached_train, cached_test = ExperimentalAG_NEWS(root=datadir)
+        self.assertEqual(cached_train.get_vocab().itos, train_dataset.get_vocab().itos)
+        self.assertEqual(set(label.item() for label in cached_test.get_labels()),
+                         set(label.item() for label in test_dataset.get_labels()))
+        self.assertEqual(len(cached_test), len(test_dataset))
+        self.assertEqual(cached_test[-1][0], test_dataset[-1][0])
+        self.assertEqual(cached_test[-1][1], test_dataset[-1][1])
+        clear_dataset_cache(datadir)
+
     def test_imdb(self):
         from torchtext.experimental.datasets import IMDB
         from torchtext.vocab import Vocab
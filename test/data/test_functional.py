@@ -1,15 +1,18 @@
 import os
+import re
 import platform
 import shutil
 import tempfile
 import uuid
 import unittest
+from typing import List
 
 import sentencepiece as spm
 import torch
 import torchtext.data as data
 from torchtext.data.functional import (
     generate_sp_model,
+    train_sp_model,
     load_sp_model,
     sentencepiece_numericalizer,
     sentencepiece_tokenizer,
@@ -45,13 +48,73 @@ class TestFunctional(TorchtextTestCase):
 
             model_prefix = os.path.join(dir_name, f'spm_user_{uuid.uuid4()}')
             model_file = f'{model_prefix}.model'
-            generate_sp_model(data_path, vocab_size=23456, model_prefix=model_prefix)
+            generate_sp_model(data_path, vocab_size=23456, model_prefix=model_prefix,
+                              num_threads=2, shuffle_input_sentence=False)
 
             sp_user = spm.SentencePieceProcessor()
             sp_user.Load(model_file)
 
             self.assertEqual(len(sp_user), 23456)
 
+    def test_train_sp_model(self):
+        asset_path = get_asset_path('text_normalization_ag_news_test.csv')
+        with open(asset_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        model = train_sp_model(iter(lines), vocab_size=23456, num_threads=2,
+                               input_sentence_size=len(lines), shuffle_input_sentence=True)
+        self.assertIsInstance(model, bytes)
+
+        model_path = os.path.join(self.test_dir, 'spm_from_iterator.model')
+        with open(model_path, 'wb') as f:
+            f.write(model)
+        sp_model = load_sp_model(model_path)
+        self.assertEqual(sp_model.GetPieceSize(), 23456)
+
+        def failing_iterator():
+            yield lines[0]
+            raise ValueError('broken iterator')
+
+        with self.assertRaises(RuntimeError):
+            train_sp_model(failing_iterator(), vocab_size=100)
+
+    def test_load_sp_model(self):
+        test_sample = 'SentencePiece is an unsupervised text tokenizer and detokenizer'
+        model_path = get_asset_path('spm_example.model')
+        sp_model = load_sp_model(model_path)
+        shared_sp_model = load_sp_model(model_path)
+        self.assertEqual(shared_sp_model.EncodeAsIds(test_sample), sp_model.EncodeAsIds(test_sample))
+
+        # a model trained into a new file is loaded instead of the shared one
+        with open(get_asset_path('text_normalization_ag_news_test.csv'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        new_model_path = os.path.join(self.test_dir, 'spm_load.model')
+        shutil.copy(model_path, new_model_path)
+        self.assertEqual(load_sp_model(new_model_path).GetPieceSize(), 20000)
+        with open(new_model_path, 'wb') as f:
+            f.write(train_sp_model(iter(lines), vocab_size=1000))
+        self.assertEqual(load_sp_model(new_model_path).GetPieceSize(), 1000)
+
+        # a model rewritten in place with the same size and modification time is loaded again
+        shutil.copy(model_path, new_model_path)
+        old_sp_model = load_sp_model(new_model_path)
+        piece_id = old_sp_model.PieceToId(u'\u2581the')
+        with open(new_model_path, 'rb') as f:
+            content = f.read()
+        piece = u'\u2581the'.encode('utf-8')
+        new_piece = u'\u2581QQQ'.encode('utf-8')
+        content = content.replace(b'\n' + bytes([len(piece)]) + piece, b'\n' + bytes([len(new_piece)]) + new_piece)
+        stat = os.stat(new_model_path)
+        with open(new_model_path, 'wb') as f:
+            f.write(content)
+        os.utime(new_model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(os.stat(new_model_path).st_size, stat.st_size)
+        self.assertEqual(load_sp_model(new_model_path).IdToPiece(piece_id), u'\u2581QQQ')
+        self.assertEqual(old_sp_model.IdToPiece(piece_id), u'\u2581the')
+
+        with self.assertRaises(RuntimeError):
+            load_sp_model(os.path.join(self.test_dir, 'missing.model'))
+
     def test_sentencepiece_numericalizer(self):
         test_sample = 'SentencePiece is an unsupervised text tokenizer and detokenizer'
         model_path = get_asset_path('spm_example.model')
@@ -151,6 +214,129 @@ class TestFunctional(TorchtextTestCase):
         loaded_eager_tokens = loaded_r_tokenizer(test_sample)
         self.assertEqual(loaded_eager_tokens, ref_results)
 
+    # TODO(Nayef211): remove decorator once https://github.com/pytorch/pytorch/issues/38207 is closed
+    @unittest.skipIf(platform.system() == "Windows", "Test is known to fail on Windows.")
+    def test_RegexTokenizer_fused_patterns(self):
+        # patterns are fused into a single scan when possible, the output must match
+        # applying each replacement one after the other
+        test_sample = ['<br \"/>a.b<br />c\t\t\'d\'', '"<br / >" x.y,z  ;:w', 'a\t<br />\tb', '']
+        patterns_lists = [
+            [(r'\'', ' \'  '), (r'\"', ''), (r'\.', ' . '), (r'<br \/>', ' '), (r',', ' , '),
+             (r'\;', ' '), (r'\:', ' '), (r'\s+', ' ')],
+            [(r'\.', ' . '), (r'\s+', ' '), (r'  ', 'X'), (r'a\.b', 'Y')],
+            [(r'b', 'bb'), (r'bb', 'c'), (r'\s', '_'), (r'[xyz]', '-')],
+        ]
+
+        for patterns_list in patterns_lists:
+            ref_results = []
+            for line in test_sample:
+                for pattern, replacement in patterns_list:
+                    line = re.sub(pattern, replacement, line)
+                ref_results.append([token for token in line.split(' ') if token])
+
+            r_tokenizer = regex_tokenizer(patterns_list)
+            self.assertEqual(r_tokenizer(test_sample), ref_results)
+            self.assertEqual(torch.jit.script(r_tokenizer.to_ivalue())(test_sample), ref_results)
+
+    # TODO(Nayef211): remove decorator once https://github.com/pytorch/pytorch/issues/38207 is closed
+    @unittest.skipIf(platform.system() == "Windows", "Test is known to fail on Windows.")
+    def test_BasicEnglishNormalize_batch(self):
+        asset_path = get_asset_path('text_normalization_ag_news_test.csv')
+        with open(asset_path, 'r') as f:
+            test_sample = [line for line in f]
+
+        basic_eng_norm = basic_english_normalize()
+        ref_results = [basic_eng_norm.regex_tokenizer.forward(line) for line in test_sample]
+
+        self.assertEqual(basic_eng_norm(test_sample), ref_results)
+        self.assertEqual(torch.jit.script(basic_eng_norm.to_ivalue())(test_sample), ref_results)
+
+    # TODO(Nayef211): remove decorator once https://github.com/pytorch/pytorch/issues/38207 is closed
+    @unittest.skipIf(platform.system() == "Windows", "Test is known to fail on Windows.")
+    def test_BasicEnglishNormalize_offsets(self):
+        test_sample = ['Don\'t <br />stop, Café!', '']
+        ref_results = [(['don', "'", 't', 'stop', ',', 'café', '!'],
+                        [0, 3, 4, 12, 16, 18, 22],
+                        [3, 4, 5, 16, 17, 22, 23]),
+                       ([], [], [])]
+
+        basic_eng_norm = basic_english_normalize()
+        self.assertEqual(basic_eng_norm.forward_with_offsets(test_sample), ref_results)
+        jit_basic_eng_norm = torch.jit.script(basic_eng_norm.to_ivalue())
+        self.assertEqual(jit_basic_eng_norm.forward_with_offsets(test_sample), ref_results)
+
+    def test_sentencepiece_encode_batch(self):
+        test_sample = ['SentencePiece is an unsupervised text tokenizer and detokenizer',
+                       '', 'examples to   try!']
+        model_path = get_asset_path('spm_example.model')
+        sp_model = load_sp_model(model_path)
+        ref_ids = [sp_model.EncodeAsIds(line) for line in test_sample]
+        ref_lengths = [len(ids) for ids in ref_ids]
+
+        padded_ids, lengths = sp_model.EncodeBatch(test_sample, 'padded')
+        self.assertEqual(lengths, torch.tensor(ref_lengths))
+        self.assertEqual(padded_ids.size(), (len(test_sample), max(ref_lengths)))
+        for ids, length, ref in zip(padded_ids, lengths, ref_ids):
+            self.assertEqual(ids[:length].tolist(), ref)
+
+        flat_ids, offsets = sp_model.EncodeBatch(test_sample, 'flat')
+        self.assertEqual(flat_ids, torch.tensor(sum(ref_ids, [])))
+        self.assertEqual(offsets, torch.tensor([0, ref_lengths[0], ref_lengths[0] + ref_lengths[1]]))
+
+        with self.assertRaises(RuntimeError):
+            sp_model.EncodeBatch(test_sample, 'unknown')
+
+    def test_sentencepiece_sample_encode_batch(self):
+        test_sample = ['SentencePiece is an unsupervised text tokenizer and detokenizer',
+                       '', 'examples to try!'] * 20
+        model_path = get_asset_path('spm_example.model')
+        sp_model = load_sp_model(model_path)
+
+        nbests = [sp_model.NBestEncodeAsIds(line, 5) for line in test_sample]
+        for line, line_nbests in zip(test_sample, nbests):
+            self.assertEqual(line_nbests[0], sp_model.EncodeAsIds(line))
+
+        self.assertEqual(sp_model.SampleEncodeBatch(test_sample, 1, 0.1, 0),
+                         [sp_model.EncodeAsIds(line) for line in test_sample])
+
+        samples = sp_model.SampleEncodeBatch(test_sample, 5, 0.1, 1234)
+        self.assertEqual(samples, sp_model.SampleEncodeBatch(test_sample, 5, 0.1, 1234))
+        for sample, line_nbests in zip(samples, nbests):
+            self.assertIn(sample, line_nbests)
+        # with a small alpha, segmentations other than the best one get sampled
+        self.assertNotEqual(samples, [line_nbests[0] for line_nbests in nbests])
+
+        with self.assertRaises(RuntimeError):
+            sp_model.SampleEncodeBatch(test_sample, -1, 0.1, 0)
+
+    def test_sentencepiece_decode_batch(self):
+        test_sample = ['SentencePiece is an unsupervised text tokenizer and detokenizer',
+                       '', 'examples to try!']
+        model_path = get_asset_path('spm_example.model')
+        sp_model = load_sp_model(model_path)
+
+        ids, lengths = sp_model.EncodeBatch(test_sample, 'padded')
+        self.assertEqual(sp_model.DecodeBatch(ids, lengths), test_sample)
+        for line, line_ids, length in zip(test_sample, ids, lengths):
+            self.assertEqual(sp_model.DecodeIds(line_ids[:length].tolist()), line)
+
+        pieces = [sp_model.EncodeAsPieces(line) for line in test_sample]
+        self.assertEqual(sp_model.DecodePiecesBatch(pieces), test_sample)
+        self.assertEqual(sp_model.DecodePieces(pieces[0]), test_sample[0])
+
+        with self.assertRaises(RuntimeError):
+            sp_model.DecodeBatch(ids, lengths + ids.size(1))
+
+    def test_sentencepiece_offsets(self):
+        test_sample = 'SentencePiece is an unsupervised text tokenizer and detokenizer'
+        model_path = get_asset_path('spm_example.model')
+        sp_model = load_sp_model(model_path)
+
+        pieces, start_offsets, end_offsets = sp_model.EncodeWithOffsets(test_sample)
+        self.assertEqual(pieces, sp_model.EncodeAsPieces(test_sample))
+        for piece, start, end in zip(pieces, start_offsets, end_offsets):
+            self.assertEqual(test_sample[start:end].strip(), piece.lstrip('▁'))
+
     def test_custom_replace(self):
         custom_replace_transform = custom_replace([(r'S', 's'), (r'\s+', ' ')])
         test_sample = ['test     cuStom   replace', 'with   uSer   instruction']
@@ -182,6 +368,18 @@ class ScriptableSP(torch.jit.ScriptModule):
     def encode_as_pieces(self, input: str):
         return self.spm.EncodeAsPieces(input)
 
+    @torch.jit.script_method
+    def encode_batch(self, input: List[str], out_type: str):
+        return self.spm.EncodeBatch(input, out_type)
+
+    @torch.jit.script_method
+    def sample_encode_batch(self, input: List[str], nbest_size: int, alpha: float, seed: int):
+        return self.spm.SampleEncodeBatch(input, nbest_size, alpha, seed)
+
+    @torch.jit.script_method
+    def decode_batch(self, ids: torch.Tensor, lengths: torch.Tensor):
+        return self.spm.DecodeBatch(ids, lengths)
+
 
 class TestScriptableSP(unittest.TestCase):
     def setUp(self):
@@ -220,3 +418,26 @@ class TestScriptableSP(unittest.TestCase):
         ]
         output = self.model.encode_as_pieces(input)
         self.assertEqual(expected, output)
+
+    def test_encode_batch(self):
+        input = ['SentencePiece is an unsupervised text tokenizer and detokenizer', 'detokenizer']
+        expected_ids = torch.tensor([
+            [15340, 4286, 981, 1207, 1681, 17, 84, 684, 8896, 5366,
+             144, 3689, 9, 5602, 12114, 6, 560, 649, 5602, 12114],
+            [560, 649, 5602, 12114, 0, 0, 0, 0, 0, 0,
+             0, 0, 0, 0, 0, 0, 0, 0, 0, 0]])
+        ids, lengths = self.model.encode_batch(input, 'padded')
+        self.assertEqual(ids, expected_ids)
+        self.assertEqual(lengths, torch.tensor([20, 4]))
+
+    def test_sample_encode_batch(self):
+        input = ['SentencePiece is an unsupervised text tokenizer and detokenizer'] * 4
+        expected = self.model.sample_encode_batch(input, 5, 0.1, 42)
+        self.assertEqual(expected, self.model.sample_encode_batch(input, 5, 0.1, 42))
+        self.assertEqual(len(expected), 4)
+
+    def test_decode_batch(self):
+        expected = ['SentencePiece is an unsupervised text tokenizer and detokenizer', 'detokenizer']
+        ids, lengths = self.model.encode_batch(expected, 'padded')
+        output = self.model.decode_batch(ids, lengths)
+        self.assertEqual(expected, output)
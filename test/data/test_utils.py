@@ -1,6 +1,9 @@
 import io
+import pickle
 
+import torch
 import torchtext.data as data
+from torchtext.data.utils import _basic_english_normalize, _python_basic_english_normalize
 from torchtext.utils import unicode_csv_reader
 from torchtext.experimental.functional import ngrams_func
 from ..common.torchtext_test_case import TorchtextTestCase
@@ -51,6 +54,26 @@ class TestUtils(TorchtextTestCase):
 
         self.assertEqual(ref_lines, test_lines)
 
+    def test_basic_english_normalize_native(self):
+        # The native basic_english tokenizer must match the pure Python implementation
+        test_lines = [
+            '',
+            '   ',
+            'A string, particularly one with slightly complex punctuation.',
+            '\'".<br />,()!?;:   Basic English Normalization for a Line of Text   \'".<br />,()!?;:',
+            '<br \"/>"<br / >"\t\tTabs\nand\rnew\x0clines',
+            'Vertical\x0btab and\x1cseparators\x1f',
+            'Ünïcödé ÀÉÎ ΣΑΣ İstanbul',
+            'No\xa0break\u2009thin\u3000ideographic\u2028line\u0085next',
+            'Zero\u200bwidth\ufeffspace',
+        ]
+        data_path = get_asset_path('text_normalization_ag_news_test.csv')
+        with io.open(data_path, encoding="utf8") as f:
+            test_lines.extend(f)
+
+        for line in test_lines:
+            self.assertEqual(_basic_english_normalize(line), _python_basic_english_normalize(line))
+
     def test_ngrams_func(self):
         func = ngrams_func(1)
         assert func(['A', 'string', 'particularly', 'one', 'with', 'slightly']) == \
@@ -64,3 +87,28 @@ class TestUtils(TorchtextTestCase):
             ['A', 'string', 'particularly', 'one', 'with', 'slightly', 'A string', 'string particularly',
              'particularly one', 'one with', 'with slightly', 'A string particularly',
              'string particularly one', 'particularly one with', 'one with slightly']
+
+    def test_token_id_store(self):
+        sequences = [(1, [4, 2, 3]), (0, []), (3, [70000]), (1, [5, 1])]
+        store = data.TokenIdStore.from_iterator(iter(sequences), num_ids=70001, with_labels=True)
+        self.assertEqual(store.ids.dtype, torch.int32)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.lengths(), torch.tensor([3, 0, 1, 2]))
+        for (ref_label, ref_ids), (label, ids) in zip(sequences, store):
+            self.assertEqual(label, ref_label)
+            self.assertEqual(ids.tolist(), ref_ids)
+        # sequences are views of the flat id tensor
+        self.assertEqual(store[-1][1].storage().data_ptr(), store.ids.storage().data_ptr())
+        with self.assertRaises(IndexError):
+            store[4]
+
+        store = data.TokenIdStore.from_iterator([[4, 2], [7]], num_ids=8, dtype=torch.long)
+        self.assertEqual(store.ids.dtype, torch.int16)
+        self.assertIsNone(store.labels)
+        self.assertEqual(store[0], torch.tensor([4, 2]).long())
+        self.assertEqual(store[0].dtype, torch.long)
+
+        loaded_store = pickle.loads(pickle.dumps(store))
+        self.assertEqual(loaded_store.ids, store.ids)
+        self.assertEqual(loaded_store.offsets, store.offsets)
+        self.assertEqual(loaded_store[1], store[1])
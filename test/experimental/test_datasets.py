@@ -0,0 +1,74 @@
+import torch
+from test.common.torchtext_test_case import TorchtextTestCase
+from torchtext.data.utils import get_tokenizer
+from torchtext.experimental.datasets import LanguageModelingDataset
+from torchtext.experimental.datasets.question_answer import (_basic_english_offsets, _context_offsets_func,
+                                                             QuestionAnswerDataset)
+from torchtext.experimental.functional import sequential_transforms, totensor, vocab_func
+from torchtext.vocab import build_vocab_from_iterator
+
+
+class TestDatasets(TorchtextTestCase):
+    def test_bptt_batches(self):
+        data = torch.arange(103)
+        dataset = LanguageModelingDataset(data, None, None, single_line=True)
+
+        batches = list(dataset.bptt_batches(4, 7, variable_len=False))
+        streams = data[:100].view(4, 25).t()
+        self.assertEqual(len(batches), 4)
+        self.assertEqual(torch.cat([text for text, _ in batches]), streams[:24])
+        self.assertEqual(torch.cat([target for _, target in batches]), streams[1:])
+        for text, target in batches:
+            self.assertEqual(text.size(1), 4)
+            self.assertEqual(text.storage().data_ptr(), data.storage().data_ptr())
+        self.assertEqual([text.size(0) for text, _ in batches], [7, 7, 7, 3])
+
+        batches = list(dataset.bptt_batches(4, 7, variable_len=False, batch_first=True))
+        self.assertEqual(batches[0][0], data[:100].view(4, 25)[:, :7])
+        self.assertEqual(batches[0][1], data[:100].view(4, 25)[:, 1:8])
+
+        # the offset and the lengths are reproducible with a generator
+        generator = torch.Generator()
+        generator.manual_seed(0)
+        batches = list(dataset.bptt_batches(2, 10, random_offset=True, generator=generator))
+        generator.manual_seed(0)
+        ref_batches = list(dataset.bptt_batches(2, 10, random_offset=True, generator=generator))
+        self.assertEqual(len(batches), len(ref_batches))
+        for (text, target), (ref_text, ref_target) in zip(batches, ref_batches):
+            self.assertEqual(text, ref_text)
+            self.assertEqual(target, ref_target)
+            self.assertEqual(text[1:], target[:-1])
+        offset = batches[0][0][0, 0].item()
+        self.assertLess(offset, 10)
+        self.assertEqual(sum(text.size(0) for text, _ in batches), (103 - offset) // 2 - 1)
+
+        with self.assertRaises(TypeError):
+            LanguageModelingDataset(['some text'], None, None, single_line=False).bptt_batches(2, 10)
+        for batch_size, bptt_len in [(0, 10), (2, 0), (-1, 10)]:
+            with self.assertRaises(ValueError):
+                dataset.bptt_batches(batch_size, bptt_len, variable_len=False)
+
+    def test_question_answer_offsets(self):
+        tokenizer = get_tokenizer('basic_english')
+        contexts = ['The Normans (Norman: Nourmands) gave their name to Normandy.',
+                    '\xc9MILE and \xd6ZIL met in \xc9vian, the city of \xc9MILE.',
+                    'Vertical\x0btab and "quotes" in the text.']
+        answers = ['Normandy', '\xc9MILE', 'the text']
+        # the native offsets are only used when they give the tokens of get_tokenizer('basic_english')
+        self.assertEqual(_basic_english_offsets(contexts[0])[0], tokenizer(contexts[0]))
+        self.assertIsNone(_basic_english_offsets(contexts[1]))
+        self.assertIsNone(_basic_english_offsets(contexts[2]))
+
+        data = [{'context': context, 'question': 'where?', 'answers': [answer],
+                 'answer_start': [context.rindex(answer)]} for context, answer in zip(contexts, answers)]
+        vocab = build_vocab_from_iterator(tokenizer(context) for context in contexts)
+        text_transform = sequential_transforms(tokenizer, vocab_func(vocab), totensor(dtype=torch.long))
+        transforms = {'context': text_transform, 'question': text_transform,
+                      'answers': text_transform, 'ans_pos': totensor(dtype=torch.long)}
+        dataset = QuestionAnswerDataset(data, vocab, transforms)
+        offsets_dataset = QuestionAnswerDataset(data, vocab, dict(transforms, context_offsets=_context_offsets_func(
+            text_transform, vocab)))
+        for i in range(len(data)):
+            item, offsets_item = dataset[i], offsets_dataset[i]
+            self.assertEqual(offsets_item['context'], item['context'])
+            self.assertEqual(offsets_item['ans_pos'], item['ans_pos'])
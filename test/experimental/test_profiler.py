@@ -0,0 +1,69 @@
+import torch
+from test.common.torchtext_test_case import TorchtextTestCase
+from test.common.assets import get_asset_path
+from torchtext.experimental.functional import sequential_transforms
+from torchtext.experimental.profiler import StageProfiler
+from torchtext.experimental.transforms import (
+    basic_english_normalize,
+    TextSequentialTransforms,
+    VocabTransform,
+)
+from torchtext.experimental.vocab import vocab_from_file
+
+
+class TestProfiler(TorchtextTestCase):
+    def test_profile_text_sequential_transforms(self):
+        test_sample = ['Of that NEW.', 'of, that new that']
+        with open(get_asset_path('vocab_test2.txt'), 'r') as f:
+            vocab = vocab_from_file(f)
+        pipeline = TextSequentialTransforms(basic_english_normalize(), VocabTransform(vocab))
+        ref_results = pipeline(test_sample)
+
+        profiler = StageProfiler()
+        profiled_pipeline = pipeline.profile(profiler)
+        with torch.autograd.profiler.profile() as prof:
+            self.assertEqual(profiled_pipeline(test_sample), ref_results)
+            self.assertEqual(profiled_pipeline(test_sample), ref_results)
+        event_names = set(event.name for event in prof.function_events)
+        self.assertIn('0:BasicEnglishNormalize', event_names)
+        self.assertIn('1:VocabTransform', event_names)
+
+        stats = profiler.stats()
+        self.assertEqual(list(stats.keys()), ['0:BasicEnglishNormalize', '1:VocabTransform'])
+        tokenizer_stats, vocab_stats = stats.values()
+        self.assertEqual(tokenizer_stats.calls, 2)
+        self.assertEqual((tokenizer_stats.input_lines, tokenizer_stats.input_tokens, tokenizer_stats.input_bytes),
+                         (4, 0, 58))
+        self.assertEqual((tokenizer_stats.output_lines, tokenizer_stats.output_tokens), (4, 18))
+        self.assertEqual((vocab_stats.input_lines, vocab_stats.input_tokens), (4, 18))
+        self.assertEqual((vocab_stats.output_lines, vocab_stats.output_tokens, vocab_stats.output_bytes), (4, 18, 0))
+        self.assertGreater(tokenizer_stats.time, 0)
+        self.assertIn('1:VocabTransform', profiler.summary())
+
+        # scripted pipelines are not instrumented
+        jit_pipeline = torch.jit.script(profiled_pipeline.to_ivalue())
+        self.assertEqual(jit_pipeline(test_sample), ref_results)
+        self.assertEqual(profiler.stats()['0:BasicEnglishNormalize'].calls, 2)
+
+        profiler.reset()
+        self.assertEqual(len(profiler.stats()), 0)
+
+    def test_profile_sequential_transforms(self):
+        def tokenize(line):
+            return line.split()
+
+        def numericalize(tokens):
+            return [len(token) for token in tokens]
+
+        profiler = StageProfiler()
+        pipeline = sequential_transforms(tokenize, numericalize, torch.tensor, profiler=profiler)
+        self.assertEqual(pipeline('here is an example'), torch.tensor([4, 2, 2, 7]))
+
+        tokenize_stats = profiler.stats()['0:TestProfiler.test_profile_sequential_transforms.<locals>.tokenize']
+        self.assertEqual((tokenize_stats.input_lines, tokenize_stats.input_tokens, tokenize_stats.input_bytes),
+                         (1, 0, 18))
+        self.assertEqual((tokenize_stats.output_lines, tokenize_stats.output_tokens, tokenize_stats.output_bytes),
+                         (1, 4, 15))
+        tensor_stats = list(profiler.stats().values())[2]
+        self.assertEqual((tensor_stats.output_lines, tensor_stats.output_tokens, tensor_stats.output_bytes),
+                         (1, 4, 32))
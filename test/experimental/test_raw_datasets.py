@@ -0,0 +1,166 @@
+import io
+import os
+import torch
+from functools import partial
+from unittest.mock import Mock, patch
+from test.common.torchtext_test_case import TorchtextTestCase
+from torchtext.data.utils import get_tokenizer
+from torchtext.experimental.datasets import AG_NEWS
+from torchtext.experimental.datasets.raw import text_classification as raw_text_classification
+from torchtext.experimental.datasets.raw.common import (
+    _iterate_shard,
+    _iterator_from,
+    _iterator_from_start,
+    _read_lines,
+    _record_offsets,
+    _shard_records,
+)
+from torchtext.experimental.datasets.raw.language_modeling import RawTextIterableDataset as RawLMDataset
+from torchtext.experimental.datasets.raw.text_classification import (
+    _create_data_from_csv,
+    RawTextIterableDataset,
+)
+
+
+class TestRawDatasets(TorchtextTestCase):
+    def _write_csv(self):
+        csv_path = os.path.join(self.test_dir, 'data.csv')
+        with io.open(csv_path, 'w', encoding='utf8') as f:
+            for i in range(25):
+                if i % 3 == 0:
+                    f.write(u'"{}","multi\nline ""quoted"" té{}"\n'.format(i % 4, i))
+                else:
+                    f.write(u'"{}","line té{}"\n'.format(i % 4, i))
+        return csv_path
+
+    def test_record_offsets(self):
+        csv_path = self._write_csv()
+        offsets = _record_offsets(csv_path, every=4, csv=True)
+        self.assertEqual(len(offsets), 7)
+        self.assertTrue(os.path.exists(csv_path + '.offsets'))
+        # the cached index is reused, and rebuilt for other parameters
+        self.assertEqual(_record_offsets(csv_path, every=4, csv=True), offsets)
+        self.assertEqual(len(_record_offsets(csv_path, every=4)), 9)
+
+        ref_items = list(_create_data_from_csv(csv_path))
+        self.assertEqual(len(ref_items), 25)
+        for start in [0, 1, 4, 7, 24, 25, 30]:
+            self.assertEqual(list(_iterator_from(csv_path, _create_data_from_csv, start, csv=True, every=4)),
+                             ref_items[start:])
+
+    def test_record_offsets_quotes(self):
+        # quotes inside unquoted fields and escaped quotes do not change the records read by csv
+        csv_path = os.path.join(self.test_dir, 'quotes.csv')
+        rows = [u'{},he said "hi té{}\n',
+                u'"{}","multi\nline ""quoted"" té{}"\r\n',
+                u'"{}","escaped ""\n"" quotes {}"\n',
+                u'{},a 5" screen, ""{}\n',
+                u'"{}","plain té{}"\n']
+        with io.open(csv_path, 'w', encoding='utf8', newline='') as f:
+            for i in range(30):
+                f.write(rows[i % len(rows)].format(i % 4, i))
+        ref_items = list(_create_data_from_csv(csv_path))
+        self.assertEqual(len(ref_items), 30)
+        for start in range(32):
+            self.assertEqual(list(_iterator_from(csv_path, _create_data_from_csv, start, csv=True, every=4)),
+                             ref_items[start:])
+
+        seek = partial(_iterator_from, csv_path, _create_data_from_csv, csv=True, every=4)
+        shard_records = partial(_shard_records, csv_path, csv=True, every=4)
+        for num_shards in [2, 3, 5]:
+            shard_items = [list(_iterate_shard(iter(ref_items), shard_id, num_shards, seek, shard_records))
+                           for shard_id in range(num_shards)]
+            self.assertEqual(sum(shard_items, []), ref_items)
+
+    def test_setup_iter_seek(self):
+        csv_path = self._write_csv()
+        ref_items = list(_create_data_from_csv(csv_path))
+        seek = partial(_iterator_from, csv_path, _create_data_from_csv, csv=True, every=4)
+        for start, num_lines in [(0, None), (5, 3), (9, None), (24, 10)]:
+            dataset = RawTextIterableDataset(_create_data_from_csv(csv_path))
+            dataset.setup_iter(start, num_lines)
+            seek_dataset = RawTextIterableDataset(_create_data_from_csv(csv_path), seek=seek)
+            seek_dataset.setup_iter(start, num_lines)
+            self.assertEqual(list(seek_dataset), list(dataset))
+            self.assertEqual(list(seek_dataset)[:1], ref_items[start:start + 1])
+
+        txt_path = os.path.join(self.test_dir, 'data.txt')
+        with io.open(txt_path, 'w', encoding='utf8') as f:
+            f.write(u''.join(u'line {}\n'.format(i) for i in range(10)))
+        dataset = RawLMDataset(_read_lines(txt_path), seek=partial(_iterator_from, txt_path, _read_lines, every=3))
+        dataset.setup_iter(4, 2)
+        self.assertEqual(list(dataset)[:2], ['line 4\n', 'line 5\n'])
+
+    def test_shards(self):
+        csv_path = self._write_csv()
+        ref_items = list(_create_data_from_csv(csv_path))
+        seek = partial(_iterator_from, csv_path, _create_data_from_csv, csv=True, every=4)
+        shard_records = partial(_shard_records, csv_path, csv=True, every=4)
+        for num_shards in [1, 2, 3, 5, 10]:
+            ranges = [shard_records(shard_id, num_shards) for shard_id in range(num_shards)]
+            self.assertEqual(ranges[0][0], 0)
+            self.assertGreaterEqual(ranges[-1][1], len(ref_items))
+            for (_, end), (begin, _) in zip(ranges[:-1], ranges[1:]):
+                self.assertEqual(end, begin)
+            shard_items = [list(_iterate_shard(iter(ref_items), shard_id, num_shards, seek, shard_records))
+                           for shard_id in range(num_shards)]
+            self.assertEqual(sum(shard_items, []), ref_items)
+            # datasets that cannot seek are split item by item
+            shard_items = [list(_iterate_shard(iter(ref_items), shard_id, num_shards))
+                           for shard_id in range(num_shards)]
+            self.assertEqual(sorted(sum(shard_items, [])), sorted(ref_items))
+
+        # every DataLoader worker reads its own shard
+        dataset = RawTextIterableDataset(_create_data_from_csv(csv_path), seek=seek, shard_records=shard_records)
+        loader = torch.utils.data.DataLoader(dataset, batch_size=None, num_workers=2)
+        self.assertEqual(sorted(tuple(item) for item in loader), sorted(ref_items))
+
+    def test_distributed_setup_datasets(self):
+        csv_path = self._write_csv()
+        ref_items = list(_create_data_from_csv(csv_path))
+
+        def raw_datasets(root='.data'):
+            return tuple(RawTextIterableDataset(_create_data_from_csv(csv_path),
+                                                seek=partial(_iterator_from, csv_path, _create_data_from_csv,
+                                                             csv=True, every=4),
+                                                shard_records=partial(_shard_records, csv_path, csv=True, every=4))
+                         for _ in range(2))
+
+        with patch.multiple(torch.distributed, create=True, is_available=Mock(return_value=True),
+                            is_initialized=Mock(return_value=True), get_world_size=Mock(return_value=2),
+                            get_rank=Mock(return_value=1)):
+            # the raw datasets only yield the shard of the rank
+            train, _ = raw_datasets()
+            self.assertLess(len(list(train)), len(ref_items))
+            # but every rank builds its vocab and data from all the records
+            with patch.dict(raw_text_classification.DATASETS, {'AG_NEWS': raw_datasets}):
+                train, test = AG_NEWS(root=self.test_dir)
+        self.assertEqual(len(train), len(ref_items))
+        self.assertEqual(len(test), len(ref_items))
+        tokenizer = get_tokenizer('basic_english')
+        vocab = train.get_vocab()
+        for _, txt in ref_items:
+            for token in tokenizer(txt):
+                self.assertIn(token, vocab.stoi)
+
+    def test_reiterate(self):
+        csv_path = self._write_csv()
+        ref_items = list(_create_data_from_csv(csv_path))
+        dataset = RawTextIterableDataset(_create_data_from_csv(csv_path),
+                                         seek=partial(_iterator_from, csv_path, _create_data_from_csv, csv=True))
+        for _ in range(2):
+            self.assertEqual(list(dataset), ref_items)
+        self.assertEqual(list(dataset.get_iterator()), ref_items)
+
+        # without sharding, every DataLoader worker reads the whole dataset
+        dataset.setup_iter(shard=False)
+        loader = torch.utils.data.DataLoader(dataset, batch_size=None, num_workers=2)
+        self.assertEqual(sorted(tuple(item) for item in loader), sorted(ref_items * 2))
+
+        # datasets whose items cannot be located in the file are parsed again at every iteration
+        dataset = RawTextIterableDataset(_create_data_from_csv(csv_path),
+                                         seek=partial(_iterator_from_start, partial(_create_data_from_csv, csv_path)))
+        dataset.setup_iter(3, 2)
+        items = list(dataset)
+        self.assertEqual(items[:2], ref_items[3:5])
+        self.assertEqual(list(dataset), items)
@@ -0,0 +1,99 @@
+import torch
+from test.common.torchtext_test_case import TorchtextTestCase
+from torchtext.experimental.samplers import BucketBatchSampler, TokenBatchSampler, lengths_from_dataset
+
+
+class TestSamplers(TorchtextTestCase):
+    def test_lengths_from_dataset(self):
+        dataset = [(0, torch.arange(3)), (1, torch.arange(5))]
+        self.assertEqual(lengths_from_dataset(dataset, lambda item: len(item[1])), torch.tensor([3, 5]))
+        self.assertEqual(lengths_from_dataset(dataset, lambda item: (item[0], len(item[1]))),
+                         torch.tensor([[0, 3], [1, 5]]))
+
+    def test_bucket_batch_sampler(self):
+        generator = torch.Generator()
+        generator.manual_seed(0)
+        lengths = torch.randint(1, 50, (1000,), generator=generator)
+        sampler = BucketBatchSampler(lengths, batch_size=16, pool_size=160)
+        batches = list(sampler)
+        self.assertEqual(len(batches), len(sampler))
+        self.assertEqual(len(batches), 63)
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(1000)))
+        # the batches are sorted within pools, so the padding is lower than with random batches
+        padding = sum(lengths[batch].max().item() * len(batch) - lengths[batch].sum().item() for batch in batches)
+        random_batches = torch.randperm(1000, generator=generator).split(16)
+        random_padding = sum(lengths[batch].max().item() * len(batch) - lengths[batch].sum().item()
+                             for batch in random_batches)
+        self.assertLess(padding * 5, random_padding)
+
+        # the batches are deterministic and change with the epoch
+        self.assertEqual(list(sampler), batches)
+        sampler.set_epoch(1)
+        self.assertNotEqual(list(sampler), batches)
+
+        sampler = BucketBatchSampler(lengths, batch_size=16, shuffle=False, drop_last=True)
+        batches = list(sampler)
+        self.assertEqual(len(batches), 62)
+        self.assertEqual(len(sampler), 62)
+        self.assertTrue(all(len(batch) == 16 for batch in batches))
+        self.assertEqual([lengths[batch].tolist() for batch in batches],
+                         [sorted(lengths[batch].tolist()) for batch in batches])
+
+        # 2-D lengths are sorted by their first column, then the second one
+        lengths_2d = torch.tensor([[3, 1], [1, 2], [3, 0], [1, 1]])
+        sampler = BucketBatchSampler(lengths_2d, batch_size=4, shuffle=False)
+        self.assertEqual(list(sampler), [[3, 1, 2, 0]])
+
+    def test_bucket_batch_sampler_replicas(self):
+        lengths = torch.arange(100)
+        rank_batches = [list(BucketBatchSampler(lengths, batch_size=8, num_replicas=3, rank=rank, seed=1))
+                        for rank in range(3)]
+        self.assertEqual([len(batches) for batches in rank_batches], [5, 5, 5])
+        self.assertEqual(len(BucketBatchSampler(lengths, batch_size=8, num_replicas=3, rank=0)), 5)
+        items = [i for batches in rank_batches for batch in batches for i in batch]
+        self.assertEqual(set(items), set(range(100)))
+        with self.assertRaises(ValueError):
+            BucketBatchSampler(lengths, batch_size=8, num_replicas=3, rank=3)
+        with self.assertRaises(ValueError):
+            BucketBatchSampler(lengths, batch_size=8, pool_size=0)
+
+    def test_token_batch_sampler(self):
+        generator = torch.Generator()
+        generator.manual_seed(0)
+        lengths = torch.randint(1, 50, (1000,), generator=generator)
+        lengths[0] = 200
+        sampler = TokenBatchSampler(lengths, max_tokens=128, pool_size=200)
+        batches = list(sampler)
+        self.assertEqual(len(batches), len(sampler))
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(1000)))
+        for batch in batches:
+            # the item longer than max_tokens makes a batch of its own
+            if batch != [0]:
+                self.assertLessEqual(lengths[batch].max().item() * len(batch), 128)
+
+        # the batches are deterministic, change with the epoch and can resume in the middle of an epoch
+        self.assertEqual(list(sampler), batches)
+        sampler.set_epoch(1)
+        epoch_batches = list(sampler)
+        self.assertNotEqual(epoch_batches, batches)
+        sampler.set_epoch(1, start=5)
+        self.assertEqual(len(sampler), len(epoch_batches) - 5)
+        self.assertEqual(list(sampler), epoch_batches[5:])
+
+        # source and target lengths are budgeted separately
+        lengths_2d = torch.tensor([[1, 4], [1, 1], [2, 1], [2, 3], [4, 1]])
+        sampler = TokenBatchSampler(lengths_2d, max_tokens=(4, 8), shuffle=False)
+        self.assertEqual(list(sampler), [[1, 0], [2, 3], [4]])
+        sampler = TokenBatchSampler(lengths_2d, max_tokens=8, max_batch_size=2, shuffle=False)
+        self.assertEqual(list(sampler), [[1, 0], [2, 3], [4]])
+        with self.assertRaises(ValueError):
+            TokenBatchSampler(lengths_2d, max_tokens=(4, 6, 8))
+        with self.assertRaises(ValueError):
+            TokenBatchSampler(lengths_2d.unsqueeze(0), max_tokens=8)
+        with self.assertRaises(ValueError):
+            TokenBatchSampler(lengths_2d, max_tokens=8, pool_size=0)
+
+        rank_batches = [list(TokenBatchSampler(lengths, max_tokens=128, num_replicas=2, rank=rank))
+                        for rank in range(2)]
+        self.assertEqual(len(rank_batches[0]), len(rank_batches[1]))
+        self.assertEqual(set(i for batches in rank_batches for batch in batches for i in batch), set(range(1000)))
@@ -1,12 +1,22 @@
 import torch
 from test.common.torchtext_test_case import TorchtextTestCase
 from test.common.assets import get_asset_path
+from torchtext.data.functional import load_sp_model
+from torchtext.data.utils import get_tokenizer
 from torchtext.experimental.transforms import (
+    basic_english_normalize,
+    CachedTokenizer,
+    HashedNGrams,
+    TokenizeAndLookup,
+    bpe_tokenizer,
+    wordpiece_tokenizer,
     VectorTransform,
     VocabTransform,
 )
-from torchtext.experimental.vocab import vocab_from_file
+from torchtext.experimental.functional import hashed_ngrams_func
+from torchtext.experimental.vocab import vocab, vocab_from_file
 from torchtext.experimental.vectors import FastText
+from collections import OrderedDict
 import shutil
 import tempfile
 import os
@@ -24,6 +34,119 @@ class TestTransforms(TorchtextTestCase):
             self.assertEqual(jit_vocab_transform([['of', 'that', 'new'], ['of', 'that', 'new', 'that']]),
                              [[7, 18, 24], [7, 18, 24, 18]])
 
+    def test_tokenize_and_lookup(self):
+        asset_path = get_asset_path('vocab_test2.txt')
+        test_sample = ['Of that NEW.', '', 'of, that  new that notintheVocab']
+        with open(asset_path, 'r') as f:
+            vocab = vocab_from_file(f)
+        tokenizer = basic_english_normalize()
+        ref_ids = VocabTransform(vocab)(tokenizer(test_sample))
+        ref_flat_ids = torch.tensor([i for line_ids in ref_ids for i in line_ids])
+        ref_offsets = torch.tensor([0, len(ref_ids[0]), len(ref_ids[0])])
+
+        tokenize_and_lookup = TokenizeAndLookup(tokenizer, vocab)
+        ids, offsets = tokenize_and_lookup(test_sample)
+        self.assertEqual(ids, ref_flat_ids)
+        self.assertEqual(offsets, ref_offsets)
+
+        assert not tokenize_and_lookup.is_jitable
+        jit_tokenize_and_lookup = torch.jit.script(tokenize_and_lookup.to_ivalue())
+        ids, offsets = jit_tokenize_and_lookup(test_sample)
+        self.assertEqual(ids, ref_flat_ids)
+        self.assertEqual(offsets, ref_offsets)
+
+    def test_hashed_ngrams(self):
+        def ref_features(line_ids, ngrams, num_buckets, bucket_offset):
+            features = list(line_ids)
+            for n in range(2, ngrams + 1):
+                for j in range(len(line_ids) - n + 1):
+                    h = n
+                    for token_id in line_ids[j:j + n]:
+                        h = (h * 116049371 + token_id) % 2 ** 64
+                    features.append(bucket_offset + h % num_buckets)
+            return features
+
+        lines_ids = [[4, 8, 15, 16], [], [23], [42, 4, 8]]
+        ids = torch.tensor([i for line_ids in lines_ids for i in line_ids])
+        offsets = torch.tensor([0, 4, 4, 5])
+        hashed_ngrams = HashedNGrams(3, num_buckets=1000, bucket_offset=50)
+        jit_hashed_ngrams = torch.jit.script(hashed_ngrams)
+        ref = [ref_features(line_ids, 3, 1000, 50) for line_ids in lines_ids]
+        for module in (hashed_ngrams, jit_hashed_ngrams):
+            features, feature_offsets = module(ids, offsets)
+            self.assertEqual(features, torch.tensor([f for line_features in ref for f in line_features]))
+            self.assertEqual(feature_offsets, torch.tensor([0, 9, 9, 10]))
+
+        self.assertEqual(hashed_ngrams_func(2, 1000, 50)(torch.tensor(lines_ids[0])),
+                         torch.tensor(ref_features(lines_ids[0], 2, 1000, 50)))
+
+        # an n-gram led by id 0 does not hash like the shorter n-gram after it
+        features = hashed_ngrams_func(3, 2 ** 62, 0)(torch.tensor([0, 4, 8]))
+        self.assertEqual(features.size(0), 6)
+        bigram_4_8, trigram_0_4_8 = features[4].item(), features[5].item()
+        self.assertNotEqual(trigram_0_4_8, bigram_4_8)
+
+    def test_wordpiece_tokenizer(self):
+        tokens = ['[UNK]', 'un', '##aff', '##able', 'weather', ',', 'the', '##s', 'caf\u00e9']
+        wordpiece_vocab = vocab(OrderedDict([(token, 1) for token in tokens]), unk_token='[UNK]')
+        test_sample = ['Unaffable weather, the weathers xyz', '', 'caf\u00e9s unaffablex']
+        ref_results = [['un', '##aff', '##able', 'weather', ',', 'the', 'weather', '##s', '[UNK]'],
+                       [],
+                       ['caf\u00e9', '##s', '[UNK]']]
+        ref_offsets = [([0, 2, 5, 10, 17, 19, 23, 30, 32], [2, 5, 9, 17, 18, 22, 30, 31, 35]),
+                       ([], []),
+                       ([0, 4, 6], [4, 5, 16])]
+        ref_ids = torch.tensor([wordpiece_vocab[token] for line_tokens in ref_results for token in line_tokens])
+
+        tokenizer = wordpiece_tokenizer(wordpiece_vocab)
+        jit_tokenizer = torch.jit.script(tokenizer.to_ivalue())
+        assert not tokenizer.is_jitable
+        assert tokenizer.to_ivalue().is_jitable
+        for module in (tokenizer, jit_tokenizer):
+            self.assertEqual(module(test_sample), ref_results)
+            self.assertEqual(module.forward_with_offsets(test_sample),
+                             [(line_tokens, starts, ends) for line_tokens, (starts, ends)
+                              in zip(ref_results, ref_offsets)])
+            ids, offsets = module.forward_ids(test_sample)
+            self.assertEqual(ids, ref_ids)
+            self.assertEqual(offsets, torch.tensor([0, 9, 9]))
+
+        self.assertEqual(wordpiece_tokenizer(wordpiece_vocab, max_input_chars_per_word=5)(['weather']),
+                         [['[UNK]']])
+
+        # test load and save
+        save_path = os.path.join(self.test_dir, 'wordpiece.pt')
+        torch.save(tokenizer.to_ivalue(), save_path)
+        self.assertEqual(torch.load(save_path)(test_sample), ref_results)
+
+    def test_bpe_tokenizer(self):
+        merges = ['#version: 0.2', 'l o', 'lo w', 'e r</w>', 'n e', 'ne w', 'e s', 'es t</w>', 'low est</w>']
+        bpe_vocab = vocab(OrderedDict([(token, 1) for token in ['<unk>', 'lowest', 'new@@', 'er', 'low@@']]))
+        test_sample = ['lowest newer', '', 'lower  x']
+        ref_results = [['lowest', 'new@@', 'er'], [], ['low@@', 'er', 'x']]
+
+        merges_path = os.path.join(self.test_dir, 'merges.txt')
+        with open(merges_path, 'w') as f:
+            f.write('\n'.join(merges) + '\n')
+        for cache_max_bytes in (0, 2 ** 20):
+            with open(merges_path, 'r') as f:
+                tokenizer = bpe_tokenizer(f, bpe_vocab, cache_max_bytes)
+            jit_tokenizer = torch.jit.script(tokenizer.to_ivalue())
+            assert not tokenizer.is_jitable
+            assert tokenizer.to_ivalue().is_jitable
+            for module in (tokenizer, jit_tokenizer):
+                # twice, to go through the cache of tokenized words
+                self.assertEqual(module(test_sample), ref_results)
+                self.assertEqual(module(test_sample), ref_results)
+                ids, offsets = module.forward_ids(test_sample)
+                self.assertEqual(ids, torch.tensor([1, 2, 3, 4, 3, 0]))
+                self.assertEqual(offsets, torch.tensor([0, 3, 3]))
+
+        # test load and save
+        save_path = os.path.join(self.test_dir, 'bpe.pt')
+        torch.save(tokenizer.to_ivalue(), save_path)
+        self.assertEqual(torch.load(save_path)(test_sample), ref_results)
+
     def test_vector_transform(self):
         asset_name = 'wiki.en.vec'
         asset_path = get_asset_path(asset_name)
@@ -38,3 +161,34 @@ class TestTransforms(TorchtextTestCase):
                                                         [-0.32423, -0.098845, -0.0073467]])
             self.assertEqual(vector_transform([['the', 'world']])[0][:, 0:3], expected_fasttext_simple_en)
             self.assertEqual(jit_vector_transform([['the', 'world']])[0][:, 0:3], expected_fasttext_simple_en)
+
+    def test_cached_tokenizer(self):
+        test_sample = ['Basic English Normalization', 'for a Line of Text', 'Basic English Normalization']
+        ref_results = [['basic', 'english', 'normalization'], ['for', 'a', 'line', 'of', 'text'],
+                       ['basic', 'english', 'normalization']]
+
+        for tokenizer in [basic_english_normalize(), get_tokenizer('basic_english')]:
+            cached_tokenizer = CachedTokenizer(tokenizer)
+            self.assertEqual(cached_tokenizer(test_sample), ref_results)
+            self.assertEqual(cached_tokenizer(test_sample), ref_results)
+            cache_info = cached_tokenizer.cache_info()
+            self.assertEqual((cache_info['hits'], cache_info['misses'], cache_info['entries']), (3, 3, 2))
+
+            cached_tokenizer.cache_clear()
+            self.assertEqual(cached_tokenizer.cache_info()['entries'], 0)
+
+        jit_cached_tokenizer = torch.jit.script(CachedTokenizer(basic_english_normalize()).to_ivalue())
+        self.assertEqual(jit_cached_tokenizer(test_sample), ref_results)
+        self.assertEqual(jit_cached_tokenizer(test_sample), ref_results)
+        self.assertEqual(jit_cached_tokenizer.cache_info()['hits'], 3)
+
+        sp_model = load_sp_model(get_asset_path('spm_example.model'))
+        cached_sp_tokenizer = CachedTokenizer(sp_model.EncodeAsPieces)
+        self.assertEqual(cached_sp_tokenizer(test_sample), [sp_model.EncodeAsPieces(line) for line in test_sample])
+
+        # entries are evicted once the cache exceeds its size limit
+        cached_tokenizer = CachedTokenizer(basic_english_normalize(), max_bytes=400)
+        cached_tokenizer(['line {}'.format(i) for i in range(10)])
+        cache_info = cached_tokenizer.cache_info()
+        self.assertLessEqual(cache_info['bytes'], 400)
+        self.assertLess(cache_info['entries'], 10)
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 # Note that all the tests in this module require dataset (either network access or cached)
+import functools
 import os
+import torchtext
+from unittest.mock import patch
 from torchtext import utils
 from .common.torchtext_test_case import TorchtextTestCase
 from test.common.assets import get_asset_path
@@ -174,3 +177,50 @@ class TestUtils(TorchtextTestCase):
 
         # remove file
         conditional_remove(archive_path)
+
+    def test_dataset_cache(self):
+        from torchtext.data.utils import get_tokenizer
+        from torchtext.vocab import build_vocab_from_iterator
+        import torch
+
+        data_path = os.path.join(self.test_dir, 'data.txt')
+        with open(data_path, 'w') as f:
+            f.write('some text\n')
+        tokenizer_key = utils._tokenizer_key(get_tokenizer('basic_english'))
+        self.assertTrue(tokenizer_key.startswith('torchtext.data.utils._basic_english_normalize:'))
+        self.assertIsNone(utils._tokenizer_key(lambda x: x.split()))
+
+        # editing a tokenizer function changes its key
+        keys = []
+        for body in ['return line.split()', 'return line.lower().split()']:
+            namespace = {'__name__': 'tokenizers'}
+            exec('def tokenize(line):\n    {}\n'.format(body), namespace)
+            keys.append(utils._tokenizer_key(namespace['tokenize']))
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(utils._tokenizer_key(functools.partial(namespace['tokenize'])),
+                         utils._tokenizer_key(functools.partial(namespace['tokenize'])))
+        # partial functions over objects such as a spaCy pipeline are not identified
+        self.assertIsNone(utils._tokenizer_key(functools.partial(namespace['tokenize'], spacy=object())))
+
+        key = utils._dataset_cache_key('Dataset', [data_path], tokenizer=tokenizer_key, ngrams=1)
+        self.assertNotEqual(key, utils._dataset_cache_key('Dataset', [data_path], tokenizer=tokenizer_key, ngrams=2))
+        self.assertIsNone(utils._dataset_cache_key('Dataset', [data_path], tokenizer=None, ngrams=1))
+        # the data processed by another torchtext version is not reused
+        with patch.object(torchtext, '__version__', 'other', create=True):
+            other_key = utils._dataset_cache_key('Dataset', [data_path], tokenizer=tokenizer_key, ngrams=1)
+        self.assertNotEqual(key, other_key)
+
+        root = os.path.join(self.test_dir, 'root')
+        self.assertIsNone(utils._load_from_dataset_cache(root, key, ['ids']))
+        vocab = build_vocab_from_iterator([['some', 'text']])
+        tensors = {'ids': torch.tensor([2, 3, 2], dtype=torch.int16), 'empty': torch.tensor([], dtype=torch.long)}
+        utils._save_to_dataset_cache(root, key, tensors, vocab)
+        loaded_tensors, loaded_vocab = utils._load_from_dataset_cache(root, key, ['ids', 'empty'])
+        for name in tensors:
+            self.assertEqual(loaded_tensors[name].dtype, tensors[name].dtype)
+            self.assertEqual(loaded_tensors[name], tensors[name])
+        self.assertEqual(loaded_vocab.itos, vocab.itos)
+        self.assertEqual(utils._vocab_key(loaded_vocab), utils._vocab_key(vocab))
+
+        utils.clear_dataset_cache(root)
+        self.assertIsNone(utils._load_from_dataset_cache(root, key, ['ids']))
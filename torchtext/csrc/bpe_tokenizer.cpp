@@ -0,0 +1,268 @@
+#include <ATen/Parallel.h> // @manual
+#include <algorithm>
+#include <bpe_tokenizer.h> // @manual
+#include <queue>
+
+namespace torchtext {
+
+namespace {
+// Launching a task on fewer lines than this is not worth it.
+constexpr int64_t GRAIN_SIZE = 32;
+// The number of independently locked shards of the word cache.
+constexpr int64_t NUM_CACHE_SHARDS = 16;
+
+bool _is_space(const char c) {
+  return c == ' ' || c == '\t' || c == '\n' || c == '\v' || c == '\f' ||
+         c == '\r';
+}
+
+bool _is_continuation_byte(const char c) {
+  return (static_cast<unsigned char>(c) & 0xC0) == 0x80;
+}
+
+uint64_t _pair_key(const int64_t left, const int64_t right) {
+  return (static_cast<uint64_t>(left) << 32) | static_cast<uint64_t>(right);
+}
+
+std::string _check_unk_token(const std::vector<std::string> &tokens,
+                             const std::string &unk_token) {
+  TORCH_CHECK(std::find(tokens.begin(), tokens.end(), unk_token) !=
+                  tokens.end(),
+              "The `unk_token` '" + unk_token +
+                  "' wasn't found in the tokens.");
+  return unk_token;
+}
+
+// A symbol of a word being merged: a byte range of the word, the id of the
+// symbol (-1 if it is not part of any merge) and its neighbours.
+struct Symbol {
+  size_t begin;
+  size_t end;
+  int64_t id;
+  int64_t prev;
+  int64_t next;
+};
+
+// A candidate merge of the symbol at `left` with the next one, valid as long as
+// both symbols still have the ids they had when it was queued.
+struct MergeCandidate {
+  int64_t rank;
+  int64_t left;
+  int64_t left_id;
+  int64_t right_id;
+
+  bool operator>(const MergeCandidate &other) const {
+    return std::tie(rank, left) > std::tie(other.rank, other.left);
+  }
+};
+} // namespace
+
+BPETokenizer::BPETokenizer(const std::vector<std::string> &merges,
+                           const std::vector<std::string> &tokens,
+                           const std::string &unk_token,
+                           const int64_t cache_max_bytes)
+    : cache_max_bytes_(cache_max_bytes), merges_(merges),
+      vocab_(tokens, _check_unk_token(tokens, unk_token)) {
+  if (cache_max_bytes_ > 0) {
+    const int64_t shard_max_bytes =
+        (cache_max_bytes_ + NUM_CACHE_SHARDS - 1) / NUM_CACHE_SHARDS;
+    for (int64_t i = 0; i < NUM_CACHE_SHARDS; i++) {
+      word_cache_shards_.push_back(
+          c10::make_intrusive<TokenizerCache>(shard_max_bytes));
+    }
+  }
+  int64_t rank = 0;
+  for (const auto &merge : merges) {
+    // merges files of subword-nmt start with a version header
+    if (merge.empty() || merge.rfind("#version", 0) == 0) {
+      continue;
+    }
+    const size_t space = merge.find(' ');
+    TORCH_CHECK(space != std::string::npos && space > 0 &&
+                    space + 1 < merge.size() &&
+                    merge.find(' ', space + 1) == std::string::npos,
+                "Expected a merge to be two symbols separated by a space but "
+                "found: '" +
+                    merge + "'");
+    const std::string left = merge.substr(0, space);
+    const std::string right = merge.substr(space + 1);
+    const int64_t left_id = intern_(left);
+    const int64_t right_id = intern_(right);
+    const int64_t merged_id = intern_(left + right);
+    // the first occurrence of a merge has the highest priority
+    merge_ranks_.emplace(_pair_key(left_id, right_id),
+                         std::make_pair(rank++, merged_id));
+  }
+}
+
+int64_t BPETokenizer::intern_(const std::string &symbol) {
+  return symbol_ids_.emplace(symbol, symbol_ids_.size()).first->second;
+}
+
+// Splits the word into characters, the last one marked with
+// `end_of_word_suffix_`, then repeatedly applies the highest priority merge
+// among the pairs of adjacent symbols.
+std::vector<std::string>
+BPETokenizer::tokenize_word_(const std::string &word) const {
+  std::vector<Symbol> symbols;
+  std::string buffer;
+  for (size_t begin = 0; begin < word.size();) {
+    size_t end = begin + 1;
+    while (end < word.size() && _is_continuation_byte(word[end])) {
+      end++;
+    }
+    buffer.assign(word, begin, end - begin);
+    if (end == word.size()) {
+      buffer.append(end_of_word_suffix_);
+    }
+    const auto symbol = symbol_ids_.find(buffer);
+    const int64_t index = symbols.size();
+    symbols.push_back({begin, end,
+                       symbol == symbol_ids_.end() ? -1 : symbol->second,
+                       index - 1, end == word.size() ? -1 : index + 1});
+    begin = end;
+  }
+
+  std::priority_queue<MergeCandidate, std::vector<MergeCandidate>,
+                      std::greater<MergeCandidate>>
+      candidates;
+  auto push_candidate = [&](const int64_t left) {
+    if (left < 0 || symbols[left].next < 0) {
+      return;
+    }
+    const int64_t left_id = symbols[left].id;
+    const int64_t right_id = symbols[symbols[left].next].id;
+    if (left_id < 0 || right_id < 0) {
+      return;
+    }
+    const auto merge = merge_ranks_.find(_pair_key(left_id, right_id));
+    if (merge != merge_ranks_.end()) {
+      candidates.push({merge->second.first, left, left_id, right_id});
+    }
+  };
+  for (int64_t i = 0; i < static_cast<int64_t>(symbols.size()); i++) {
+    push_candidate(i);
+  }
+
+  while (!candidates.empty()) {
+    const auto candidate = candidates.top();
+    candidates.pop();
+    auto &left = symbols[candidate.left];
+    if (left.id != candidate.left_id || left.next < 0 ||
+        symbols[left.next].id != candidate.right_id) {
+      continue;
+    }
+    auto &right = symbols[left.next];
+    left.end = right.end;
+    left.id = merge_ranks_.at(_pair_key(candidate.left_id, candidate.right_id))
+                  .second;
+    left.next = right.next;
+    if (right.next >= 0) {
+      symbols[right.next].prev = candidate.left;
+    }
+    // merged symbols are never looked at again
+    right.id = -2;
+    push_candidate(left.prev);
+    push_candidate(candidate.left);
+  }
+
+  std::vector<std::string> tokens;
+  for (int64_t i = symbols.empty() ? -1 : 0; i >= 0; i = symbols[i].next) {
+    tokens.emplace_back(word, symbols[i].begin,
+                        symbols[i].end - symbols[i].begin);
+    if (symbols[i].next >= 0) {
+      tokens.back().append(continuation_suffix_);
+    }
+  }
+  return tokens;
+}
+
+void BPETokenizer::tokenize_(const std::string &str,
+                             std::vector<std::string> &tokens) const {
+  std::string word;
+  size_t begin = 0;
+  while (begin < str.size()) {
+    if (_is_space(str[begin])) {
+      begin++;
+      continue;
+    }
+    size_t end = begin + 1;
+    while (end < str.size() && !_is_space(str[end])) {
+      end++;
+    }
+    word.assign(str, begin, end - begin);
+    if (word_cache_shards_.empty()) {
+      const auto word_tokens = tokenize_word_(word);
+      tokens.insert(tokens.end(), word_tokens.begin(), word_tokens.end());
+    } else {
+      auto &word_cache = *word_cache_shards_[std::hash<std::string>{}(word) %
+                                             word_cache_shards_.size()];
+      auto word_tokens = word_cache.get(word);
+      if (!word_tokens.has_value()) {
+        word_tokens = tokenize_word_(word);
+        word_cache.put(word, *word_tokens);
+      }
+      tokens.insert(tokens.end(), word_tokens->begin(), word_tokens->end());
+    }
+    begin = end;
+  }
+}
+
+std::vector<std::string> BPETokenizer::forward(const std::string &str) const {
+  std::vector<std::string> tokens;
+  tokenize_(str, tokens);
+  return tokens;
+}
+
+std::vector<std::vector<std::string>>
+BPETokenizer::forward_batch(const std::vector<std::string> &lines) const {
+  std::vector<std::vector<std::string>> tokens(lines.size());
+  at::parallel_for(0, lines.size(), GRAIN_SIZE,
+                   [&](int64_t begin, int64_t end) {
+                     for (int64_t i = begin; i < end; i++) {
+                       tokenize_(lines[i], tokens[i]);
+                     }
+                   });
+  return tokens;
+}
+
+// Tokenizes the lines and returns the vocab ids of all the lines concatenated
+// and the offset of every line.
+std::tuple<torch::Tensor, torch::Tensor>
+BPETokenizer::forward_ids(const std::vector<std::string> &lines) const {
+  const int64_t num_lines = lines.size();
+  std::vector<std::vector<int64_t>> ids(num_lines);
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    std::vector<std::string> tokens;
+    for (int64_t i = begin; i < end; i++) {
+      tokens.clear();
+      tokenize_(lines[i], tokens);
+      ids[i].reserve(tokens.size());
+      for (const auto &token : tokens) {
+        ids[i].push_back(vocab_.__getitem__(token));
+      }
+    }
+  });
+
+  torch::Tensor offsets = torch::empty({num_lines}, torch::kLong);
+  auto offsets_data = offsets.data_ptr<int64_t>();
+  int64_t num_ids = 0;
+  for (int64_t i = 0; i < num_lines; i++) {
+    offsets_data[i] = num_ids;
+    num_ids += ids[i].size();
+  }
+  torch::Tensor flat_ids = torch::empty({num_ids}, torch::kLong);
+  auto flat_ids_data = flat_ids.data_ptr<int64_t>();
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      std::copy(ids[i].begin(), ids[i].end(), flat_ids_data + offsets_data[i]);
+    }
+  });
+  return std::make_tuple(std::move(flat_ids), std::move(offsets));
+}
+
+int64_t BPETokenizer::cache_max_bytes() const {
+  return cache_max_bytes_;
+}
+
+} // namespace torchtext
@@ -0,0 +1,43 @@
+#include <tokenizer_cache.h>         // @manual
+#include <torch/csrc/utils/pybind.h> // @manual
+#include <torch/script.h>
+#include <vocab.h> // @manual
+
+namespace torchtext {
+
+struct BPETokenizer : torch::CustomClassHolder {
+private:
+  // Symbols (the pieces of the merges and their concatenations) are interned,
+  // and merges are keyed by the ids of their two symbols, which are packed in
+  // a single integer.
+  std::unordered_map<std::string, int64_t> symbol_ids_;
+  std::unordered_map<uint64_t, std::pair<int64_t, int64_t>> merge_ranks_;
+  // The word cache is split into shards of their own lock, so that the
+  // threads of forward_batch and forward_ids rarely wait for each other.
+  std::vector<c10::intrusive_ptr<TokenizerCache>> word_cache_shards_;
+  int64_t cache_max_bytes_;
+
+  int64_t intern_(const std::string &symbol);
+  std::vector<std::string> tokenize_word_(const std::string &word) const;
+  void tokenize_(const std::string &str,
+                 std::vector<std::string> &tokens) const;
+
+public:
+  const std::string continuation_suffix_ = "@@";
+  const std::string end_of_word_suffix_ = "</w>";
+  std::vector<std::string> merges_;
+  Vocab vocab_;
+
+  explicit BPETokenizer(const std::vector<std::string> &merges,
+                        const std::vector<std::string> &tokens,
+                        const std::string &unk_token,
+                        const int64_t cache_max_bytes);
+  std::vector<std::string> forward(const std::string &str) const;
+  std::vector<std::vector<std::string>>
+  forward_batch(const std::vector<std::string> &lines) const;
+  std::tuple<torch::Tensor, torch::Tensor>
+  forward_ids(const std::vector<std::string> &lines) const;
+  int64_t cache_max_bytes() const;
+};
+
+} // namespace torchtext
@@ -30,5 +30,23 @@ void infer_offsets(const std::string &file_path, int64_t num_lines,
   }
 }
 
+void byte_to_char_offsets(const std::string &str,
+                          std::vector<int64_t> &offsets) {
+  // number of UTF-8 code points starting before each byte offset
+  std::vector<int64_t> char_offsets(str.size() + 1);
+  int64_t num_chars = 0;
+  for (size_t i = 0; i < str.size(); i++) {
+    char_offsets[i] = num_chars;
+    if ((static_cast<unsigned char>(str[i]) & 0xC0) != 0x80) {
+      num_chars++;
+    }
+  }
+  char_offsets[str.size()] = num_chars;
+
+  for (auto &offset : offsets) {
+    offset = char_offsets[offset];
+  }
+}
+
 } // namespace impl
 } // namespace torchtext
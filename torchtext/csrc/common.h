@@ -1,3 +1,7 @@
+#include <cstdint>
+#include <string>
+#include <vector>
+
 namespace torchtext {
 
 namespace impl {
@@ -5,5 +9,7 @@ int64_t divup(int64_t x, int64_t y);
 void infer_offsets(const std::string &file_path, int64_t num_lines,
                    int64_t chunk_size, std::vector<size_t> &offsets,
                    int64_t num_header_lines = 0);
+void byte_to_char_offsets(const std::string &str,
+                          std::vector<int64_t> &offsets);
 } // namespace impl
 } // namespace torchtext
@@ -0,0 +1,90 @@
+#include <ATen/Parallel.h> // @manual
+#include <ngrams.h>        // @manual
+
+namespace torchtext {
+
+namespace {
+// Multiplier of the n-gram hash used by fastText.
+constexpr uint64_t NGRAM_HASH_MULTIPLIER = 116049371;
+// Launching a task on fewer lines than this is not worth it.
+constexpr int64_t GRAIN_SIZE = 32;
+
+int64_t _num_features(const int64_t length, const int64_t ngrams) {
+  int64_t num_features = length;
+  for (int64_t n = 2; n <= ngrams && n <= length; n++) {
+    num_features += length - n + 1;
+  }
+  return num_features;
+}
+} // namespace
+
+// Featurizes lines of token ids, stored back to back in `ids` and starting at
+// `offsets`, the way fastText does: every line gets its token ids followed by
+// the ids of its 2-grams, ..., `ngrams`-grams. An n-gram is hashed into one
+// of `num_buckets` buckets, whose ids start at `bucket_offset` (usually the
+// size of the vocab). Returns the features of all the lines back to back and
+// the offset of every line, as expected by EmbeddingBag.
+std::tuple<torch::Tensor, torch::Tensor>
+hashed_ngrams(const torch::Tensor &ids, const torch::Tensor &offsets,
+              const int64_t ngrams, const int64_t num_buckets,
+              const int64_t bucket_offset) {
+  TORCH_CHECK(ids.dim() == 1, "Expected `ids` to be a 1D tensor but found ",
+              ids.dim(), " dimensions");
+  TORCH_CHECK(offsets.dim() == 1,
+              "Expected `offsets` to be a 1D tensor but found ", offsets.dim(),
+              " dimensions");
+  TORCH_CHECK(ngrams >= 1, "Expected `ngrams` to be at least 1 but found ",
+              ngrams);
+  TORCH_CHECK(ngrams == 1 || num_buckets > 0,
+              "Expected `num_buckets` to be positive but found ", num_buckets);
+
+  const auto ids_long = ids.to(torch::kLong).contiguous();
+  const auto offsets_long = offsets.to(torch::kLong).contiguous();
+  const auto ids_data = ids_long.data_ptr<int64_t>();
+  const auto offsets_data = offsets_long.data_ptr<int64_t>();
+  const int64_t num_ids = ids.size(0), num_lines = offsets.size(0);
+
+  torch::Tensor output_offsets = torch::empty({num_lines}, torch::kLong);
+  auto output_offsets_data = output_offsets.data_ptr<int64_t>();
+  int64_t num_features = 0;
+  for (int64_t i = 0; i < num_lines; i++) {
+    const int64_t begin = offsets_data[i];
+    const int64_t end = i + 1 < num_lines ? offsets_data[i + 1] : num_ids;
+    TORCH_CHECK(begin >= 0 && begin <= end && end <= num_ids,
+                "Offsets are expected to be increasing and within the size of "
+                "`ids`, found offset ",
+                begin, " for line ", i);
+    output_offsets_data[i] = num_features;
+    num_features += _num_features(end - begin, ngrams);
+  }
+
+  torch::Tensor features = torch::empty({num_features}, torch::kLong);
+  auto features_data = features.data_ptr<int64_t>();
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      const int64_t *line = ids_data + offsets_data[i];
+      const int64_t length =
+          (i + 1 < num_lines ? offsets_data[i + 1] : num_ids) -
+          offsets_data[i];
+      int64_t *output = features_data + output_offsets_data[i];
+      std::copy(line, line + length, output);
+      output += length;
+      for (int64_t n = 2; n <= ngrams; n++) {
+        for (int64_t j = 0; j + n <= length; j++) {
+          // seeded with n, so that n-grams of different sizes do not collide:
+          // with a seed of 0, an n-gram starting with id 0 (usually <unk>)
+          // would hash like the (n-1)-gram after it
+          uint64_t hash = static_cast<uint64_t>(n);
+          for (int64_t k = j; k < j + n; k++) {
+            hash =
+                hash * NGRAM_HASH_MULTIPLIER + static_cast<uint64_t>(line[k]);
+          }
+          *output++ = bucket_offset + static_cast<int64_t>(hash % num_buckets);
+        }
+      }
+    }
+  });
+  return std::make_tuple(std::move(features), std::move(output_offsets));
+}
+
+} // namespace torchtext
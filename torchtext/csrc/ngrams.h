@@ -0,0 +1,10 @@
+#include <torch/script.h>
+
+namespace torchtext {
+
+std::tuple<torch::Tensor, torch::Tensor>
+hashed_ngrams(const torch::Tensor &ids, const torch::Tensor &offsets,
+              const int64_t ngrams, const int64_t num_buckets,
+              const int64_t bucket_offset);
+
+} // namespace torchtext
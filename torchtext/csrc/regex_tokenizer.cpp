@@ -1,8 +1,146 @@
-#include <regex_tokenizer.h> // @manual
-#include <sstream>
+#include <ATen/Parallel.h> // @manual
+#include <algorithm>
+#include <cctype>
+#include <common.h>
+#include <regex_tokenizer.h>                    // @manual
+#include <torch/csrc/jit/python/pybind_utils.h> // @manual
+#include <vocab.h>                              // @manual
 
 namespace torchtext {
 
+namespace {
+
+enum class PatternKind { Literal, Whitespace, Other };
+
+// The subset of characters matched by RE2's `\s`.
+bool _is_space(const char c) {
+  return c == ' ' || c == '\t' || c == '\n' || c == '\f' || c == '\r';
+}
+
+// Patterns that can take part in a fused scan either match a fixed non-empty
+// string (plain characters and escaped punctuation) or a run of whitespace.
+PatternKind _classify_pattern(const std::string &pattern,
+                              std::string &literal) {
+  if (pattern == "\\s+" || pattern == "\\s") {
+    return PatternKind::Whitespace;
+  }
+
+  static const std::string meta_chars = ".^$|?*+()[]{}";
+  literal.clear();
+  for (size_t i = 0; i < pattern.size(); i++) {
+    const char c = pattern[i];
+    if (c == '\\') {
+      // escaped letters and digits are character classes (`\d`, `\w`, ...)
+      if (i + 1 == pattern.size() ||
+          std::isalnum(static_cast<unsigned char>(pattern[i + 1]))) {
+        return PatternKind::Other;
+      }
+      literal.push_back(pattern[++i]);
+    } else if (meta_chars.find(c) != std::string::npos) {
+      return PatternKind::Other;
+    } else {
+      literal.push_back(c);
+    }
+  }
+  return literal.empty() ? PatternKind::Other : PatternKind::Literal;
+}
+
+// Returns true if an occurrence of `a` and an occurrence of `b` can share at
+// least one character of some input string.
+bool _can_overlap(const std::string &a, const std::string &b) {
+  if (a.empty() || b.empty()) {
+    return false;
+  }
+  if (a.find(b) != std::string::npos || b.find(a) != std::string::npos) {
+    return true;
+  }
+  for (size_t n = 1; n < std::min(a.size(), b.size()); n++) {
+    if (a.compare(a.size() - n, n, b, 0, n) == 0 ||
+        b.compare(b.size() - n, n, a, 0, n) == 0) {
+      return true;
+    }
+  }
+  return false;
+}
+
+bool _has_space(const std::string &str) {
+  return std::any_of(str.begin(), str.end(), _is_space);
+}
+
+// Replaces the matches of `pattern` the same way RE2::GlobalReplace does while
+// keeping track of the [begin, end) span of the original input that every
+// byte of `str` comes from. Replacement text maps to the span of the text it
+// replaces.
+template <typename RewriteFn>
+void _replace_with_offsets(std::string &str, std::vector<int64_t> &begins,
+                           std::vector<int64_t> &ends, const RE2 &pattern,
+                           const int num_submatches, RewriteFn rewrite) {
+  std::vector<re2::StringPiece> submatches(num_submatches);
+  const re2::StringPiece input(str);
+
+  std::string output;
+  std::vector<int64_t> output_begins, output_ends;
+  size_t pos = 0;
+  size_t last_match_end = std::string::npos;
+  while (pos <= str.size() &&
+         pattern.Match(input, pos, str.size(), RE2::UNANCHORED,
+                       submatches.data(), num_submatches)) {
+    const size_t match_start = submatches[0].data() - str.data();
+    const size_t match_end = match_start + submatches[0].size();
+    if (submatches[0].empty() && match_start == last_match_end) {
+      // an empty match right after the previous match is skipped, copy the
+      // next UTF-8 character instead
+      if (match_start == str.size()) {
+        break;
+      }
+      const unsigned char c = str[match_start];
+      const size_t next = std::min(
+          str.size(),
+          match_start + (c >= 0xF0 ? 4 : c >= 0xE0 ? 3 : c >= 0xC0 ? 2 : 1));
+      output.append(str, pos, next - pos);
+      output_begins.insert(output_begins.end(), begins.begin() + pos,
+                           begins.begin() + next);
+      output_ends.insert(output_ends.end(), ends.begin() + pos,
+                         ends.begin() + next);
+      pos = next;
+      continue;
+    }
+
+    output.append(str, pos, match_start - pos);
+    output_begins.insert(output_begins.end(), begins.begin() + pos,
+                         begins.begin() + match_start);
+    output_ends.insert(output_ends.end(), ends.begin() + pos,
+                       ends.begin() + match_start);
+
+    int64_t span_begin, span_end;
+    if (match_end > match_start) {
+      span_begin = begins[match_start];
+      span_end = ends[match_end - 1];
+    } else {
+      span_begin = match_start < str.size()
+                       ? begins[match_start]
+                       : (str.empty() ? 0 : ends[str.size() - 1]);
+      span_end = span_begin;
+    }
+    rewrite(submatches, output);
+    output_begins.resize(output.size(), span_begin);
+    output_ends.resize(output.size(), span_end);
+    pos = match_end;
+    last_match_end = match_end;
+  }
+  if (pos < str.size()) {
+    output.append(str, pos, std::string::npos);
+    output_begins.insert(output_begins.end(), begins.begin() + pos,
+                         begins.end());
+    output_ends.insert(output_ends.end(), ends.begin() + pos, ends.end());
+  }
+  str.swap(output);
+  begins.swap(output_begins);
+  ends.swap(output_ends);
+}
+
+} // namespace
+
 RegexTokenizer::RegexTokenizer(const std::vector<std::string> &patterns,
                                const std::vector<std::string> &replacements,
                                const bool to_lower = false)
@@ -14,33 +152,287 @@ RegexTokenizer::RegexTokenizer(const std::vector<std::string> &patterns,
   for (const auto &pattern : patterns_) {
     compiled_patterns_.push_back(new RE2(pattern));
   }
+  group_patterns_();
 }
 
-std::vector<std::string> RegexTokenizer::forward(std::string str) const {
+// Fusing a run of patterns into one alternation is only valid when applying
+// them one after the other yields the same tokens as a single scan where
+// every match is replaced once. This is the case when no two patterns of the
+// run can match overlapping text and no replacement can create or break a
+// match of a later pattern (whitespace differences are ignored since the
+// output is split on spaces anyway). Patterns that don't satisfy this start a
+// new group and are applied in order, preserving the original semantics.
+void RegexTokenizer::group_patterns_() {
+  std::vector<PatternKind> kinds(patterns_.size());
+  std::vector<std::string> literals(patterns_.size());
+  std::vector<bool> fusable(patterns_.size());
+  for (size_t i = 0; i < patterns_.size(); i++) {
+    kinds[i] = _classify_pattern(patterns_[i], literals[i]);
+    const auto &repl = replacements_[i];
+    fusable[i] =
+        kinds[i] != PatternKind::Other &&
+        repl.find('\\') == std::string::npos &&
+        std::none_of(repl.begin(), repl.end(),
+                     [](char c) { return c != ' ' && _is_space(c); }) &&
+        (kinds[i] != PatternKind::Whitespace ||
+         (!repl.empty() && repl.find_first_not_of(' ') == std::string::npos));
+  }
+
+  auto can_follow = [&](const size_t i, const size_t j) {
+    const auto &repl = replacements_[i];
+    if (kinds[j] == PatternKind::Whitespace) {
+      // a whitespace run can't start in the middle of an earlier literal
+      if (kinds[i] == PatternKind::Literal && _is_space(literals[i][0])) {
+        return false;
+      }
+      // spaces left uncollapsed next to a replacement are only harmless once
+      // no other pattern is applied after this one
+      return j + 1 == patterns_.size() ||
+             (!repl.empty() && !_has_space(repl));
+    }
+    if (kinds[i] == PatternKind::Whitespace && _has_space(literals[j])) {
+      return false;
+    }
+    if (kinds[i] == PatternKind::Literal &&
+        _can_overlap(literals[i], literals[j])) {
+      return false;
+    }
+    // removing text joins its neighbours, which can form a new literal
+    if (repl.empty()) {
+      return literals[j].size() == 1;
+    }
+    return !_can_overlap(repl, literals[j]);
+  };
+
+  size_t begin = 0;
+  while (begin < patterns_.size()) {
+    size_t end = begin + 1;
+    if (fusable[begin]) {
+      while (end < patterns_.size() && fusable[end]) {
+        bool compatible = true;
+        for (size_t i = begin; i < end && compatible; i++) {
+          compatible = can_follow(i, end);
+        }
+        if (!compatible) {
+          break;
+        }
+        end++;
+      }
+    }
+
+    RE2 *fused_pattern = nullptr;
+    if (end - begin > 1) {
+      std::string alternation;
+      for (size_t i = begin; i < end; i++) {
+        alternation += (i == begin ? "(" : "|(") + patterns_[i] + ")";
+      }
+      fused_pattern = new RE2(alternation);
+    }
+    pattern_groups_.emplace_back(begin, end);
+    fused_patterns_.push_back(fused_pattern);
+    begin = end;
+  }
+}
+
+void RegexTokenizer::fused_replace_(std::string &str,
+                                    const size_t group_index) const {
+  const auto &group = pattern_groups_[group_index];
+  const RE2 &fused_pattern = *fused_patterns_[group_index];
+  const int num_submatches = static_cast<int>(group.second - group.first) + 1;
+  std::vector<re2::StringPiece> submatches(num_submatches);
+  const re2::StringPiece input(str);
+
+  std::string output;
+  output.reserve(str.size() + str.size() / 2);
+  size_t pos = 0;
+  while (pos < str.size() &&
+         fused_pattern.Match(input, pos, str.size(), RE2::UNANCHORED,
+                             submatches.data(), num_submatches)) {
+    const size_t match_start = submatches[0].data() - str.data();
+    output.append(str, pos, match_start - pos);
+    for (int i = 1; i < num_submatches; i++) {
+      if (submatches[i].data() != nullptr) {
+        output.append(replacements_[group.first + i - 1]);
+        break;
+      }
+    }
+    // fused patterns never match the empty string
+    pos = match_start + submatches[0].size();
+  }
+  output.append(str, pos, std::string::npos);
+  str.swap(output);
+}
+
+void RegexTokenizer::normalize_(std::string &str) const {
   // str tolower
   if (to_lower_) {
     std::transform(str.begin(), str.end(), str.begin(),
                    [](unsigned char c) { return std::tolower(c); });
   }
 
-  for (size_t i = 0; i < compiled_patterns_.size(); i++) {
-    RE2::GlobalReplace(&str, *compiled_patterns_[i], replacements_[i]);
+  for (size_t i = 0; i < pattern_groups_.size(); i++) {
+    if (fused_patterns_[i] != nullptr) {
+      fused_replace_(str, i);
+    } else {
+      const size_t index = pattern_groups_[i].first;
+      RE2::GlobalReplace(&str, *compiled_patterns_[index],
+                         replacements_[index]);
+    }
   }
+}
 
+std::vector<std::string> RegexTokenizer::forward(std::string str) const {
+  normalize_(str);
   std::vector<std::string> tokens;
   split_(str, tokens);
   return tokens;
 }
 
+// Lines are tokenized independently, so a batch is split across the intra-op
+// thread pool. Launching a task on fewer lines than this is not worth it.
+constexpr int64_t GRAIN_SIZE = 32;
+std::vector<std::vector<std::string>>
+RegexTokenizer::forward_batch(const std::vector<std::string> &lines) const {
+  std::vector<std::vector<std::string>> tokens(lines.size());
+  at::parallel_for(0, lines.size(), GRAIN_SIZE,
+                   [&](int64_t begin, int64_t end) {
+                     for (int64_t i = begin; i < end; i++) {
+                       tokens[i] = forward(lines[i]);
+                     }
+                   });
+  return tokens;
+}
+
+// Tokenizes the lines and looks the tokens up in `vocab` without creating a
+// string per token: each token is copied into a buffer reused for the whole
+// task, which only allocates when a token is longer than every previous one.
+// Returns the ids of all the lines concatenated and the offset of every line.
+std::tuple<torch::Tensor, torch::Tensor>
+RegexTokenizer::forward_ids(const std::vector<std::string> &lines,
+                            const Vocab &vocab) const {
+  const int64_t num_lines = lines.size();
+  std::vector<std::vector<int64_t>> ids(num_lines);
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    std::string str, token;
+    for (int64_t i = begin; i < end; i++) {
+      str.assign(lines[i]);
+      normalize_(str);
+      size_t start = 0;
+      while (start < str.size()) {
+        size_t token_end = str.find(' ', start);
+        if (token_end == std::string::npos) {
+          token_end = str.size();
+        }
+        if (token_end > start) {
+          token.assign(str, start, token_end - start);
+          ids[i].push_back(vocab.__getitem__(token));
+        }
+        start = token_end + 1;
+      }
+    }
+  });
+
+  torch::Tensor offsets = torch::empty({num_lines}, torch::kLong);
+  auto offsets_data = offsets.data_ptr<int64_t>();
+  int64_t num_ids = 0;
+  for (int64_t i = 0; i < num_lines; i++) {
+    offsets_data[i] = num_ids;
+    num_ids += ids[i].size();
+  }
+  torch::Tensor flat_ids = torch::empty({num_ids}, torch::kLong);
+  auto flat_ids_data = flat_ids.data_ptr<int64_t>();
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      std::copy(ids[i].begin(), ids[i].end(), flat_ids_data + offsets_data[i]);
+    }
+  });
+  return std::make_tuple(std::move(flat_ids), std::move(offsets));
+}
+
+std::tuple<std::vector<std::string>, std::vector<int64_t>,
+           std::vector<int64_t>>
+RegexTokenizer::forward_with_offsets(std::string str) const {
+  const std::string input = str;
+  if (to_lower_) {
+    std::transform(str.begin(), str.end(), str.begin(),
+                   [](unsigned char c) { return std::tolower(c); });
+  }
+
+  std::vector<int64_t> begins(str.size()), ends(str.size());
+  for (size_t i = 0; i < str.size(); i++) {
+    begins[i] = i;
+    ends[i] = i + 1;
+  }
+
+  for (size_t i = 0; i < pattern_groups_.size(); i++) {
+    const auto &group = pattern_groups_[i];
+    if (fused_patterns_[i] != nullptr) {
+      _replace_with_offsets(
+          str, begins, ends, *fused_patterns_[i],
+          static_cast<int>(group.second - group.first) + 1,
+          [&](const std::vector<re2::StringPiece> &submatches,
+              std::string &output) {
+            for (size_t j = 1; j < submatches.size(); j++) {
+              if (submatches[j].data() != nullptr) {
+                output.append(replacements_[group.first + j - 1]);
+                break;
+              }
+            }
+          });
+    } else {
+      const RE2 &pattern = *compiled_patterns_[group.first];
+      const std::string &rewrite = replacements_[group.first];
+      _replace_with_offsets(
+          str, begins, ends, pattern, 1 + RE2::MaxSubmatch(rewrite),
+          [&](const std::vector<re2::StringPiece> &submatches,
+              std::string &output) {
+            pattern.Rewrite(&output, rewrite, submatches.data(),
+                            static_cast<int>(submatches.size()));
+          });
+    }
+  }
+
+  std::vector<std::string> tokens;
+  std::vector<int64_t> start_offsets, end_offsets;
+  split_with_offsets_(str, begins, ends, tokens, start_offsets, end_offsets);
+  impl::byte_to_char_offsets(input, start_offsets);
+  impl::byte_to_char_offsets(input, end_offsets);
+  return std::make_tuple(std::move(tokens), std::move(start_offsets),
+                         std::move(end_offsets));
+}
+
 void RegexTokenizer::split_(std::string &str, std::vector<std::string> &tokens,
                             const char &delimiter) const {
-  std::stringstream ss(str);
-  std::string token;
+  size_t start = 0;
+  while (start < str.size()) {
+    size_t end = str.find(delimiter, start);
+    if (end == std::string::npos) {
+      end = str.size();
+    }
+    if (end > start) {
+      tokens.emplace_back(str, start, end - start);
+    }
+    start = end + 1;
+  }
+}
 
-  while (std::getline(ss, token, delimiter)) {
-    if (!token.empty()) {
-      tokens.push_back(token);
+void RegexTokenizer::split_with_offsets_(
+    std::string &str, const std::vector<int64_t> &begins,
+    const std::vector<int64_t> &ends, std::vector<std::string> &tokens,
+    std::vector<int64_t> &start_offsets, std::vector<int64_t> &end_offsets,
+    const char &delimiter) const {
+  size_t start = 0;
+  while (start < str.size()) {
+    size_t end = str.find(delimiter, start);
+    if (end == std::string::npos) {
+      end = str.size();
+    }
+    if (end > start) {
+      tokens.emplace_back(str, start, end - start);
+      start_offsets.push_back(begins[start]);
+      end_offsets.push_back(ends[end - 1]);
     }
+    start = end + 1;
   }
 }
 
@@ -3,11 +3,28 @@
 
 namespace torchtext {
 
+struct Vocab;
+
 struct RegexTokenizer : torch::CustomClassHolder {
 private:
   std::vector<RE2 *> compiled_patterns_;
+  // Consecutive patterns whose sequential application can be replaced by a
+  // single left-to-right scan are grouped together. Each group is stored as a
+  // [begin, end) range into `patterns_` and an alternation of its patterns
+  // (nullptr for groups holding a single pattern).
+  std::vector<std::pair<size_t, size_t>> pattern_groups_;
+  std::vector<RE2 *> fused_patterns_;
+  void group_patterns_();
+  void normalize_(std::string &str) const;
+  void fused_replace_(std::string &str, const size_t group_index) const;
   void split_(std::string &str, std::vector<std::string> &tokens,
               const char &delimiter = ' ') const;
+  void split_with_offsets_(std::string &str, const std::vector<int64_t> &begins,
+                           const std::vector<int64_t> &ends,
+                           std::vector<std::string> &tokens,
+                           std::vector<int64_t> &start_offsets,
+                           std::vector<int64_t> &end_offsets,
+                           const char &delimiter = ' ') const;
 
 public:
   std::vector<std::string> patterns_;
@@ -18,6 +35,13 @@ public:
                           const std::vector<std::string> &replacements,
                           const bool to_lower);
   std::vector<std::string> forward(std::string str) const;
+  std::vector<std::vector<std::string>>
+  forward_batch(const std::vector<std::string> &lines) const;
+  std::tuple<std::vector<std::string>, std::vector<int64_t>,
+             std::vector<int64_t>>
+  forward_with_offsets(std::string str) const;
+  std::tuple<torch::Tensor, torch::Tensor>
+  forward_ids(const std::vector<std::string> &lines, const Vocab &vocab) const;
 };
 
 } // namespace torchtext
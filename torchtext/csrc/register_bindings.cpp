@@ -1,16 +1,63 @@
+#include <bpe_tokenizer.h> // @manual
+#include <ngrams.h>        // @manual
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <regex.h>
 #include <regex_tokenizer.h>         // @manual
 #include <sentencepiece.h>           // @manual
+#include <tokenizer_cache.h>         // @manual
 #include <torch/csrc/utils/pybind.h> // @manual
 #include <torch/script.h>
 #include <vectors.h> // @manual
-#include <vocab.h>   // @manual
+#include <vocab.h>               // @manual
+#include <wordpiece_tokenizer.h> // @manual
 
 namespace torchtext {
 
 namespace py = pybind11;
+
+namespace {
+// Feeds the sentences of a Python iterator to the SentencePiece trainer. The
+// trainer runs with the GIL released, so it is acquired for every sentence.
+class PySentenceIterator : public ::sentencepiece::SentenceIterator {
+public:
+  explicit PySentenceIterator(py::iterator iterator)
+      : iterator_(std::move(iterator)) {
+    Next();
+  }
+
+  bool done() const override { return done_; }
+  const std::string &value() const override { return value_; }
+  ::sentencepiece::util::Status status() const override { return status_; }
+
+  void Next() override {
+    py::gil_scoped_acquire acquire;
+    try {
+      py::object item =
+          py::reinterpret_steal<py::object>(PyIter_Next(iterator_.ptr()));
+      if (!item) {
+        if (PyErr_Occurred()) {
+          throw py::error_already_set();
+        }
+        done_ = true;
+        return;
+      }
+      value_ = item.cast<std::string>();
+    } catch (const std::exception &e) {
+      status_ = ::sentencepiece::util::Status(
+          ::sentencepiece::util::StatusCode::kInternal, e.what());
+      done_ = true;
+    }
+  }
+
+private:
+  py::iterator iterator_;
+  std::string value_;
+  ::sentencepiece::util::Status status_;
+  bool done_ = false;
+};
+} // namespace
+
 // Registers our custom classes with pybind11.
 PYBIND11_MODULE(_torchtext, m) {
   // Classes
@@ -23,17 +70,79 @@ PYBIND11_MODULE(_torchtext, m) {
       .def_readonly("replacements_", &RegexTokenizer::replacements_)
       .def_readonly("to_lower_", &RegexTokenizer::to_lower_)
       .def(py::init<std::vector<std::string>, std::vector<std::string>, bool>())
-      .def("forward", &RegexTokenizer::forward);
+      .def("forward", &RegexTokenizer::forward)
+      .def("forward_batch", &RegexTokenizer::forward_batch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("forward_with_offsets", &RegexTokenizer::forward_with_offsets)
+      .def("forward_ids", &RegexTokenizer::forward_ids,
+           py::call_guard<py::gil_scoped_release>());
 
   py::class_<SentencePiece>(m, "SentencePiece")
       .def("Encode", &SentencePiece::Encode)
       .def("EncodeAsIds", &SentencePiece::EncodeAsIds)
       .def("EncodeAsPieces", &SentencePiece::EncodeAsPieces)
+      .def("EncodeWithOffsets", &SentencePiece::EncodeWithOffsets)
+      .def("EncodeBatch", &SentencePiece::EncodeBatch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("NBestEncodeAsIds", &SentencePiece::NBestEncodeAsIds)
+      .def("SampleEncodeBatch", &SentencePiece::SampleEncodeBatch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("DecodeIds", &SentencePiece::DecodeIds)
+      .def("DecodePieces", &SentencePiece::DecodePieces)
+      .def("DecodeBatch", &SentencePiece::DecodeBatch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("DecodePiecesBatch", &SentencePiece::DecodePiecesBatch,
+           py::call_guard<py::gil_scoped_release>())
       .def("GetPieceSize", &SentencePiece::GetPieceSize)
       .def("unk_id", &SentencePiece::unk_id)
       .def("PieceToId", &SentencePiece::PieceToId)
       .def("IdToPiece", &SentencePiece::IdToPiece);
 
+  py::class_<TokenizerCache>(m, "TokenizerCache")
+      .def(py::init<int64_t>())
+      .def_readonly("max_bytes_", &TokenizerCache::max_bytes_)
+      .def("get", &TokenizerCache::get)
+      .def("put", &TokenizerCache::put)
+      .def("clear", &TokenizerCache::clear)
+      .def("hits", &TokenizerCache::hits)
+      .def("misses", &TokenizerCache::misses)
+      .def("num_bytes", &TokenizerCache::num_bytes)
+      .def("__len__", &TokenizerCache::__len__);
+
+  py::class_<WordPieceTokenizer>(m, "WordPieceTokenizer")
+      .def(py::init<std::vector<std::string>, std::string, bool, int64_t>())
+      .def_property_readonly(
+          "itos_",
+          [](const WordPieceTokenizer &self) { return self.vocab_.itos_; })
+      .def_property_readonly(
+          "unk_token_",
+          [](const WordPieceTokenizer &self) { return self.vocab_.unk_token_; })
+      .def_readonly("to_lower_", &WordPieceTokenizer::to_lower_)
+      .def_readonly("max_input_chars_per_word_",
+                    &WordPieceTokenizer::max_input_chars_per_word_)
+      .def("forward", &WordPieceTokenizer::forward)
+      .def("forward_batch", &WordPieceTokenizer::forward_batch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("forward_with_offsets", &WordPieceTokenizer::forward_with_offsets)
+      .def("forward_ids", &WordPieceTokenizer::forward_ids,
+           py::call_guard<py::gil_scoped_release>());
+
+  py::class_<BPETokenizer>(m, "BPETokenizer")
+      .def(py::init<std::vector<std::string>, std::vector<std::string>,
+                    std::string, int64_t>())
+      .def_readonly("merges_", &BPETokenizer::merges_)
+      .def_property_readonly(
+          "itos_", [](const BPETokenizer &self) { return self.vocab_.itos_; })
+      .def_property_readonly(
+          "unk_token_",
+          [](const BPETokenizer &self) { return self.vocab_.unk_token_; })
+      .def("cache_max_bytes", &BPETokenizer::cache_max_bytes)
+      .def("forward", &BPETokenizer::forward)
+      .def("forward_batch", &BPETokenizer::forward_batch,
+           py::call_guard<py::gil_scoped_release>())
+      .def("forward_ids", &BPETokenizer::forward_ids,
+           py::call_guard<py::gil_scoped_release>());
+
   py::class_<Vectors>(m, "Vectors")
       .def(py::init<std::vector<std::string>, std::vector<int64_t>,
                     torch::Tensor, torch::Tensor>())
@@ -64,6 +173,26 @@ PYBIND11_MODULE(_torchtext, m) {
         &_load_token_and_vectors_from_file);
   m.def("_load_vocab_from_file", &_load_vocab_from_file);
   m.def("_load_vocab_from_raw_text_file", _load_vocab_from_raw_text_file);
+  m.def("_train_sp_model",
+        [](const std::unordered_map<std::string, std::string> &options) {
+          std::string serialized_model;
+          {
+            py::gil_scoped_release release;
+            serialized_model = _train_sp_model(options);
+          }
+          return py::bytes(serialized_model);
+        });
+  m.def("_train_sp_model_from_iterator",
+        [](py::iterator sentences,
+           const std::unordered_map<std::string, std::string> &options) {
+          PySentenceIterator sentence_iterator(std::move(sentences));
+          std::string serialized_model;
+          {
+            py::gil_scoped_release release;
+            serialized_model = _train_sp_model(options, &sentence_iterator);
+          }
+          return py::bytes(serialized_model);
+        });
 }
 
 // Registers our custom classes with torch.
@@ -86,6 +215,14 @@ static auto regex_tokenizer =
         .def(torch::init<std::vector<std::string>, std::vector<std::string>,
                          bool>())
         .def("forward", &RegexTokenizer::forward)
+        .def("forward_batch", &RegexTokenizer::forward_batch)
+        .def("forward_with_offsets", &RegexTokenizer::forward_with_offsets)
+        .def("forward_ids",
+             [](const c10::intrusive_ptr<RegexTokenizer> &self,
+                const std::vector<std::string> &lines,
+                const c10::intrusive_ptr<Vocab> &vocab) {
+               return self->forward_ids(lines, *vocab);
+             })
         .def_pickle(
             // __setstate__
             [](const c10::intrusive_ptr<RegexTokenizer> &self)
@@ -111,6 +248,14 @@ static auto sentencepiece =
         .def("Encode", &SentencePiece::Encode)
         .def("EncodeAsIds", &SentencePiece::EncodeAsIds)
         .def("EncodeAsPieces", &SentencePiece::EncodeAsPieces)
+        .def("EncodeWithOffsets", &SentencePiece::EncodeWithOffsets)
+        .def("EncodeBatch", &SentencePiece::EncodeBatch)
+        .def("NBestEncodeAsIds", &SentencePiece::NBestEncodeAsIds)
+        .def("SampleEncodeBatch", &SentencePiece::SampleEncodeBatch)
+        .def("DecodeIds", &SentencePiece::DecodeIds)
+        .def("DecodePieces", &SentencePiece::DecodePieces)
+        .def("DecodeBatch", &SentencePiece::DecodeBatch)
+        .def("DecodePiecesBatch", &SentencePiece::DecodePiecesBatch)
         .def("GetPieceSize", &SentencePiece::GetPieceSize)
         .def("unk_id", &SentencePiece::unk_id)
         .def("PieceToId", &SentencePiece::PieceToId)
@@ -118,13 +263,33 @@ static auto sentencepiece =
         .def_pickle(
             // __setstate__
             [](const c10::intrusive_ptr<SentencePiece> &self) -> std::string {
-              return self->content_;
+              return self->GetSerializedModel();
             },
             // __getstate__
             [](std::string state) -> c10::intrusive_ptr<SentencePiece> {
               return c10::make_intrusive<SentencePiece>(std::move(state));
             });
 
+static auto tokenizer_cache =
+    torch::class_<TokenizerCache>("torchtext", "TokenizerCache")
+        .def(torch::init<int64_t>())
+        .def("get", &TokenizerCache::get)
+        .def("put", &TokenizerCache::put)
+        .def("clear", &TokenizerCache::clear)
+        .def("hits", &TokenizerCache::hits)
+        .def("misses", &TokenizerCache::misses)
+        .def("num_bytes", &TokenizerCache::num_bytes)
+        .def("__len__", &TokenizerCache::__len__)
+        .def_pickle(
+            // __setstate__
+            [](const c10::intrusive_ptr<TokenizerCache> &self) -> int64_t {
+              return self->max_bytes_;
+            },
+            // __getstate__
+            [](int64_t state) -> c10::intrusive_ptr<TokenizerCache> {
+              return c10::make_intrusive<TokenizerCache>(state);
+            });
+
 static auto vocab =
     torch::class_<Vocab>("torchtext", "Vocab")
         .def(torch::init<StringList, std::string>())
@@ -147,6 +312,58 @@ static auto vocab =
               return _get_vocab_from_states(states);
             });
 
+static auto wordpiece_tokenizer =
+    torch::class_<WordPieceTokenizer>("torchtext", "WordPieceTokenizer")
+        .def(torch::init<std::vector<std::string>, std::string, bool,
+                         int64_t>())
+        .def("forward", &WordPieceTokenizer::forward)
+        .def("forward_batch", &WordPieceTokenizer::forward_batch)
+        .def("forward_with_offsets", &WordPieceTokenizer::forward_with_offsets)
+        .def("forward_ids", &WordPieceTokenizer::forward_ids)
+        .def_pickle(
+            // __setstate__
+            [](const c10::intrusive_ptr<WordPieceTokenizer> &self)
+                -> std::tuple<std::vector<std::string>, std::string, bool,
+                              int64_t> {
+              return std::make_tuple(self->vocab_.itos_,
+                                     self->vocab_.unk_token_, self->to_lower_,
+                                     self->max_input_chars_per_word_);
+            },
+            // __getstate__
+            [](std::tuple<std::vector<std::string>, std::string, bool, int64_t>
+                   states) -> c10::intrusive_ptr<WordPieceTokenizer> {
+              return c10::make_intrusive<WordPieceTokenizer>(
+                  std::move(std::get<0>(states)),
+                  std::move(std::get<1>(states)), std::get<2>(states),
+                  std::get<3>(states));
+            });
+
+static auto bpe_tokenizer =
+    torch::class_<BPETokenizer>("torchtext", "BPETokenizer")
+        .def(torch::init<std::vector<std::string>, std::vector<std::string>,
+                         std::string, int64_t>())
+        .def("forward", &BPETokenizer::forward)
+        .def("forward_batch", &BPETokenizer::forward_batch)
+        .def("forward_ids", &BPETokenizer::forward_ids)
+        .def_pickle(
+            // __setstate__
+            [](const c10::intrusive_ptr<BPETokenizer> &self)
+                -> std::tuple<std::vector<std::string>,
+                              std::vector<std::string>, std::string, int64_t> {
+              return std::make_tuple(self->merges_, self->vocab_.itos_,
+                                     self->vocab_.unk_token_,
+                                     self->cache_max_bytes());
+            },
+            // __getstate__
+            [](std::tuple<std::vector<std::string>, std::vector<std::string>,
+                          std::string, int64_t>
+                   states) -> c10::intrusive_ptr<BPETokenizer> {
+              return c10::make_intrusive<BPETokenizer>(
+                  std::move(std::get<0>(states)),
+                  std::move(std::get<1>(states)),
+                  std::move(std::get<2>(states)), std::get<3>(states));
+            });
+
 static auto vectors =
     torch::class_<Vectors>("torchtext", "Vectors")
         .def(torch::init<std::vector<std::string>, std::vector<std::int64_t>,
@@ -169,6 +386,7 @@ static auto vectors =
 static auto registry =
     torch::RegisterOperators()
         .op("torchtext::generate_sp_model", &generate_sp_model)
+        .op("torchtext::hashed_ngrams", &hashed_ngrams)
         .op(torch::RegisterOperators::options()
                 .schema("torchtext::load_sp_model(str path) -> "
                         "__torch__.torch.classes.torchtext.SentencePiece model")
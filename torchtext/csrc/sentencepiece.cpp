@@ -1,15 +1,36 @@
-#include <sentencepiece.h> // @manual
+#include <ATen/Parallel.h> // @manual
+#include <cmath>
+#include <common.h>
+#include <mutex>
+#include <random>
+#include <unordered_map>
+#include <sentencepiece.h>    // @manual
+#include <sentencepiece.pb.h> // @manual
+
+#ifndef _MSC_VER
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 
 namespace torchtext {
 
-SentencePiece::SentencePiece(const std::string &content) : content_(content) {
-  const auto status = processor_.LoadFromSerializedProto(content_);
+SentencePiece::SentencePiece(const std::string &content)
+    : SentencePiece(content.data(), content.size()) {}
+
+SentencePiece::SentencePiece(const char *data, const size_t size) {
+  const auto status = processor_.LoadFromSerializedProto({data, size});
   if (!status.ok()) {
     throw std::runtime_error("Failed to load SentencePiece model. Error: " +
                              status.ToString());
   }
 }
 
+std::string SentencePiece::GetSerializedModel() const {
+  return processor_.model_proto().SerializeAsString();
+}
+
 std::vector<std::string> SentencePiece::Encode(const std::string &input) const {
   std::vector<std::string> pieces;
   processor_.Encode(input, &pieces);
@@ -27,6 +48,230 @@ SentencePiece::EncodeAsPieces(const std::string &input) const {
   return processor_.EncodeAsPieces(input);
 }
 
+std::tuple<std::vector<std::string>, std::vector<int64_t>,
+           std::vector<int64_t>>
+SentencePiece::EncodeWithOffsets(const std::string &input) const {
+  ::sentencepiece::SentencePieceText spt;
+  const auto status = processor_.Encode(input, &spt);
+  if (!status.ok()) {
+    throw std::runtime_error("Failed to encode input. Error: " +
+                             status.ToString());
+  }
+
+  std::vector<std::string> pieces;
+  std::vector<int64_t> start_offsets, end_offsets;
+  pieces.reserve(spt.pieces_size());
+  start_offsets.reserve(spt.pieces_size());
+  end_offsets.reserve(spt.pieces_size());
+  for (const auto &piece : spt.pieces()) {
+    pieces.push_back(piece.piece());
+    start_offsets.push_back(piece.begin());
+    end_offsets.push_back(piece.end());
+  }
+  impl::byte_to_char_offsets(input, start_offsets);
+  impl::byte_to_char_offsets(input, end_offsets);
+  return std::make_tuple(std::move(pieces), std::move(start_offsets),
+                         std::move(end_offsets));
+}
+
+// Launching a task on fewer lines than this is not worth it.
+constexpr int64_t GRAIN_SIZE = 32;
+std::tuple<torch::Tensor, torch::Tensor>
+SentencePiece::EncodeBatch(const std::vector<std::string> &inputs,
+                           const std::string &out_type) const {
+  TORCH_CHECK(out_type == "padded" || out_type == "flat",
+              "Expected `out_type` to be 'padded' or 'flat' but found: " +
+                  out_type);
+
+  const int64_t batch_size = inputs.size();
+  std::vector<std::vector<int>> ids(batch_size);
+  at::parallel_for(0, batch_size, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      const auto status = processor_.Encode(inputs[i], &ids[i]);
+      TORCH_CHECK(status.ok(),
+                  "Failed to encode input. Error: " + status.ToString());
+    }
+  });
+
+  // lengths of the lines for "padded", start offsets of the lines for "flat"
+  torch::Tensor sizes = torch::empty({batch_size}, torch::kLong);
+  auto sizes_data = sizes.data_ptr<int64_t>();
+  int64_t max_length = 0, num_ids = 0;
+  for (int64_t i = 0; i < batch_size; i++) {
+    const int64_t length = ids[i].size();
+    sizes_data[i] = out_type == "padded" ? length : num_ids;
+    max_length = std::max(max_length, length);
+    num_ids += length;
+  }
+
+  torch::Tensor output;
+  if (out_type == "padded") {
+    const int64_t pad_id = processor_.pad_id() >= 0 ? processor_.pad_id() : 0;
+    output = torch::full({batch_size, max_length}, pad_id, torch::kLong);
+  } else {
+    output = torch::empty({num_ids}, torch::kLong);
+  }
+  auto output_data = output.data_ptr<int64_t>();
+  at::parallel_for(0, batch_size, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      const int64_t start =
+          out_type == "padded" ? i * max_length : sizes_data[i];
+      std::copy(ids[i].begin(), ids[i].end(), output_data + start);
+    }
+  });
+  return std::make_tuple(std::move(output), std::move(sizes));
+}
+
+std::vector<std::vector<int64_t>>
+SentencePiece::NBestEncodeAsIds(const std::string &input,
+                                const int64_t nbest_size) const {
+  ::sentencepiece::NBestSentencePieceText nbest_spt;
+  const auto status = processor_.NBestEncode(input, nbest_size, &nbest_spt);
+  TORCH_CHECK(status.ok(),
+              "Failed to encode input. Error: " + status.ToString());
+
+  std::vector<std::vector<int64_t>> nbests;
+  nbests.reserve(nbest_spt.nbests_size());
+  for (const auto &spt : nbest_spt.nbests()) {
+    std::vector<int64_t> ids;
+    ids.reserve(spt.pieces_size());
+    for (const auto &piece : spt.pieces()) {
+      ids.push_back(piece.id());
+    }
+    nbests.push_back(std::move(ids));
+  }
+  return nbests;
+}
+
+// Samples one segmentation of each line among its `nbest_size` best ones,
+// with probabilities proportional to exp(alpha * score), as SentencePiece's
+// own SampleEncode does. Every line draws from its own generator seeded with
+// (seed, line index), so the output only depends on `seed` and not on how
+// lines are spread over threads.
+std::vector<std::vector<int64_t>>
+SentencePiece::SampleEncodeBatch(const std::vector<std::string> &inputs,
+                                 const int64_t nbest_size, const double alpha,
+                                 const int64_t seed) const {
+  TORCH_CHECK(nbest_size >= 0,
+              "Sampling from the full lattice (nbest_size < 0) cannot be "
+              "seeded, expected `nbest_size` >= 0 but found: ",
+              nbest_size);
+
+  const int64_t batch_size = inputs.size();
+  std::vector<std::vector<int64_t>> ids(batch_size);
+  at::parallel_for(0, batch_size, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    ::sentencepiece::NBestSentencePieceText nbest_spt;
+    std::vector<double> weights;
+    for (int64_t i = begin; i < end; i++) {
+      if (nbest_size <= 1) {
+        std::vector<int> line_ids;
+        const auto status = processor_.Encode(inputs[i], &line_ids);
+        TORCH_CHECK(status.ok(),
+                    "Failed to encode input. Error: " + status.ToString());
+        ids[i].assign(line_ids.begin(), line_ids.end());
+        continue;
+      }
+
+      const auto status =
+          processor_.NBestEncode(inputs[i], nbest_size, &nbest_spt);
+      TORCH_CHECK(status.ok(),
+                  "Failed to encode input. Error: " + status.ToString());
+      if (nbest_spt.nbests_size() == 0) {
+        continue;
+      }
+
+      // scores are log probabilities, shift them by the best one so that
+      // the weights do not underflow
+      double max_score = nbest_spt.nbests(0).score();
+      for (const auto &spt : nbest_spt.nbests()) {
+        max_score = std::max(max_score, static_cast<double>(spt.score()));
+      }
+      weights.clear();
+      for (const auto &spt : nbest_spt.nbests()) {
+        weights.push_back(std::exp(alpha * (spt.score() - max_score)));
+      }
+
+      std::seed_seq seed_seq{static_cast<uint32_t>(seed),
+                             static_cast<uint32_t>(seed >> 32),
+                             static_cast<uint32_t>(i),
+                             static_cast<uint32_t>(i >> 32)};
+      std::mt19937 generator(seed_seq);
+      std::discrete_distribution<int> distribution(weights.begin(),
+                                                   weights.end());
+      const auto &sampled = nbest_spt.nbests(distribution(generator));
+      ids[i].reserve(sampled.pieces_size());
+      for (const auto &piece : sampled.pieces()) {
+        ids[i].push_back(piece.id());
+      }
+    }
+  });
+  return ids;
+}
+
+std::string SentencePiece::DecodeIds(const std::vector<int64_t> &ids) const {
+  std::string text;
+  const auto status =
+      processor_.Decode(std::vector<int>(ids.begin(), ids.end()), &text);
+  TORCH_CHECK(status.ok(),
+              "Failed to decode input. Error: " + status.ToString());
+  return text;
+}
+
+std::string
+SentencePiece::DecodePieces(const std::vector<std::string> &pieces) const {
+  std::string text;
+  const auto status = processor_.Decode(pieces, &text);
+  TORCH_CHECK(status.ok(),
+              "Failed to decode input. Error: " + status.ToString());
+  return text;
+}
+
+std::vector<std::string>
+SentencePiece::DecodeBatch(const torch::Tensor &ids,
+                           const torch::Tensor &lengths) const {
+  TORCH_CHECK(ids.dim() == 2, "Expected `ids` to be a 2D tensor but found ",
+              ids.dim(), " dimensions");
+  TORCH_CHECK(lengths.dim() == 1 && lengths.size(0) == ids.size(0),
+              "Expected `lengths` to be a 1D tensor of size ", ids.size(0));
+
+  const auto ids_long = ids.to(torch::kLong).contiguous();
+  const auto lengths_long = lengths.to(torch::kLong).contiguous();
+  const auto ids_data = ids_long.data_ptr<int64_t>();
+  const auto lengths_data = lengths_long.data_ptr<int64_t>();
+  const int64_t batch_size = ids.size(0), max_length = ids.size(1);
+  for (int64_t i = 0; i < batch_size; i++) {
+    TORCH_CHECK(lengths_data[i] >= 0 && lengths_data[i] <= max_length,
+                "Length ", lengths_data[i], " of line ", i,
+                " is out of range [0, ", max_length, "]");
+  }
+
+  std::vector<std::string> texts(batch_size);
+  at::parallel_for(0, batch_size, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      const auto line = ids_data + i * max_length;
+      const auto status = processor_.Decode(
+          std::vector<int>(line, line + lengths_data[i]), &texts[i]);
+      TORCH_CHECK(status.ok(),
+                  "Failed to decode input. Error: " + status.ToString());
+    }
+  });
+  return texts;
+}
+
+std::vector<std::string> SentencePiece::DecodePiecesBatch(
+    const std::vector<std::vector<std::string>> &pieces) const {
+  const int64_t batch_size = pieces.size();
+  std::vector<std::string> texts(batch_size);
+  at::parallel_for(0, batch_size, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      const auto status = processor_.Decode(pieces[i], &texts[i]);
+      TORCH_CHECK(status.ok(),
+                  "Failed to decode input. Error: " + status.ToString());
+    }
+  });
+  return texts;
+}
+
 int64_t SentencePiece::GetPieceSize() const {
   return processor_.GetPieceSize();
 }
@@ -54,7 +299,27 @@ void generate_sp_model(const std::string &filename, const int64_t &vocab_size,
   }
 }
 
-c10::intrusive_ptr<SentencePiece> load_sp_model(const std::string &path) {
+// Trains a SentencePiece model with the given trainer options, reading the
+// sentences from `sentence_iterator` when one is given. The model is written to
+// files when a "model_prefix" option is given, otherwise it is returned
+// serialized.
+std::string
+_train_sp_model(const std::unordered_map<std::string, std::string> &options,
+                ::sentencepiece::SentenceIterator *sentence_iterator) {
+  std::string serialized_model;
+  const bool serialize = options.find("model_prefix") == options.end();
+  const auto status = ::sentencepiece::SentencePieceTrainer::Train(
+      options, sentence_iterator, serialize ? &serialized_model : nullptr);
+  if (!status.ok()) {
+    throw std::runtime_error("Failed to train SentencePiece model. Error: " +
+                             status.ToString());
+  }
+  return serialized_model;
+}
+
+namespace {
+#ifdef _MSC_VER
+c10::intrusive_ptr<SentencePiece> _read_sp_model(const std::string &path) {
   std::ifstream file(path, std::ios::binary | std::ios::in);
   if (!file) {
     throw std::runtime_error("Failed to open file :" + path);
@@ -63,5 +328,89 @@ c10::intrusive_ptr<SentencePiece> load_sp_model(const std::string &path) {
                       std::istreambuf_iterator<char>());
   return c10::make_intrusive<SentencePiece>(std::move(content));
 }
+#else
+// A read-only mapping of a whole file, unmapped on destruction. Models are
+// parsed straight from the mapped file, so that they are not copied into an
+// intermediate buffer.
+struct MappedFile {
+  explicit MappedFile(const std::string &path) {
+    const int fd = open(path.c_str(), O_RDONLY);
+    if (fd < 0) {
+      throw std::runtime_error("Failed to open file :" + path);
+    }
+    struct stat file_stat;
+    if (fstat(fd, &file_stat) != 0) {
+      close(fd);
+      throw std::runtime_error("Failed to stat file :" + path);
+    }
+    size = file_stat.st_size;
+    if (size == 0) {
+      close(fd);
+      return;
+    }
+    void *mapped = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (mapped == MAP_FAILED) {
+      throw std::runtime_error("Failed to map file :" + path);
+    }
+    data = static_cast<const char *>(mapped);
+  }
+  ~MappedFile() {
+    if (data != nullptr) {
+      munmap(const_cast<char *>(data), size);
+    }
+  }
+  MappedFile(const MappedFile &) = delete;
+  MappedFile &operator=(const MappedFile &) = delete;
+
+  const char *data = nullptr;
+  size_t size = 0;
+};
+
+// 64-bit FNV-1a hash of the content of a model file.
+uint64_t _hash_bytes(const char *data, const size_t size) {
+  uint64_t hash = 14695981039346656037ULL;
+  for (size_t i = 0; i < size; ++i) {
+    hash ^= static_cast<unsigned char>(data[i]);
+    hash *= 1099511628211ULL;
+  }
+  return hash;
+}
+
+// Models loaded from files of the same content are shared within the process
+// for as long as one of them is alive. The content is hashed rather than the
+// file stat compared, since a file rewritten with the same size within the
+// resolution of its modification time would look unchanged.
+std::mutex loaded_models_mutex;
+std::unordered_map<std::string, c10::weak_intrusive_ptr<SentencePiece>>
+    loaded_models;
+#endif
+} // namespace
+
+c10::intrusive_ptr<SentencePiece> load_sp_model(const std::string &path) {
+#ifdef _MSC_VER
+  return _read_sp_model(path);
+#else
+  const MappedFile file(path);
+  const std::string key = std::to_string(file.size) + ":" +
+                          std::to_string(_hash_bytes(file.data, file.size));
+
+  std::lock_guard<std::mutex> lock(loaded_models_mutex);
+  auto it = loaded_models.find(key);
+  if (it != loaded_models.end()) {
+    if (auto model = it->second.lock()) {
+      return model;
+    }
+  }
+
+  // drop the entries of the models which are not alive anymore
+  for (auto entry = loaded_models.begin(); entry != loaded_models.end();) {
+    entry = entry->second.expired() ? loaded_models.erase(entry) : ++entry;
+  }
+  auto model = c10::make_intrusive<SentencePiece>(file.data, file.size);
+  loaded_models.emplace(key, c10::weak_intrusive_ptr<SentencePiece>(model));
+  return model;
+#endif
+}
 
 } // namespace torchtext
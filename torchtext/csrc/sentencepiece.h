@@ -9,17 +9,33 @@ private:
   sentencepiece::SentencePieceProcessor processor_;
 
 public:
-  // content_ holds the serialized model data passed at the initialization.
-  // We need this because the underlying SentencePieceProcessor class does not
-  // provide serialization mechanism, yet we still need to be able to serialize
-  // the model so that we can save the scripted object. pickle will get the
-  // serialized model from this content_ member, thus it needs to be public.
-  const std::string content_;
-
+  // The serialized model data is not kept after parsing: pickle gets it back
+  // from the parsed model with GetSerializedModel, so that a model only lives
+  // once in memory.
   explicit SentencePiece(const std::string &content);
+  SentencePiece(const char *data, const size_t size);
+  std::string GetSerializedModel() const;
   std::vector<std::string> Encode(const std::string &input) const;
   std::vector<int64_t> EncodeAsIds(const std::string &input) const;
   std::vector<std::string> EncodeAsPieces(const std::string &input) const;
+  std::tuple<std::vector<std::string>, std::vector<int64_t>,
+             std::vector<int64_t>>
+  EncodeWithOffsets(const std::string &input) const;
+  std::tuple<torch::Tensor, torch::Tensor>
+  EncodeBatch(const std::vector<std::string> &inputs,
+              const std::string &out_type) const;
+  std::vector<std::vector<int64_t>>
+  NBestEncodeAsIds(const std::string &input, const int64_t nbest_size) const;
+  std::vector<std::vector<int64_t>>
+  SampleEncodeBatch(const std::vector<std::string> &inputs,
+                    const int64_t nbest_size, const double alpha,
+                    const int64_t seed) const;
+  std::string DecodeIds(const std::vector<int64_t> &ids) const;
+  std::string DecodePieces(const std::vector<std::string> &pieces) const;
+  std::vector<std::string> DecodeBatch(const torch::Tensor &ids,
+                                       const torch::Tensor &lengths) const;
+  std::vector<std::string>
+  DecodePiecesBatch(const std::vector<std::vector<std::string>> &pieces) const;
   int64_t GetPieceSize() const;
   int64_t unk_id() const;
   int64_t PieceToId(const std::string &piece) const;
@@ -29,6 +45,9 @@ public:
 void generate_sp_model(const std::string &filename, const int64_t &vocab_size,
                        const std::string &model_type,
                        const std::string &model_prefix);
+std::string
+_train_sp_model(const std::unordered_map<std::string, std::string> &options,
+                ::sentencepiece::SentenceIterator *sentence_iterator = nullptr);
 c10::intrusive_ptr<SentencePiece> load_sp_model(const std::string &path);
 
 } // namespace torchtext
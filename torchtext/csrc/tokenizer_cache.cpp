@@ -0,0 +1,114 @@
+#include <tokenizer_cache.h> // @manual
+
+namespace torchtext {
+
+namespace {
+// rough per entry bookkeeping cost (list node, index node, string headers)
+constexpr int64_t ENTRY_OVERHEAD_BYTES = 96;
+
+int64_t _entry_bytes(const std::string &key,
+                     const std::vector<std::string> &tokens) {
+  int64_t num_bytes = ENTRY_OVERHEAD_BYTES + key.size();
+  for (const auto &token : tokens) {
+    num_bytes += sizeof(std::string) + token.size();
+  }
+  return num_bytes;
+}
+} // namespace
+
+TokenizerCache::TokenizerCache(const int64_t max_bytes)
+    : max_bytes_(max_bytes) {
+  TORCH_CHECK(max_bytes >= 0, "Expected `max_bytes` to be non-negative!");
+}
+
+TokenizerCache::EntryIterator TokenizerCache::find_(const size_t hash,
+                                                    const std::string &key) {
+  const auto range = index_.equal_range(hash);
+  for (auto it = range.first; it != range.second; ++it) {
+    // different strings can share a hash, compare the keys as well
+    if (it->second->key == key) {
+      return it->second;
+    }
+  }
+  return entries_.end();
+}
+
+void TokenizerCache::erase_(const size_t hash, EntryIterator entry) {
+  const auto range = index_.equal_range(hash);
+  for (auto it = range.first; it != range.second; ++it) {
+    if (it->second == entry) {
+      index_.erase(it);
+      break;
+    }
+  }
+  num_bytes_ -= entry->num_bytes;
+  entries_.erase(entry);
+}
+
+c10::optional<std::vector<std::string>>
+TokenizerCache::get(const std::string &key) {
+  const size_t hash = std::hash<std::string>{}(key);
+  std::lock_guard<std::mutex> lock(mutex_);
+  auto entry = find_(hash, key);
+  if (entry == entries_.end()) {
+    misses_++;
+    return c10::nullopt;
+  }
+  hits_++;
+  entries_.splice(entries_.begin(), entries_, entry);
+  return entry->tokens;
+}
+
+void TokenizerCache::put(const std::string &key,
+                         const std::vector<std::string> &tokens) {
+  const int64_t num_bytes = _entry_bytes(key, tokens);
+  if (num_bytes > max_bytes_) {
+    return;
+  }
+
+  const size_t hash = std::hash<std::string>{}(key);
+  std::lock_guard<std::mutex> lock(mutex_);
+  auto entry = find_(hash, key);
+  if (entry != entries_.end()) {
+    erase_(hash, entry);
+  }
+  while (num_bytes_ + num_bytes > max_bytes_) {
+    erase_(std::hash<std::string>{}(entries_.back().key),
+           std::prev(entries_.end()));
+  }
+
+  entries_.push_front(Entry{key, tokens, num_bytes});
+  index_.emplace(hash, entries_.begin());
+  num_bytes_ += num_bytes;
+}
+
+void TokenizerCache::clear() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  entries_.clear();
+  index_.clear();
+  num_bytes_ = 0;
+  hits_ = 0;
+  misses_ = 0;
+}
+
+int64_t TokenizerCache::hits() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return hits_;
+}
+
+int64_t TokenizerCache::misses() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return misses_;
+}
+
+int64_t TokenizerCache::num_bytes() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return num_bytes_;
+}
+
+int64_t TokenizerCache::__len__() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return entries_.size();
+}
+
+} // namespace torchtext
@@ -0,0 +1,43 @@
+#pragma once
+#include <list>
+#include <mutex>
+#include <torch/script.h>
+
+namespace torchtext {
+
+// A thread-safe LRU cache mapping input strings to their tokens. Entries are
+// evicted once the approximate memory used by keys and tokens exceeds
+// `max_bytes_`.
+struct TokenizerCache : torch::CustomClassHolder {
+private:
+  struct Entry {
+    std::string key;
+    std::vector<std::string> tokens;
+    int64_t num_bytes;
+  };
+  typedef std::list<Entry>::iterator EntryIterator;
+
+  std::list<Entry> entries_; // most recently used first
+  std::unordered_multimap<size_t, EntryIterator> index_;
+  int64_t num_bytes_ = 0;
+  int64_t hits_ = 0;
+  int64_t misses_ = 0;
+  mutable std::mutex mutex_;
+
+  EntryIterator find_(const size_t hash, const std::string &key);
+  void erase_(const size_t hash, EntryIterator entry);
+
+public:
+  int64_t max_bytes_;
+
+  explicit TokenizerCache(const int64_t max_bytes);
+  c10::optional<std::vector<std::string>> get(const std::string &key);
+  void put(const std::string &key, const std::vector<std::string> &tokens);
+  void clear();
+  int64_t hits() const;
+  int64_t misses() const;
+  int64_t num_bytes() const;
+  int64_t __len__() const;
+};
+
+} // namespace torchtext
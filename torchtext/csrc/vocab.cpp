@@ -41,6 +41,10 @@ int64_t Vocab::__getitem__(const std::string &token) const {
   return unk_index_;
 }
 
+bool Vocab::__contains__(const std::string &token) const {
+  return stoi_.find(token) != stoi_.end();
+}
+
 void Vocab::append_token(const std::string &token) {
   if (stoi_.find(token) == stoi_.end()) {
     // Note: we can't do `stoi_[token] = stoi_.size()` because of a bug
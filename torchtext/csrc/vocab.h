@@ -1,3 +1,4 @@
+#pragma once
 #include <pybind11/pybind11.h>
 #include <torch/script.h>
 
@@ -27,6 +28,7 @@ public:
                  const std::string &unk_token, const int64_t unk_index);
   int64_t __len__() const;
   int64_t __getitem__(const std::string &token) const;
+  bool __contains__(const std::string &token) const;
   void append_token(const std::string &token);
   void insert_token(const std::string &token, const int64_t &index);
   std::string lookup_token(const int64_t &index);
@@ -0,0 +1,217 @@
+#include <ATen/Parallel.h> // @manual
+#include <algorithm>
+#include <common.h>
+#include <wordpiece_tokenizer.h> // @manual
+
+namespace torchtext {
+
+namespace {
+// Launching a task on fewer lines than this is not worth it.
+constexpr int64_t GRAIN_SIZE = 32;
+
+bool _is_space(const char c) {
+  return c == ' ' || c == '\t' || c == '\n' || c == '\v' || c == '\f' ||
+         c == '\r';
+}
+
+// ASCII punctuation, which BERT splits into words of their own.
+bool _is_punctuation(const char c) {
+  return (c >= 33 && c <= 47) || (c >= 58 && c <= 64) ||
+         (c >= 91 && c <= 96) || (c >= 123 && c <= 126);
+}
+
+bool _is_continuation_byte(const char c) {
+  return (static_cast<unsigned char>(c) & 0xC0) == 0x80;
+}
+
+std::string _check_unk_token(const std::vector<std::string> &tokens,
+                             const std::string &unk_token) {
+  TORCH_CHECK(std::find(tokens.begin(), tokens.end(), unk_token) !=
+                  tokens.end(),
+              "The `unk_token` '" + unk_token +
+                  "' wasn't found in the tokens.");
+  return unk_token;
+}
+} // namespace
+
+WordPieceTokenizer::WordPieceTokenizer(const std::vector<std::string> &tokens,
+                                       const std::string &unk_token,
+                                       const bool to_lower,
+                                       const int64_t max_input_chars_per_word)
+    : vocab_(tokens, _check_unk_token(tokens, unk_token)), to_lower_(to_lower),
+      max_input_chars_per_word_(max_input_chars_per_word) {}
+
+void WordPieceTokenizer::normalize_(std::string &str) const {
+  // lowercasing ASCII characters keeps the byte offsets of the input
+  if (to_lower_) {
+    std::transform(str.begin(), str.end(), str.begin(),
+                   [](unsigned char c) { return std::tolower(c); });
+  }
+}
+
+// Splits the line into words on whitespace and punctuation, the way BERT's
+// basic tokenizer does for ASCII text, then splits every word into pieces.
+// `buffer` is reused across calls to look pieces up without allocating.
+void WordPieceTokenizer::tokenize_(const std::string &str,
+                                   std::vector<WordPiece> &pieces,
+                                   std::string &buffer) const {
+  size_t begin = 0;
+  while (begin < str.size()) {
+    if (_is_space(str[begin])) {
+      begin++;
+      continue;
+    }
+    size_t end = begin + 1;
+    if (!_is_punctuation(str[begin])) {
+      while (end < str.size() && !_is_space(str[end]) &&
+             !_is_punctuation(str[end])) {
+        end++;
+      }
+    }
+    tokenize_word_(str, begin, end, pieces, buffer);
+    begin = end;
+  }
+}
+
+// Greedy longest-match-first split of the word str[begin, end) into pieces of
+// the vocab, pieces other than the first one being prefixed by
+// `continuation_prefix_`.
+void WordPieceTokenizer::tokenize_word_(const std::string &str,
+                                        const size_t begin, const size_t end,
+                                        std::vector<WordPiece> &pieces,
+                                        std::string &buffer) const {
+  const size_t num_chars = std::count_if(
+      str.begin() + begin, str.begin() + end,
+      [](const char c) { return !_is_continuation_byte(c); });
+  const size_t num_pieces = pieces.size();
+  if (static_cast<int64_t>(num_chars) <= max_input_chars_per_word_) {
+    size_t start = begin;
+    while (start < end) {
+      size_t piece_end = end;
+      bool found = false;
+      while (piece_end > start) {
+        buffer.clear();
+        if (start > begin) {
+          buffer.append(continuation_prefix_);
+        }
+        buffer.append(str, start, piece_end - start);
+        if (vocab_.__contains__(buffer)) {
+          pieces.push_back({start, piece_end, vocab_.__getitem__(buffer),
+                            start > begin, false});
+          found = true;
+          break;
+        }
+        // only split the word on character boundaries
+        do {
+          piece_end--;
+        } while (piece_end > start && _is_continuation_byte(str[piece_end]));
+      }
+      if (!found) {
+        break;
+      }
+      start = piece_end;
+    }
+    if (start == end) {
+      return;
+    }
+  }
+
+  pieces.resize(num_pieces);
+  pieces.push_back(
+      {begin, end, vocab_.__getitem__(vocab_.unk_token_), false, true});
+}
+
+std::vector<std::string> WordPieceTokenizer::pieces_to_strings_(
+    const std::string &str, const std::vector<WordPiece> &pieces) const {
+  std::vector<std::string> tokens;
+  tokens.reserve(pieces.size());
+  for (const auto &piece : pieces) {
+    if (piece.is_unknown) {
+      tokens.push_back(vocab_.unk_token_);
+    } else if (piece.is_continuation) {
+      tokens.push_back(continuation_prefix_ +
+                       str.substr(piece.begin, piece.end - piece.begin));
+    } else {
+      tokens.emplace_back(str, piece.begin, piece.end - piece.begin);
+    }
+  }
+  return tokens;
+}
+
+std::vector<std::string> WordPieceTokenizer::forward(std::string str) const {
+  normalize_(str);
+  std::vector<WordPiece> pieces;
+  std::string buffer;
+  tokenize_(str, pieces, buffer);
+  return pieces_to_strings_(str, pieces);
+}
+
+std::vector<std::vector<std::string>>
+WordPieceTokenizer::forward_batch(const std::vector<std::string> &lines) const {
+  std::vector<std::vector<std::string>> tokens(lines.size());
+  at::parallel_for(0, lines.size(), GRAIN_SIZE,
+                   [&](int64_t begin, int64_t end) {
+                     for (int64_t i = begin; i < end; i++) {
+                       tokens[i] = forward(lines[i]);
+                     }
+                   });
+  return tokens;
+}
+
+std::tuple<std::vector<std::string>, std::vector<int64_t>,
+           std::vector<int64_t>>
+WordPieceTokenizer::forward_with_offsets(std::string str) const {
+  const std::string input = str;
+  normalize_(str);
+  std::vector<WordPiece> pieces;
+  std::string buffer;
+  tokenize_(str, pieces, buffer);
+
+  std::vector<int64_t> start_offsets, end_offsets;
+  start_offsets.reserve(pieces.size());
+  end_offsets.reserve(pieces.size());
+  for (const auto &piece : pieces) {
+    start_offsets.push_back(piece.begin);
+    end_offsets.push_back(piece.end);
+  }
+  impl::byte_to_char_offsets(input, start_offsets);
+  impl::byte_to_char_offsets(input, end_offsets);
+  return std::make_tuple(pieces_to_strings_(str, pieces),
+                         std::move(start_offsets), std::move(end_offsets));
+}
+
+// Tokenizes the lines and returns the ids of all the lines concatenated and
+// the offset of every line, without creating a string per piece.
+std::tuple<torch::Tensor, torch::Tensor>
+WordPieceTokenizer::forward_ids(const std::vector<std::string> &lines) const {
+  const int64_t num_lines = lines.size();
+  std::vector<std::vector<WordPiece>> pieces(num_lines);
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    std::string str, buffer;
+    for (int64_t i = begin; i < end; i++) {
+      str.assign(lines[i]);
+      normalize_(str);
+      tokenize_(str, pieces[i], buffer);
+    }
+  });
+
+  torch::Tensor offsets = torch::empty({num_lines}, torch::kLong);
+  auto offsets_data = offsets.data_ptr<int64_t>();
+  int64_t num_ids = 0;
+  for (int64_t i = 0; i < num_lines; i++) {
+    offsets_data[i] = num_ids;
+    num_ids += pieces[i].size();
+  }
+  torch::Tensor ids = torch::empty({num_ids}, torch::kLong);
+  auto ids_data = ids.data_ptr<int64_t>();
+  at::parallel_for(0, num_lines, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      std::transform(pieces[i].begin(), pieces[i].end(),
+                     ids_data + offsets_data[i],
+                     [](const WordPiece &piece) { return piece.id; });
+    }
+  });
+  return std::make_tuple(std::move(ids), std::move(offsets));
+}
+
+} // namespace torchtext
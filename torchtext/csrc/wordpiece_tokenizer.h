@@ -0,0 +1,50 @@
+#include <torch/csrc/utils/pybind.h> // @manual
+#include <torch/script.h>
+#include <vocab.h> // @manual
+
+namespace torchtext {
+
+// A piece of a word, as a byte range of the normalized line, together with
+// its id in the vocab. A word which cannot be split into pieces of the vocab
+// is a single unknown piece.
+struct WordPiece {
+  size_t begin;
+  size_t end;
+  int64_t id;
+  bool is_continuation;
+  bool is_unknown;
+};
+
+struct WordPieceTokenizer : torch::CustomClassHolder {
+private:
+  void normalize_(std::string &str) const;
+  void tokenize_(const std::string &str, std::vector<WordPiece> &pieces,
+                 std::string &buffer) const;
+  void tokenize_word_(const std::string &str, const size_t begin,
+                      const size_t end, std::vector<WordPiece> &pieces,
+                      std::string &buffer) const;
+  std::vector<std::string>
+  pieces_to_strings_(const std::string &str,
+                     const std::vector<WordPiece> &pieces) const;
+
+public:
+  const std::string continuation_prefix_ = "##";
+  Vocab vocab_;
+  bool to_lower_;
+  int64_t max_input_chars_per_word_;
+
+  explicit WordPieceTokenizer(const std::vector<std::string> &tokens,
+                              const std::string &unk_token,
+                              const bool to_lower,
+                              const int64_t max_input_chars_per_word);
+  std::vector<std::string> forward(std::string str) const;
+  std::vector<std::vector<std::string>>
+  forward_batch(const std::vector<std::string> &lines) const;
+  std::tuple<std::vector<std::string>, std::vector<int64_t>,
+             std::vector<int64_t>>
+  forward_with_offsets(std::string str) const;
+  std::tuple<torch::Tensor, torch::Tensor>
+  forward_ids(const std::vector<std::string> &lines) const;
+};
+
+} // namespace torchtext
@@ -6,9 +6,9 @@ from .iterator import (batch, BucketIterator, Iterator, BPTTIterator,
                        pool)
 from .metrics import bleu_score
 from .pipeline import Pipeline
-from .utils import get_tokenizer, interleave_keys
+from .utils import get_tokenizer, interleave_keys, TokenIdStore
 from .functional import generate_sp_model, \
-    load_sp_model, \
+    train_sp_model, load_sp_model, \
     sentencepiece_numericalizer, \
     sentencepiece_tokenizer, custom_replace, simple_space_split, \
     numericalize_tokens_from_iterator
@@ -22,8 +22,8 @@ __all__ = ["Batch",
            "pool",
            "bleu_score",
            "Pipeline",
-           "get_tokenizer", "interleave_keys",
-           "generate_sp_model", "load_sp_model",
+           "get_tokenizer", "interleave_keys", "TokenIdStore",
+           "generate_sp_model", "train_sp_model", "load_sp_model",
            "sentencepiece_numericalizer", "sentencepiece_tokenizer",
            "custom_replace", "simple_space_split",
            "numericalize_tokens_from_iterator"]
@@ -1,10 +1,14 @@
 import re
 
 import torch
+from torchtext._torchtext import (
+    _train_sp_model,
+    _train_sp_model_from_iterator
+)
 
 
 __all__ = [
-    "generate_sp_model", "load_sp_model",
+    "generate_sp_model", "train_sp_model", "load_sp_model",
     "sentencepiece_numericalizer", "sentencepiece_tokenizer",
     "numericalize_tokens_from_iterator"
 ]
@@ -16,9 +20,23 @@ All of these are experimental, unstable, and subject to change or deletion.
 """
 
 
+def _sp_trainer_options(vocab_size, model_type, num_threads, input_sentence_size,
+                        shuffle_input_sentence, train_extremely_large_corpus):
+    options = {'vocab_size': vocab_size, 'model_type': model_type,
+               'num_threads': num_threads, 'input_sentence_size': input_sentence_size,
+               'shuffle_input_sentence': shuffle_input_sentence,
+               'train_extremely_large_corpus': train_extremely_large_corpus}
+    return {key: str(value).lower() if isinstance(value, bool) else str(value)
+            for key, value in options.items() if value is not None}
+
+
 def generate_sp_model(filename, vocab_size=20000,
                       model_type="unigram",
-                      model_prefix='m_user'):
+                      model_prefix='m_user',
+                      num_threads=None,
+                      input_sentence_size=None,
+                      shuffle_input_sentence=None,
+                      train_extremely_large_corpus=None):
     r"""Train a SentencePiece tokenizer.
 
     Arguments:
@@ -27,6 +45,14 @@ def generate_sp_model(filename, vocab_size=20000,
         model_type: the type of SentencePiece model, including unigram,
             bpe, char, word.
         model_prefix: the prefix of the files saving model and vocab.
+        num_threads: the number of threads used for training
+            (Default: SentencePiece's default).
+        input_sentence_size: the maximum number of sentences loaded for
+            training, 0 to load all of them (Default: SentencePiece's default).
+        shuffle_input_sentence: randomly sample the loaded sentences instead of
+            taking the first ``input_sentence_size`` ones (Default: SentencePiece's default).
+        train_extremely_large_corpus: use 64 bit counters for corpora with more
+            than 2^31 characters (Default: SentencePiece's default).
 
     Outputs:
         The model and vocab are saved in two separate files with
@@ -36,7 +62,50 @@ def generate_sp_model(filename, vocab_size=20000,
         >>> from torchtext.data.functional import generate_sp_model
         >>> generate_sp_model('test.csv', vocab_size=23456, model_prefix='spm_user')
     """
-    torch.ops.torchtext.generate_sp_model(filename, vocab_size, model_type, model_prefix)
+    options = _sp_trainer_options(vocab_size, model_type, num_threads, input_sentence_size,
+                                  shuffle_input_sentence, train_extremely_large_corpus)
+    options.update({'input': filename, 'model_prefix': model_prefix})
+    _train_sp_model(options)
+
+
+def train_sp_model(iterator, vocab_size=20000,
+                   model_type="unigram",
+                   num_threads=None,
+                   input_sentence_size=None,
+                   shuffle_input_sentence=None,
+                   train_extremely_large_corpus=None):
+    r"""Train a SentencePiece tokenizer from an iterator over sentences, without
+    going through files.
+
+    Arguments:
+        iterator: an iterator yielding the training sentences as strings, e.g.
+            the text of a raw dataset.
+        vocab_size: the size of vocabulary (Default: 20,000).
+        model_type: the type of SentencePiece model, including unigram,
+            bpe, char, word.
+        num_threads: the number of threads used for training
+            (Default: SentencePiece's default).
+        input_sentence_size: the maximum number of sentences loaded for
+            training, 0 to load all of them (Default: SentencePiece's default).
+        shuffle_input_sentence: randomly sample the loaded sentences instead of
+            taking the first ``input_sentence_size`` ones (Default: SentencePiece's default).
+        train_extremely_large_corpus: use 64 bit counters for corpora with more
+            than 2^31 characters (Default: SentencePiece's default).
+
+    Outputs:
+        output: the serialized SentencePiece model, as bytes.
+
+    Examples:
+        >>> from torchtext.data.functional import train_sp_model
+        >>> from torchtext.experimental.datasets.raw import AG_NEWS
+        >>> train, _ = AG_NEWS()
+        >>> model = train_sp_model((text for _, text in train), vocab_size=23456,
+        >>>                        num_threads=8, input_sentence_size=1000000,
+        >>>                        shuffle_input_sentence=True)
+    """
+    options = _sp_trainer_options(vocab_size, model_type, num_threads, input_sentence_size,
+                                  shuffle_input_sentence, train_extremely_large_corpus)
+    return _train_sp_model_from_iterator(iter(iterator), options)
 
 
 def load_sp_model(spm_path):
@@ -46,7 +115,9 @@ def load_sp_model(spm_path):
         spm_path: the file path saving the sentencepiece model.
 
     Outputs:
-        output: a SentencePiece model.
+        output: a SentencePiece model. The model file is memory mapped while it
+            is parsed, and loading the same unmodified file again returns the
+            model already loaded in this process, as long as it is alive.
 
     Examples:
         >>> from torchtext.data.functional import load_sp_model
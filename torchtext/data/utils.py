@@ -1,3 +1,4 @@
+import array
 import random
 from contextlib import contextmanager
 from copy import deepcopy
@@ -5,6 +6,10 @@ import re
 
 from functools import partial
 
+import numpy
+import torch
+from torchtext._torchtext import RegexTokenizer as RegexTokenizerPybind
+
 
 def _split_tokenizer(x):  # noqa: F821
     # type: (str) -> List[str]
@@ -44,6 +49,15 @@ _replacements = [' \'  ',
 _patterns_dict = list((re.compile(p), r) for p, r in zip(_patterns, _replacements))
 
 
+_native_basic_english = RegexTokenizerPybind(_patterns, _replacements, False)
+
+# RE2's `\s` (used by the native tokenizer) only matches ' ', '\t', '\n', '\r' and '\f' whereas
+# Python's `\s` and `str.split()` treat the first group of characters as whitespace too.
+# Lone surrogates can't be passed to the native tokenizer as UTF-8.
+_non_native_re = re.compile('[\x0b\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]|'
+                            '[\ud800-\udfff]')
+
+
 def _basic_english_normalize(line):
     r"""
     Basic normalization for a line of text.
@@ -64,6 +78,22 @@ def _basic_english_normalize(line):
         replace multiple spaces with single space
 
     Returns a list of tokens after splitting on whitespace.
+
+    The replacements run in the native RegexTokenizer. Lowercasing stays in
+    Python to handle non-ASCII characters, and the rare lines with whitespace
+    RE2 can't handle go through `_python_basic_english_normalize`,
+    so the output is identical to the pure Python implementation.
+    """
+
+    line = line.lower()
+    if _non_native_re.search(line) is None:
+        return _native_basic_english.forward(line)
+    return _python_basic_english_normalize(line)
+
+
+def _python_basic_english_normalize(line):
+    r"""
+    Pure Python implementation of `_basic_english_normalize`.
     """
 
     line = line.lower()
@@ -255,3 +285,114 @@ class RandomShuffler(object):
         """Shuffle and return a new list."""
         with self.use_internal_state():
             return random.sample(data, len(data))
+
+
+# array typecodes and numpy dtypes of the buffers of TokenIdStore.from_iterator
+_buffer_types = {
+    torch.int16: ('h', numpy.int16),
+    torch.int32: ('i', numpy.int32),
+    torch.int64: ('q', numpy.int64),
+}
+
+
+def _buffer_to_tensor(buffer, dtype):
+    """Return a tensor sharing the memory of an array.array."""
+    if len(buffer) == 0:
+        return torch.empty(0, dtype=dtype)
+    return torch.from_numpy(numpy.frombuffer(buffer, dtype=_buffer_types[dtype][1]))
+
+
+def _id_dtype(num_ids):
+    """Return the smallest integer dtype holding the ids 0 to num_ids - 1."""
+    if num_ids is None or num_ids > 2 ** 31:
+        return torch.int64
+    if num_ids > 2 ** 15:
+        return torch.int32
+    return torch.int16
+
+
+class TokenIdStore(object):
+    """Store sequences of token ids, and optionally their labels, in flat tensors.
+
+    The ids of the sequence i are ``ids[offsets[i]:offsets[i + 1]]``. Unlike a
+    list of tensors, the store has no per-sequence tensor and tuple overhead,
+    and is pickled to DataLoader workers as three tensors.
+
+    Arguments:
+        ids: a 1-D tensor of the ids of all the sequences.
+        offsets: a 1-D long tensor of the offsets of the sequences in ids,
+            followed by the total number of ids.
+        labels: an optional 1-D tensor of the labels of the sequences.
+        dtype: the dtype of the returned sequences. If it is the dtype of ids
+            (the default), the sequences are views of ids, otherwise they are
+            converted copies.
+    """
+
+    def __init__(self, ids, offsets, labels=None, dtype=None):
+        if offsets.dim() != 1 or offsets.numel() == 0:
+            raise ValueError("offsets must be a 1-D tensor holding at least the total number of ids")
+        if labels is not None and labels.numel() != offsets.numel() - 1:
+            raise ValueError("Expected {} labels, got {}".format(offsets.numel() - 1, labels.numel()))
+        self.ids = ids
+        self.offsets = offsets
+        self.labels = labels
+        self.dtype = ids.dtype if dtype is None else dtype
+
+    @classmethod
+    def from_iterator(cls, iterator, num_ids=None, with_labels=False, dtype=None):
+        """Build a store from an iterator of id sequences.
+
+        The ids are appended to a growable buffer of the storage dtype, so
+        that no tensor is created per sequence.
+
+        Arguments:
+            iterator: an iterator yielding lists of ids, or label and list of
+                ids tuples if with_labels.
+            num_ids: the number of distinct ids (e.g. the length of the vocab),
+                used to store the ids with the smallest integer dtype. If None,
+                the ids are stored as int64.
+            with_labels: whether the iterator yields labels.
+            dtype: the dtype of the returned sequences. Default: the storage
+                dtype.
+
+        Examples:
+            >>> store = TokenIdStore.from_iterator([(0, [4, 2]), (1, [7])], num_ids=8,
+            >>>                                    with_labels=True, dtype=torch.long)
+            >>> store[0]
+            >>> (0, tensor([4, 2]))
+        """
+        id_dtype = _id_dtype(num_ids)
+        ids = array.array(_buffer_types[id_dtype][0])
+        offsets = array.array('q', [0])
+        labels = array.array('q')
+        for item in iterator:
+            if with_labels:
+                label, item = item
+                labels.append(label)
+            ids.extend(item)
+            offsets.append(len(ids))
+        labels = _buffer_to_tensor(labels, torch.int64) if with_labels else None
+        return cls(_buffer_to_tensor(ids, id_dtype), _buffer_to_tensor(offsets, torch.int64), labels, dtype)
+
+    def __len__(self):
+        return self.offsets.numel() - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("TokenIdStore index out of range")
+        ids = self.ids[self.offsets[i].item():self.offsets[i + 1].item()]
+        if ids.dtype != self.dtype:
+            ids = ids.to(self.dtype)
+        if self.labels is None:
+            return ids
+        return self.labels[i].item(), ids
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def lengths(self):
+        """Return the lengths of the sequences as a 1-D long tensor."""
+        return self.offsets[1:] - self.offsets[:-1]
@@ -2,8 +2,10 @@ import logging
 import torch
 import io
 from torchtext.utils import download_from_url, extract_archive, unicode_csv_reader
+from torchtext.utils import _dataset_cache_key, _load_from_dataset_cache, _save_to_dataset_cache, _vocab_key
 from torchtext.data.utils import ngrams_iterator
 from torchtext.data.utils import get_tokenizer
+from torchtext.data.utils import TokenIdStore
 from torchtext.vocab import build_vocab_from_iterator
 from torchtext.vocab import Vocab
 from tqdm import tqdm
@@ -42,22 +44,25 @@ def _csv_iterator(data_path, ngrams, yield_cls=False):
 
 
 def _create_data_from_iterator(vocab, iterator, include_unk):
-    data = []
-    labels = []
-    with tqdm(unit_scale=0, unit='lines') as t:
-        for cls, tokens in iterator:
-            if include_unk:
-                tokens = torch.tensor([vocab[token] for token in tokens])
-            else:
-                token_ids = list(filter(lambda x: x is not Vocab.UNK, [vocab[token]
-                                        for token in tokens]))
-                tokens = torch.tensor(token_ids)
-            if len(tokens) == 0:
-                logging.info('Row contains no tokens.')
-            data.append((cls, tokens))
-            labels.append(cls)
-            t.update(1)
-    return data, set(labels)
+    labels = set()
+
+    def _ids_iterator():
+        with tqdm(unit_scale=0, unit='lines') as t:
+            for cls, tokens in iterator:
+                if include_unk:
+                    token_ids = [vocab[token] for token in tokens]
+                else:
+                    token_ids = list(filter(lambda x: x is not Vocab.UNK, [vocab[token]
+                                            for token in tokens]))
+                if len(token_ids) == 0:
+                    logging.info('Row contains no tokens.')
+                labels.add(cls)
+                t.update(1)
+                yield cls, token_ids
+
+    data = TokenIdStore.from_iterator(_ids_iterator(), num_ids=len(vocab), with_labels=True,
+                                      dtype=torch.long)
+    return data, labels
 
 
 class TextClassificationDataset(torch.utils.data.Dataset):
@@ -83,6 +88,8 @@ class TextClassificationDataset(torch.utils.data.Dataset):
             data: a list of label/tokens tuple. tokens are a tensor after
                 numericalizing the string tokens. label is an integer.
                 [(label1, tokens1), (label2, tokens2), (label2, tokens3)]
+                The datasets store it as a TokenIdStore, which holds all the
+                tokens in one flat tensor and indexes like such a list.
             label: a set of the labels.
                 {label1, label2}
 
@@ -113,7 +120,21 @@ class TextClassificationDataset(torch.utils.data.Dataset):
         return self._vocab
 
 
-def _setup_datasets(dataset_name, root='.data', ngrams=1, vocab=None, include_unk=False):
+def _load_cached_datasets(root, key):
+    cached = _load_from_dataset_cache(root, key, ('train_ids', 'train_offsets', 'train_labels',
+                                                  'test_ids', 'test_offsets', 'test_labels'))
+    if cached is None:
+        return None
+    tensors, vocab = cached
+    datasets = []
+    for split in ('train', 'test'):
+        data = TokenIdStore(tensors[split + '_ids'], tensors[split + '_offsets'],
+                            tensors[split + '_labels'], dtype=torch.long)
+        datasets.append(TextClassificationDataset(vocab, data, set(data.labels.unique().tolist())))
+    return tuple(datasets)
+
+
+def _setup_datasets(dataset_name, root='.data', ngrams=1, vocab=None, include_unk=False, use_cache=True):
     dataset_tar = download_from_url(URLS[dataset_name], root=root)
     extracted_files = extract_archive(dataset_tar)
 
@@ -123,12 +144,20 @@ def _setup_datasets(dataset_name, root='.data', ngrams=1, vocab=None, include_un
         if fname.endswith('test.csv'):
             test_csv_path = fname
 
+    if vocab is not None and not isinstance(vocab, Vocab):
+        raise TypeError("Passed vocabulary is not of type Vocab")
+    key = None
+    if use_cache:
+        key = _dataset_cache_key(dataset_name, (train_csv_path, test_csv_path), tokenizer='basic_english',
+                                 ngrams=ngrams, include_unk=include_unk,
+                                 vocab=_vocab_key(vocab) if vocab is not None else 'train')
+        datasets = _load_cached_datasets(root, key)
+        if datasets is not None:
+            return datasets
+
     if vocab is None:
         logging.info('Building Vocab based on {}'.format(train_csv_path))
         vocab = build_vocab_from_iterator(_csv_iterator(train_csv_path, ngrams))
-    else:
-        if not isinstance(vocab, Vocab):
-            raise TypeError("Passed vocabulary is not of type Vocab")
     logging.info('Vocab has {} entries'.format(len(vocab)))
     logging.info('Creating training data')
     train_data, train_labels = _create_data_from_iterator(
@@ -138,6 +167,11 @@ def _setup_datasets(dataset_name, root='.data', ngrams=1, vocab=None, include_un
         vocab, _csv_iterator(test_csv_path, ngrams, yield_cls=True), include_unk)
     if len(train_labels ^ test_labels) > 0:
         raise ValueError("Training and test labels don't match")
+    if key is not None:
+        _save_to_dataset_cache(root, key, {'train_ids': train_data.ids, 'train_offsets': train_data.offsets,
+                                           'train_labels': train_data.labels, 'test_ids': test_data.ids,
+                                           'test_offsets': test_data.offsets, 'test_labels': test_data.labels},
+                               vocab)
     return (TextClassificationDataset(vocab, train_data, train_labels),
             TextClassificationDataset(vocab, test_data, test_labels))
 
@@ -161,6 +195,9 @@ def AG_NEWS(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.AG_NEWS(ngrams=3)
@@ -190,6 +227,9 @@ def SogouNews(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.SogouNews(ngrams=3)
@@ -228,6 +268,9 @@ def DBpedia(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.DBpedia(ngrams=3)
@@ -254,6 +297,9 @@ def YelpReviewPolarity(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.YelpReviewPolarity(ngrams=3)
@@ -279,6 +325,9 @@ def YelpReviewFull(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.YelpReviewFull(ngrams=3)
@@ -313,6 +362,9 @@ def YahooAnswers(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.YahooAnswers(ngrams=3)
@@ -339,6 +391,9 @@ def AmazonReviewPolarity(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
        >>> train_dataset, test_dataset = torchtext.datasets.AmazonReviewPolarity(ngrams=3)
@@ -364,6 +419,9 @@ def AmazonReviewFull(*args, **kwargs):
         vocab: Vocabulary used for dataset. If None, it will generate a new
             vocabulary based on the train data set.
         include_unk: include unknown token in the data (Default: False)
+        use_cache: reload the processed data from, and save it to, the cache
+            in root/processed (see torchtext.utils.clear_dataset_cache).
+            (Default: True)
 
     Examples:
         >>> train_dataset, test_dataset = torchtext.datasets.AmazonReviewFull(ngrams=3)
@@ -1,15 +1,21 @@
 import torch
-from torchtext.data.utils import get_tokenizer
+from torchtext.data.utils import get_tokenizer, TokenIdStore
 from torchtext.vocab import build_vocab_from_iterator
+from torchtext.utils import (_dataset_cache_key, _load_from_dataset_cache, _save_to_dataset_cache,
+                             _tokenizer_key, _vocab_key)
 from torchtext.experimental.datasets.raw import language_modeling as raw
 from torchtext.experimental.functional import vocab_func, totensor, sequential_transforms
 
 
 def build_vocab(data, transforms):
-    tok_list = []
-    for txt in data:
-        tok_list.append(transforms(txt))
-    return build_vocab_from_iterator(tok_list)
+    return build_vocab_from_iterator(transforms(txt) for txt in data)
+
+
+def _build_ids_tensor(lines, transforms):
+    r"""Return the ids of all the lines, transformed to lists of ids by `transforms`, as one
+    1-D long tensor. The ids are appended to a growable buffer line by line.
+    """
+    return TokenIdStore.from_iterator(transforms(line) for line in lines).ids
 
 
 class LanguageModelingDataset(torch.utils.data.Dataset):
@@ -39,7 +45,9 @@ class LanguageModelingDataset(torch.utils.data.Dataset):
         self.vocab = vocab
         self.transforms = transforms
         self.single_line = single_line
-        if single_line:
+        if single_line and isinstance(data, torch.Tensor):
+            self.data = data
+        elif single_line:
             self.data = torch.cat(tuple(transforms(row) for row in data), axis=0)
         else:
             self.data = data
@@ -60,9 +68,66 @@ class LanguageModelingDataset(torch.utils.data.Dataset):
     def get_vocab(self):
         return self.vocab
 
+    def bptt_batches(self, batch_size, bptt_len, variable_len=True, random_offset=False,
+                     batch_first=False, generator=None):
+        r"""Return an iterator over the batches of backpropagation through time.
+
+        The data is split into `batch_size` contiguous streams of tokens. Every batch is
+        an (input, target) pair of views of the data, without copy: the input holds
+        the next `seq_len` tokens of every stream and the target the tokens following
+        them. The tensors are of size `seq_len x batch_size`, or `batch_size x seq_len`
+        if `batch_first`, and are not contiguous in the first case.
+
+        Arguments:
+            batch_size: the number of streams.
+            bptt_len: the length of the sequences.
+            variable_len: if True, the length of every sequence is sampled from a normal
+                distribution of standard deviation 5 around `bptt_len` (or `bptt_len / 2`,
+                with probability 0.05), as in AWD-LSTM. Default: True
+            random_offset: if True, a random number of tokens in [0, bptt_len) is skipped
+                at the start of the data, so that the sequences change at every epoch.
+                Default: False
+            batch_first: whether the batch dimension comes first. Default: False
+            generator: the torch.Generator sampling the offset and the lengths.
+
+        Examples:
+            >>> train_dataset, = WikiText2(data_select='train')
+            >>> for epoch in range(num_epochs):
+            >>>     for text, target in train_dataset.bptt_batches(20, 35, random_offset=True):
+            >>>         output = model(text)
+        """
+        if not self.single_line:
+            raise TypeError('bptt_batches is only supported with single_line=True')
+        if batch_size <= 0:
+            raise ValueError('batch_size should be a positive integer, got {}'.format(batch_size))
+        if bptt_len <= 0:
+            raise ValueError('bptt_len should be a positive integer, got {}'.format(bptt_len))
+        offset = 0
+        if random_offset:
+            offset = torch.randint(bptt_len, (1,), generator=generator).item()
+        num_steps = max(self.data.numel() - offset, 0) // batch_size
+        streams = self.data[offset:offset + num_steps * batch_size].view(batch_size, num_steps)
+        if not batch_first:
+            streams = streams.t()
+        return self._bptt_batches(streams, num_steps, bptt_len, variable_len, batch_first, generator)
+
+    def _bptt_batches(self, streams, num_steps, bptt_len, variable_len, batch_first, generator):
+        step = 0
+        while step < num_steps - 1:
+            seq_len = bptt_len
+            if variable_len:
+                mean = bptt_len if torch.rand(1, generator=generator).item() < 0.95 else bptt_len / 2.
+                seq_len = max(min(5, bptt_len), int(torch.normal(mean, 5., (1,), generator=generator).item()))
+            seq_len = min(seq_len, num_steps - 1 - step)
+            if batch_first:
+                yield streams[:, step:step + seq_len], streams[:, step + 1:step + 1 + seq_len]
+            else:
+                yield streams[step:step + seq_len], streams[step + 1:step + 1 + seq_len]
+            step += seq_len
+
 
 def _setup_datasets(dataset_name, tokenizer=None, root='.data', vocab=None,
-                    data_select=('train', 'test', 'valid'), single_line=True):
+                    data_select=('train', 'test', 'valid'), single_line=True, use_cache=True):
     if tokenizer is None:
         tokenizer = get_tokenizer('basic_english')
     text_transform = sequential_transforms(tokenizer)
@@ -75,31 +140,53 @@ def _setup_datasets(dataset_name, tokenizer=None, root='.data', vocab=None,
     if not single_line and dataset_name != 'WikiText103':
         raise TypeError('single_line must be True except for WikiText103')
     if dataset_name == 'WMTNewsCrawl':
-        train, = raw.DATASETS[dataset_name](root=root, data_select=('train',))
-        if single_line:
-            raw_data = {'train': [" ".join([txt for txt in train]), ]}
-        else:
-            raw_data = {'train': [txt for txt in train]}
+        splits = ('train',)
+    else:
+        splits = ('train', 'test', 'valid')
+    raw_datasets = dict(zip(splits, raw.DATASETS[dataset_name](root=root, data_select=splits)))
+    # Every process builds the whole dataset, the raw datasets must not be sharded
+    for raw_dataset in raw_datasets.values():
+        raw_dataset.setup_iter(shard=False)
+
+    key = None
+    if use_cache and single_line:
+        key = _dataset_cache_key(dataset_name, [raw_datasets[split].path for split in splits],
+                                 tokenizer=_tokenizer_key(tokenizer),
+                                 vocab=_vocab_key(vocab) if vocab is not None else 'train',
+                                 data_select=sorted(data_select))
+    if key is not None:
+        cached = _load_from_dataset_cache(root, key, data_select)
+        if cached is not None:
+            data, vocab = cached
+            text_transform = sequential_transforms(text_transform, vocab_func(vocab),
+                                                   totensor(dtype=torch.long))
+            return tuple(LanguageModelingDataset(data[item], vocab, text_transform, single_line)
+                         for item in data_select)
+
+    if single_line:
+        # The lines are streamed from disk, neither the text nor the tokens of a whole split are held
+        raw_data = raw_datasets
     else:
-        train, test, valid = raw.DATASETS[dataset_name](root=root, data_select=('train', 'test', 'valid'))
         # Cache raw text iterable dataset
-        if single_line:
-            raw_data = {'train': [" ".join([txt for txt in train]), ],
-                        'valid': [" ".join(txt for txt in valid), ],
-                        'test': [" ".join(txt for txt in test), ]}
-        else:
-            raw_data = {'train': [txt for txt in train],
-                        'valid': [txt for txt in valid],
-                        'test': [txt for txt in test]}
+        raw_data = {split: [txt for txt in raw_datasets[split]] for split in splits}
 
     if vocab is None:
         if 'train' not in data_select:
             raise TypeError("Must pass a vocab if train is not selected.")
         vocab = build_vocab(raw_data['train'], text_transform)
+    if single_line:
+        ids_transform = sequential_transforms(text_transform, vocab_func(vocab))
+        data = {item: _build_ids_tensor(raw_data[item], ids_transform) for item in data_select}
+    else:
+        data = raw_data
     text_transform = sequential_transforms(text_transform, vocab_func(vocab),
                                            totensor(dtype=torch.long))
-    return tuple(LanguageModelingDataset(raw_data[item], vocab, text_transform, single_line)
-                 for item in data_select)
+    datasets = tuple(LanguageModelingDataset(data[item], vocab, text_transform, single_line)
+                     for item in data_select)
+    if key is not None:
+        _save_to_dataset_cache(root, key, {item: dataset.data for item, dataset in zip(data_select, datasets)},
+                               vocab)
+    return datasets
 
 
 def WikiText2(*args, **kwargs):
@@ -127,6 +214,11 @@ def WikiText2(*args, **kwargs):
             (Default: True)
             By default, all lines in raw text file are concatenated into a single line.
             Use `single_line = False` if one wants to get data line by line.
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `single_line = True` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import WikiText2
@@ -167,6 +259,11 @@ def WikiText103(*args, **kwargs):
             (Default: True)
             By default, all lines in raw text file are concatenated into a single line.
             Use `single_line = False` if one wants to get data line by line.
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `single_line = True` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import WikiText103
@@ -207,6 +304,11 @@ def PennTreebank(*args, **kwargs):
             (Default: True)
             By default, all lines in raw text file are concatenated into a single line.
             Use `single_line = False` if one wants to get data line by line.
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `single_line = True` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import PennTreebank
@@ -242,6 +344,11 @@ def WMTNewsCrawl(*args, **kwargs):
             (Default: True)
             By default, all lines in raw text file are concatenated into a single line.
             Use `single_line = False` if one wants to get data line by line.
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `single_line = True` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
     Examples:
         >>> from torchtext.experimental.datasets import WMTNewsCrawl
         >>> from torchtext.data.utils import get_tokenizer
@@ -1,5 +1,6 @@
+from bisect import bisect_left
 import torch
-from torchtext.data.utils import get_tokenizer
+from torchtext.data.utils import get_tokenizer, _native_basic_english, _non_native_re
 from torchtext.vocab import build_vocab_from_iterator
 from torchtext.experimental.datasets.raw import question_answer as raw
 from torchtext.experimental.functional import (
@@ -27,6 +28,10 @@ class QuestionAnswerDataset(torch.utils.data.Dataset):
             transforms: a dictionary of transforms.
                 For example {'context': context_transform, 'answers': answers_transform,
                              'question': question_transform, 'ans_pos': ans_pos_transform}
+                An optional 'context_offsets' transform returning the context tensor together with
+                the start character offset of each token is used to locate the answer tokens with a
+                binary search instead of tokenizing the context again. It returns None offsets for
+                the contexts whose tokens are located by tokenizing the context before the answer.
         """
 
         super(QuestionAnswerDataset, self).__init__()
@@ -35,7 +40,13 @@ class QuestionAnswerDataset(torch.utils.data.Dataset):
         self.transforms = transforms
 
     def __getitem__(self, i):
-        _data = {'context': self.transforms['context'](self.data[i]['context']),
+        context = self.data[i]['context']
+        start_offsets = None
+        if 'context_offsets' in self.transforms:
+            context_tensor, start_offsets = self.transforms['context_offsets'](context)
+        else:
+            context_tensor = self.transforms['context'](context)
+        _data = {'context': context_tensor,
                  'question': self.transforms['question'](self.data[i]['question']),
                  'answers': [], 'ans_pos': []}
         for idx in range(len(self.data[i]['answer_start'])):
@@ -44,9 +55,11 @@ class QuestionAnswerDataset(torch.utils.data.Dataset):
             if ans_start_idx == -1:  # No answer for this sample
                 _data['ans_pos'].append(self.transforms['ans_pos']([-1, -1]))
             else:
-                ans_start_token_idx = len(self.transforms['context'](self.data[i]['context'][:ans_start_idx]))
-                ans_end_token_idx = ans_start_token_idx + \
-                    len(self.transforms['answers'](self.data[i]['answers'][idx])) - 1
+                if start_offsets is not None:
+                    ans_start_token_idx = bisect_left(start_offsets, ans_start_idx)
+                else:
+                    ans_start_token_idx = len(self.transforms['context'](context[:ans_start_idx]))
+                ans_end_token_idx = ans_start_token_idx + len(_data['answers'][-1]) - 1
                 _data['ans_pos'].append(self.transforms['ans_pos']([ans_start_token_idx, ans_end_token_idx]))
         return _data
 
@@ -57,20 +70,52 @@ class QuestionAnswerDataset(torch.utils.data.Dataset):
         return self.vocab
 
 
+def _basic_english_offsets(txt):
+    r"""Return the tokens of `get_tokenizer('basic_english')` and their start character offsets, or
+    None if the native tokenizer is not known to give the same tokens at the same offsets: lowercasing
+    may change the length of non-ASCII text, and RE2 does not handle all the whitespace characters.
+    """
+    try:
+        txt.encode('ascii')
+    except UnicodeEncodeError:
+        return None
+    if _non_native_re.search(txt) is not None:
+        return None
+    tokens, start_offsets, _ = _native_basic_english.forward_with_offsets(txt.lower())
+    return tokens, start_offsets
+
+
+def _context_offsets_func(text_transform, vocab):
+    def func(txt):
+        tokens_offsets = _basic_english_offsets(txt)
+        if tokens_offsets is None:
+            # the answer tokens are then located by tokenizing the context before them
+            return text_transform(txt), None
+        tokens, start_offsets = tokens_offsets
+        return torch.tensor(vocab_func(vocab)(tokens), dtype=torch.long), start_offsets
+
+    return func
+
+
 def _setup_datasets(dataset_name,
                     root='.data',
                     vocab=None,
                     tokenizer=None,
                     data_select=('train', 'dev')):
     text_transform = []
+    context_offsets = False
     if tokenizer is None:
         tokenizer = get_tokenizer('basic_english')
+        context_offsets = True
     text_transform = sequential_transforms(tokenizer)
     if isinstance(data_select, str):
         data_select = [data_select]
     if not set(data_select).issubset(set(('train', 'dev'))):
         raise TypeError('Given data selection {} is not supported!'.format(data_select))
     train, dev = raw.DATASETS[dataset_name](root=root)
+    # Every process builds the whole dataset, the raw datasets must not be sharded
+    train.setup_iter(shard=False)
+    dev.setup_iter(shard=False)
     raw_data = {'train': [item for item in train],
                 'dev': [item for item in dev]}
     if vocab is None:
@@ -87,6 +132,8 @@ def _setup_datasets(dataset_name,
     text_transform = sequential_transforms(text_transform, vocab_func(vocab), totensor(dtype=torch.long))
     transforms = {'context': text_transform, 'question': text_transform,
                   'answers': text_transform, 'ans_pos': totensor(dtype=torch.long)}
+    if context_offsets:
+        transforms['context_offsets'] = _context_offsets_func(text_transform, vocab)
     return tuple(QuestionAnswerDataset(raw_data[item], vocab, transforms) for item in data_select)
 
 
@@ -0,0 +1,141 @@
+import bisect
+import io
+import itertools
+import os
+
+import torch
+from torchtext.utils import unicode_csv_reader
+
+# The byte offset of every RECORD_OFFSETS_EVERY-th record of a file is indexed, seeking to a record
+# then parses at most RECORD_OFFSETS_EVERY - 1 records.
+RECORD_OFFSETS_EVERY = 1000
+
+
+def _build_record_offsets(path, every, csv):
+    # The lines are split and the CSV rows parsed as by the readers of the datasets, which open the
+    # files in text mode: the offset of a record is the number of bytes of the lines read before it.
+    offsets = []
+    consumed = [0]
+
+    def lines(f):
+        for line in f:
+            consumed[0] += len(line.encode('utf8'))
+            yield line
+
+    # newline='' keeps the line endings, so that the lines encode to their size in the file
+    with io.open(path, encoding='utf8', newline='') as f:
+        records = unicode_csv_reader(lines(f)) if csv else lines(f)
+        offset = 0
+        for num_records, _ in enumerate(records):
+            if num_records % every == 0:
+                offsets.append(offset)
+            offset = consumed[0]
+    return offsets
+
+
+def _record_offsets(path, every=RECORD_OFFSETS_EVERY, csv=False):
+    r"""Return the byte offsets of the records 0, every, 2 * every, ... of a text file.
+
+    Records are lines, or CSV rows (which can span several lines) if `csv`. The offsets are
+    cached beside the file, in `path + '.offsets'`, and rebuilt when the file changes.
+    """
+    stat = os.stat(path)
+    key = {'every': every, 'csv': csv, 'size': stat.st_size, 'mtime': stat.st_mtime}
+    cache_path = path + '.offsets'
+    if os.path.exists(cache_path):
+        try:
+            cached = torch.load(cache_path)
+            if cached['key'] == key:
+                return cached['offsets'].tolist()
+        except Exception:
+            pass
+
+    offsets = _build_record_offsets(path, every, csv)
+    # DataLoader workers may build the same index concurrently, each of them writes its own
+    # temporary file and atomically replaces the cache with it
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+    try:
+        torch.save({'key': key, 'offsets': torch.tensor(offsets, dtype=torch.long)}, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except (IOError, OSError):
+        pass
+    return offsets
+
+
+def _iterator_from(path, create_iterator, start, csv=False, every=RECORD_OFFSETS_EVERY):
+    r"""Return the items of the file at `path` read by `create_iterator(path, offset)`, starting
+    from the item `start`, by seeking to the closest indexed record before it.
+    """
+    if start < every:
+        return itertools.islice(create_iterator(path, 0), start, None)
+    offsets = _record_offsets(path, every, csv)
+    block = start // every
+    if block >= len(offsets):
+        return iter(())
+    return itertools.islice(create_iterator(path, offsets[block]), start - block * every, None)
+
+
+def _iterator_from_start(create_iterator, start):
+    r"""Return the items of `create_iterator()` from the item `start`, for the datasets whose items
+    cannot be located in their files without parsing them.
+    """
+    return itertools.islice(create_iterator(), start, None)
+
+
+def _read_text_file(path, offset=0):
+    r"""Open a UTF-8 text file at a byte offset.
+    """
+    f = io.open(path, 'rb')
+    f.seek(offset)
+    return io.TextIOWrapper(f, encoding='utf8')
+
+
+def _read_lines(path, offset=0):
+    r"""Yield the lines of a UTF-8 text file from a byte offset.
+    """
+    with _read_text_file(path, offset) as f:
+        for line in f:
+            yield line
+
+
+def _get_shard():
+    r"""Return the index of the shard to read in the current process and the number of shards.
+
+    There is one shard per DataLoader worker of every distributed rank.
+    """
+    shard_id, num_shards = 0, 1
+    if torch.distributed.is_available() and torch.distributed.is_initialized():
+        shard_id, num_shards = torch.distributed.get_rank(), torch.distributed.get_world_size()
+    worker_info = torch.utils.data.get_worker_info()
+    if worker_info is not None:
+        shard_id = shard_id * worker_info.num_workers + worker_info.id
+        num_shards *= worker_info.num_workers
+    return shard_id, num_shards
+
+
+def _shard_records(path, shard_id, num_shards, csv=False, every=RECORD_OFFSETS_EVERY):
+    r"""Return the range [begin, end) of the records of a shard of a text file.
+
+    The file is split into `num_shards` byte ranges of about the same size, aligned to the
+    indexed records.
+    """
+    offsets = _record_offsets(path, every, csv)
+    size = os.path.getsize(path)
+    begin = bisect.bisect_left(offsets, size * shard_id // num_shards)
+    end = bisect.bisect_left(offsets, size * (shard_id + 1) // num_shards)
+    return begin * every, end * every
+
+
+def _iterate_shard(iterator, shard_id, num_shards, seek=None, shard_records=None):
+    r"""Return the items of the shard `shard_id` out of `num_shards` of a dataset.
+
+    If the dataset can `seek` to an item and split its records with `shard_records`, the shard is
+    read from its own part of the file. Otherwise, it is every `num_shards`-th item of `seek(0)`,
+    or of `iterator` for datasets without `seek`.
+    """
+    if seek is not None and shard_records is not None:
+        begin, end = shard_records(shard_id, num_shards)
+        return itertools.islice(seek(begin), end - begin)
+    if seek is not None:
+        iterator = seek(0)
+    return itertools.islice(iterator, shard_id, None, num_shards)
@@ -1,7 +1,9 @@
 import torch
 import logging
-import io
+from functools import partial
 from torchtext.utils import download_from_url, extract_archive
+from torchtext.experimental.datasets.raw.common import (_get_shard, _iterate_shard, _iterator_from,
+                                                        _read_lines, _shard_records)
 
 URLS = {
     'WikiText2':
@@ -18,32 +20,63 @@ URLS = {
 
 class RawTextIterableDataset(torch.utils.data.IterableDataset):
     """Defines an abstraction for raw text iterable datasets.
+
+    Used with several DataLoader workers or distributed processes, and unless `setup_iter` sets a
+    range of items or disables sharding, every worker of every rank reads its own shard of the
+    dataset.
     """
 
-    def __init__(self, iterator, start=0, num_lines=None):
+    def __init__(self, iterator, start=0, num_lines=None, seek=None, shard_records=None, path=None):
         """Initiate language modeling dataset.
+
+        Arguments:
+            iterator: the iterator over the lines of the dataset, read once if there is no `seek`.
+            seek: an optional callable returning a new iterator over the lines from a given index.
+                The dataset is then read again from its file at every iteration, and skips to the
+                `start` of `setup_iter` without reading the previous lines if the file is indexed.
+            shard_records: an optional callable returning the range of the lines of a shard, given
+                its index and the number of shards. Together with `seek`, it lets every worker read
+                only its own part of the file.
+            path: the path of the file the dataset reads, if any.
         """
         super(RawTextIterableDataset, self).__init__()
         self._iterator = iterator
+        self.path = path
+        self._seek = seek
+        self._shard_records = shard_records
         self.has_setup = False
         self.start = start
         self.num_lines = num_lines
+        self.shard = True
 
-    def setup_iter(self, start=0, num_lines=None):
+    def setup_iter(self, start=0, num_lines=None, shard=True):
         self.start = start
         self.num_lines = num_lines
+        self.shard = shard
         self.has_setup = True
 
     def __iter__(self):
         if not self.has_setup:
             self.setup_iter()
-        for i, item in enumerate(self._iterator):
+        if self.shard and self.start == 0 and self.num_lines is None:
+            shard_id, num_shards = _get_shard()
+            if num_shards > 1:
+                for item in _iterate_shard(self._iterator, shard_id, num_shards, self._seek, self._shard_records):
+                    yield item
+                return
+        if self._seek is not None:
+            iterator = enumerate(self._seek(self.start), self.start)
+        else:
+            iterator = enumerate(self._iterator)
+        for i, item in iterator:
             if i >= self.start:
                 yield item
             if (self.num_lines is not None) and (i == (self.start + self.num_lines)):
                 break
 
     def get_iterator(self):
+        if self._seek is not None:
+            return self._seek(0)
         return self._iterator
 
 
@@ -82,9 +115,11 @@ def _setup_datasets(dataset_name, root='.data', data_select=('train', 'test', 'v
     data = {}
     for item in _path.keys():
         logging.info('Creating {} data'.format(item))
-        data[item] = iter(io.open(_path[item], encoding="utf8"))
+        data[item] = _read_lines(_path[item])
 
-    return tuple(RawTextIterableDataset(data[item]) for item in data_select)
+    return tuple(RawTextIterableDataset(data[item], seek=partial(_iterator_from, _path[item], _read_lines),
+                                        shard_records=partial(_shard_records, _path[item]), path=_path[item])
+                 for item in data_select)
 
 
 def WikiText2(*args, **kwargs):
@@ -1,5 +1,7 @@
 import torch
+from functools import partial
 from torchtext.utils import download_from_url
+from torchtext.experimental.datasets.raw.common import _get_shard, _iterate_shard, _iterator_from_start
 import json
 
 URLS = {
@@ -29,27 +31,51 @@ def _create_data_from_json(data_path):
 
 class RawQuestionAnswerDataset(torch.utils.data.IterableDataset):
     """Defines an abstraction for raw question answer iterable datasets.
+
+    Used with several DataLoader workers or distributed processes, and unless `setup_iter` sets a
+    range of items or disables sharding, every worker of every rank reads its own shard of the
+    dataset: every `num_shards`-th item, since the items cannot be located in the file without
+    parsing it.
     """
 
-    def __init__(self, iterator):
+    def __init__(self, iterator, seek=None):
         """Initiate text-classification dataset.
+
+        Arguments:
+            iterator: the iterator over the items of the dataset, read once if there is no `seek`.
+            seek: an optional callable returning a new iterator over the items from a given index.
+                The dataset is then read again from its file at every iteration.
         """
         super(RawQuestionAnswerDataset, self).__init__()
         self._iterator = iterator
+        self._seek = seek
         self.has_setup = False
         self.start = 0
         self.num_lines = None
+        self.shard = True
 
-    def setup_iter(self, start=0, num_lines=None):
+    def setup_iter(self, start=0, num_lines=None, shard=True):
         self.start = start
         self.num_lines = num_lines
+        self.shard = shard
         self.has_setup = True
 
     def __iter__(self):
         if not self.has_setup:
             self.setup_iter()
 
-        for i, item in enumerate(self._iterator):
+        if self.shard and self.start == 0 and self.num_lines is None:
+            shard_id, num_shards = _get_shard()
+            if num_shards > 1:
+                for item in _iterate_shard(self._iterator, shard_id, num_shards, self._seek):
+                    yield item
+                return
+
+        if self._seek is not None:
+            iterator = enumerate(self._seek(self.start), self.start)
+        else:
+            iterator = enumerate(self._iterator)
+        for i, item in iterator:
             if i >= self.start:
                 yield item
             if self.num_lines is not None and i == (self.start + self.num_lines):
@@ -63,8 +89,10 @@ def _setup_datasets(dataset_name, root='.data'):
                                          root=root) for key in select_to_index.keys()]
     train_iter = _create_data_from_json(extracted_files[0])
     dev_iter = _create_data_from_json(extracted_files[1])
-    return (RawQuestionAnswerDataset(train_iter),
-            RawQuestionAnswerDataset(dev_iter))
+    train_seek = partial(_iterator_from_start, partial(_create_data_from_json, extracted_files[0]))
+    dev_seek = partial(_iterator_from_start, partial(_create_data_from_json, extracted_files[1]))
+    return (RawQuestionAnswerDataset(train_iter, seek=train_seek),
+            RawQuestionAnswerDataset(dev_iter, seek=dev_seek))
 
 
 def SQuAD1(*args, **kwargs):
@@ -1,6 +1,8 @@
 import torch
+from functools import partial
 
 from torchtext.utils import download_from_url, extract_archive
+from torchtext.experimental.datasets.raw.common import _get_shard, _iterate_shard, _iterator_from_start
 
 URLS = {
     "UDPOS":
@@ -65,7 +67,9 @@ def _setup_datasets(dataset_name, separator, root=".data"):
         if data_filenames[key] is not None:
             datasets.append(
                 RawSequenceTaggingIterableDataset(
-                    _create_data_from_iob(data_filenames[key], separator)))
+                    _create_data_from_iob(data_filenames[key], separator),
+                    seek=partial(_iterator_from_start,
+                                 partial(_create_data_from_iob, data_filenames[key], separator))))
         else:
             datasets.append(None)
 
@@ -74,25 +78,51 @@ def _setup_datasets(dataset_name, separator, root=".data"):
 
 class RawSequenceTaggingIterableDataset(torch.utils.data.IterableDataset):
     """Defines an abstraction for raw text sequence tagging iterable datasets.
+
+    Used with several DataLoader workers or distributed processes, and unless `setup_iter` sets a
+    range of items or disables sharding, every worker of every rank reads its own shard of the
+    dataset: every `num_shards`-th item, since the items cannot be located in the file without
+    parsing it.
     """
-    def __init__(self, iterator):
+    def __init__(self, iterator, seek=None):
+        """Initiate sequence tagging dataset.
+
+        Arguments:
+            iterator: the iterator over the items of the dataset, read once if there is no `seek`.
+            seek: an optional callable returning a new iterator over the items from a given index.
+                The dataset is then read again from its file at every iteration.
+        """
         super(RawSequenceTaggingIterableDataset).__init__()
 
         self._iterator = iterator
+        self._seek = seek
         self.has_setup = False
         self.start = 0
         self.num_lines = None
+        self.shard = True
 
-    def setup_iter(self, start=0, num_lines=None):
+    def setup_iter(self, start=0, num_lines=None, shard=True):
         self.start = start
         self.num_lines = num_lines
+        self.shard = shard
         self.has_setup = True
 
     def __iter__(self):
         if not self.has_setup:
             self.setup_iter()
 
-        for i, item in enumerate(self._iterator):
+        if self.shard and self.start == 0 and self.num_lines is None:
+            shard_id, num_shards = _get_shard()
+            if num_shards > 1:
+                for item in _iterate_shard(self._iterator, shard_id, num_shards, self._seek):
+                    yield item
+                return
+
+        if self._seek is not None:
+            iterator = enumerate(self._seek(self.start), self.start)
+        else:
+            iterator = enumerate(self._iterator)
+        for i, item in iterator:
             if i >= self.start:
                 yield item
             if (self.num_lines is not None) and (i == (self.start +
@@ -100,6 +130,8 @@ class RawSequenceTaggingIterableDataset(torch.utils.data.IterableDataset):
                 break
 
     def get_iterator(self):
+        if self._seek is not None:
+            return self._seek(0)
         return self._iterator
 
 
@@ -1,6 +1,9 @@
 import torch
 import io
+from functools import partial
 from torchtext.utils import download_from_url, extract_archive, unicode_csv_reader
+from torchtext.experimental.datasets.raw.common import (_get_shard, _iterate_shard, _iterator_from,
+                                                        _iterator_from_start, _read_text_file, _shard_records)
 
 URLS = {
     'AG_NEWS':
@@ -24,8 +27,8 @@ URLS = {
 }
 
 
-def _create_data_from_csv(data_path):
-    with io.open(data_path, encoding="utf8") as f:
+def _create_data_from_csv(data_path, offset=0):
+    with _read_text_file(data_path, offset) as f:
         reader = unicode_csv_reader(f)
         for row in reader:
             yield int(row[0]), ' '.join(row[1:])
@@ -33,33 +36,65 @@ def _create_data_from_csv(data_path):
 
 class RawTextIterableDataset(torch.utils.data.IterableDataset):
     """Defines an abstraction for raw text iterable datasets.
+
+    Used with several DataLoader workers or distributed processes, and unless `setup_iter` sets a
+    range of items or disables sharding, every worker of every rank reads its own shard of the
+    dataset.
     """
 
-    def __init__(self, iterator):
+    def __init__(self, iterator, seek=None, shard_records=None, path=None):
         """Initiate text-classification dataset.
+
+        Arguments:
+            iterator: the iterator over the items of the dataset, read once if there is no `seek`.
+            seek: an optional callable returning a new iterator over the items from a given index.
+                The dataset is then read again from its file at every iteration, and skips to the
+                `start` of `setup_iter` without reading the previous items if the file is indexed.
+            shard_records: an optional callable returning the range of the items of a shard, given
+                its index and the number of shards. Together with `seek`, it lets every worker read
+                only its own part of the file.
+            path: the path of the file the dataset reads, if any.
         """
         super(RawTextIterableDataset, self).__init__()
         self._iterator = iterator
+        self.path = path
+        self._seek = seek
+        self._shard_records = shard_records
         self.has_setup = False
         self.start = 0
         self.num_lines = None
+        self.shard = True
 
-    def setup_iter(self, start=0, num_lines=None):
+    def setup_iter(self, start=0, num_lines=None, shard=True):
         self.start = start
         self.num_lines = num_lines
+        self.shard = shard
         self.has_setup = True
 
     def __iter__(self):
         if not self.has_setup:
             self.setup_iter()
 
-        for i, item in enumerate(self._iterator):
+        if self.shard and self.start == 0 and self.num_lines is None:
+            shard_id, num_shards = _get_shard()
+            if num_shards > 1:
+                for item in _iterate_shard(self._iterator, shard_id, num_shards, self._seek, self._shard_records):
+                    yield item
+                return
+
+        if self._seek is not None:
+            iterator = enumerate(self._seek(self.start), self.start)
+        else:
+            iterator = enumerate(self._iterator)
+        for i, item in iterator:
             if i >= self.start:
                 yield item
             if self.num_lines is not None and i == (self.start + self.num_lines):
                 break
 
     def get_iterator(self):
+        if self._seek is not None:
+            return self._seek(0)
         return self._iterator
 
 
@@ -75,8 +110,14 @@ def _setup_datasets(dataset_name, root='.data'):
 
     train_iter = _create_data_from_csv(train_csv_path)
     test_iter = _create_data_from_csv(test_csv_path)
-    return (RawTextIterableDataset(train_iter),
-            RawTextIterableDataset(test_iter))
+    return (RawTextIterableDataset(train_iter,
+                                   seek=partial(_iterator_from, train_csv_path, _create_data_from_csv, csv=True),
+                                   shard_records=partial(_shard_records, train_csv_path, csv=True),
+                                   path=train_csv_path),
+            RawTextIterableDataset(test_iter,
+                                   seek=partial(_iterator_from, test_csv_path, _create_data_from_csv, csv=True),
+                                   shard_records=partial(_shard_records, test_csv_path, csv=True),
+                                   path=test_csv_path))
 
 
 def AG_NEWS(*args, **kwargs):
@@ -243,8 +284,10 @@ def IMDB(root='.data'):
     extracted_files = extract_archive(dataset_tar)
     train_iter = generate_imdb_data('train', extracted_files)
     test_iter = generate_imdb_data('test', extracted_files)
-    return (RawTextIterableDataset(train_iter),
-            RawTextIterableDataset(test_iter))
+    train_seek = partial(_iterator_from_start, partial(generate_imdb_data, 'train', extracted_files))
+    test_seek = partial(_iterator_from_start, partial(generate_imdb_data, 'test', extracted_files))
+    return (RawTextIterableDataset(train_iter, seek=train_seek),
+            RawTextIterableDataset(test_iter, seek=test_seek))
 
 
 DATASETS = {
@@ -4,9 +4,12 @@ import io
 import codecs
 import xml.etree.ElementTree as ET
 from collections import defaultdict
+from functools import partial
 
 from torchtext.utils import (download_from_url, extract_archive,
                              unicode_csv_reader)
+from torchtext.experimental.datasets.raw.common import (_get_shard, _iterate_shard, _iterator_from,
+                                                        _read_text_file, _shard_records)
 
 URLS = {
     'Multi30k': [
@@ -67,8 +70,8 @@ URLS = {
 }
 
 
-def _read_text_iterator(path):
-    with io.open(path, encoding="utf8") as f:
+def _read_text_iterator(path, offset=0):
+    with _read_text_file(path, offset) as f:
         reader = unicode_csv_reader(f)
         for row in reader:
             yield " ".join(row)
@@ -171,35 +174,82 @@ def _setup_datasets(dataset_name,
         src_data_iter = _read_text_iterator(data_filenames[key][0])
         tgt_data_iter = _read_text_iterator(data_filenames[key][1])
 
+        src_seek = partial(_iterator_from, data_filenames[key][0], _read_text_iterator, csv=True)
+        tgt_seek = partial(_iterator_from, data_filenames[key][1], _read_text_iterator, csv=True)
+
+        # the source and target shards hold the same sentences, they are split on the source file
+        shard_records = partial(_shard_records, data_filenames[key][0], csv=True)
+
         datasets.append(
-            RawTranslationIterableDataset(src_data_iter, tgt_data_iter))
+            RawTranslationIterableDataset(src_data_iter, tgt_data_iter,
+                                          src_seek=src_seek, tgt_seek=tgt_seek,
+                                          shard_records=shard_records))
 
     return tuple(datasets)
 
 
 class RawTranslationIterableDataset(torch.utils.data.IterableDataset):
     """Defines an abstraction for raw text iterable datasets.
+
+    Used with several DataLoader workers or distributed processes, and unless `setup_iter` sets a
+    range of items or disables sharding, every worker of every rank reads its own shard of the
+    dataset.
     """
-    def __init__(self, src_iterator, tgt_iterator):
+    def __init__(self, src_iterator, tgt_iterator, src_seek=None, tgt_seek=None, shard_records=None):
         """Initiate text-classification dataset.
+
+        Arguments:
+            src_iterator, tgt_iterator: the iterators over the source and target sentences, read
+                once if there is no `src_seek` and `tgt_seek`.
+            src_seek, tgt_seek: optional callables returning new iterators over the source and
+                target sentences from a given index. The dataset is then read again from its files
+                at every iteration, and skips to the `start` of `setup_iter` without reading the
+                previous sentences.
+            shard_records: an optional callable returning the range of the sentences of a shard,
+                given its index and the number of shards. Together with `src_seek` and `tgt_seek`,
+                it lets every worker read only its own part of the files.
         """
         super(RawTranslationIterableDataset, self).__init__()
         self._src_iterator = src_iterator
         self._tgt_iterator = tgt_iterator
+        self._src_seek = src_seek
+        self._tgt_seek = tgt_seek
+        self._shard_records = shard_records
         self.has_setup = False
         self.start = 0
         self.num_lines = None
+        self.shard = True
 
-    def setup_iter(self, start=0, num_lines=None):
+    def setup_iter(self, start=0, num_lines=None, shard=True):
         self.start = start
         self.num_lines = num_lines
+        self.shard = shard
         self.has_setup = True
 
+    def _seek(self, start):
+        return zip(self._src_seek(start), self._tgt_seek(start))
+
     def __iter__(self):
         if not self.has_setup:
             self.setup_iter()
 
-        for i, item in enumerate(zip(self._src_iterator, self._tgt_iterator)):
+        seek = None
+        if self._src_seek is not None and self._tgt_seek is not None:
+            seek = self._seek
+
+        if self.shard and self.start == 0 and self.num_lines is None:
+            shard_id, num_shards = _get_shard()
+            if num_shards > 1:
+                for item in _iterate_shard(zip(self._src_iterator, self._tgt_iterator), shard_id, num_shards,
+                                           seek, self._shard_records):
+                    yield item
+                return
+
+        if seek is not None:
+            iterator = enumerate(seek(self.start), self.start)
+        else:
+            iterator = enumerate(zip(self._src_iterator, self._tgt_iterator))
+        for i, item in iterator:
             if i >= self.start:
                 yield item
             if (self.num_lines is not None) and (i == (self.start +
@@ -207,6 +257,8 @@ class RawTranslationIterableDataset(torch.utils.data.IterableDataset):
                 break
 
     def get_iterator(self):
+        if self._src_seek is not None and self._tgt_seek is not None:
+            return (self._src_seek(0), self._tgt_seek(0))
         return (self._src_iterator, self._tgt_iterator)
 
 
@@ -34,6 +34,10 @@ def _setup_datasets(dataset_name,
         raise TypeError("Given data selection {} is not supported!".format(data_select))
 
     train, val, test = DATASETS[dataset_name](root=root)
+    # Every process builds the whole dataset, the raw datasets must not be sharded
+    for raw_dataset in (train, val, test):
+        if raw_dataset:
+            raw_dataset.setup_iter(shard=False)
     raw_data = {
         "train": [line for line in train] if train else None,
         "valid": [line for line in val] if val else None,
@@ -1,6 +1,8 @@
 import torch
-from torchtext.data.utils import get_tokenizer
+from torchtext.data.utils import get_tokenizer, TokenIdStore
 from torchtext.vocab import build_vocab_from_iterator
+from torchtext.utils import (_dataset_cache_key, _load_from_dataset_cache, _save_to_dataset_cache,
+                             _tokenizer_key, _vocab_key)
 from torchtext.experimental.datasets.raw import text_classification as raw
 from torchtext.experimental.functional import (
     vocab_func,
@@ -10,11 +12,17 @@ from torchtext.experimental.functional import (
 )
 
 
-def _build_vocab(data, transforms):
-    tok_list = []
-    for _, txt in data:
-        tok_list.append(transforms(txt))
-    return build_vocab_from_iterator(tok_list)
+def _build_vocab(data, transforms, labels=None):
+    r"""Build the vocab of the texts of `data` in a single pass, adding their labels to the
+    `labels` set if one is given.
+    """
+    def tokens():
+        for label, txt in data:
+            if labels is not None:
+                labels.add(label)
+            yield transforms(txt)
+
+    return build_vocab_from_iterator(tokens())
 
 
 class TextClassificationDataset(torch.utils.data.Dataset):
@@ -36,6 +44,8 @@ class TextClassificationDataset(torch.utils.data.Dataset):
         Arguments:
             data: a list of label and text tring tuple. label is an integer.
                 [(label1, text1), (label2, text2), (label2, text3)]
+                or a TokenIdStore of the labels and the numericalized texts,
+                which are returned without the text transforms.
             vocab: Vocabulary object used for dataset.
             transforms: a tuple of label and text string transforms.
         """
@@ -46,14 +56,17 @@ class TextClassificationDataset(torch.utils.data.Dataset):
         self.transforms = transforms  # (label_transforms, tokens_transforms)
 
     def __getitem__(self, i):
-        label = self.data[i][0]
-        txt = self.data[i][1]
+        label, txt = self.data[i]
+        if isinstance(self.data, TokenIdStore):
+            return (self.transforms[0](label), txt)
         return (self.transforms[0](label), self.transforms[1](txt))
 
     def __len__(self):
         return len(self.data)
 
     def get_labels(self):
+        if isinstance(self.data, TokenIdStore):
+            return set(self.transforms[0](label) for label in self.data.labels.unique().tolist())
         labels = []
         for item in self.data:
             label = item[0]
@@ -64,6 +77,53 @@ class TextClassificationDataset(torch.utils.data.Dataset):
         return self.vocab
 
 
+def _load_cached_data(root, key, data_select):
+    names = [item + suffix for item in data_select for suffix in ('_ids', '_offsets', '_labels')]
+    cached = _load_from_dataset_cache(root, key, names)
+    if cached is None:
+        return None
+    tensors, vocab = cached
+    data = {item: TokenIdStore(tensors[item + '_ids'], tensors[item + '_offsets'],
+                               tensors[item + '_labels'], dtype=torch.long)
+            for item in data_select}
+    return data, vocab
+
+
+class TextClassificationIterableDataset(torch.utils.data.IterableDataset):
+    """Defines an abstract text classification iterable dataset, which reads
+       a raw dataset and transforms its items on the fly. It is returned by the
+       text classification datasets with `streaming=True`.
+    """
+
+    def __init__(self, data, vocab, transforms, labels):
+        """Initiate text-classification iterable dataset.
+
+        Arguments:
+            data: an iterable of label and text string tuples, read again at
+                every iteration. label is an integer.
+            vocab: Vocabulary object used for dataset.
+            transforms: a tuple of label and text string transforms.
+            labels: the set of the labels of the whole dataset, before
+                transforms, collected when the dataset is set up.
+        """
+
+        super(TextClassificationIterableDataset, self).__init__()
+        self.data = data
+        self.vocab = vocab
+        self.transforms = transforms  # (label_transforms, tokens_transforms)
+        self.labels = labels
+
+    def __iter__(self):
+        for label, txt in self.data:
+            yield (self.transforms[0](label), self.transforms[1](txt))
+
+    def get_labels(self):
+        return set(self.transforms[0](label) for label in self.labels)
+
+    def get_vocab(self):
+        return self.vocab
+
+
 def _setup_datasets(
     dataset_name,
     root=".data",
@@ -71,6 +131,8 @@ def _setup_datasets(
     vocab=None,
     tokenizer=None,
     data_select=("train", "test"),
+    streaming=False,
+    use_cache=True,
 ):
     text_transform = []
     if tokenizer is None:
@@ -82,23 +144,73 @@ def _setup_datasets(
     if not set(data_select).issubset(set(("train", "test"))):
         raise TypeError("Given data selection {} is not supported!".format(data_select))
     train, test = raw.DATASETS[dataset_name](root=root)
-    # Cache raw text iterable dataset
-    raw_data = {
-        "train": [(label, txt) for (label, txt) in train],
-        "test": [(label, txt) for (label, txt) in test],
-    }
-
-    if vocab is None:
-        if "train" not in data_select:
-            raise TypeError("Must pass a vocab if train is not selected.")
-        vocab = _build_vocab(raw_data["train"], text_transform)
+    # Every process builds the whole dataset, the raw datasets must not be sharded
+    train.setup_iter(shard=False)
+    test.setup_iter(shard=False)
+
+    key = None
+    # IMDB is read from many files and has no path, the streamed datasets are not processed ahead
+    if use_cache and not streaming and train.path is not None and test.path is not None:
+        key = _dataset_cache_key(dataset_name, [train.path, test.path],
+                                 tokenizer=_tokenizer_key(tokenizer), ngrams=ngrams,
+                                 vocab=_vocab_key(vocab) if vocab is not None else 'train',
+                                 data_select=sorted(data_select))
+    cached = _load_cached_data(root, key, data_select) if key is not None else None
+    if cached is not None:
+        data, vocab = cached
+    else:
+        if streaming or key is not None:
+            # The texts are read from disk at every pass, and only numericalized ones are held
+            raw_data = {"train": train, "test": test}
+        else:
+            # Cache raw text iterable dataset
+            raw_data = {
+                "train": [(label, txt) for (label, txt) in train],
+                "test": [(label, txt) for (label, txt) in test],
+            }
+
+        # The labels of the streamed datasets are collected once, from the whole
+        # datasets, along with the vocab for the train dataset
+        labels = {}
+        if vocab is None:
+            if "train" not in data_select:
+                raise TypeError("Must pass a vocab if train is not selected.")
+            if streaming:
+                labels["train"] = set()
+            vocab = _build_vocab(raw_data["train"], text_transform, labels.get("train"))
+        if streaming:
+            for item in data_select:
+                if item not in labels:
+                    labels[item] = set(label for label, _ in raw_data[item])
+        if key is not None:
+            ids_transform = sequential_transforms(text_transform, vocab_func(vocab))
+            data = {item: TokenIdStore.from_iterator(((label, ids_transform(txt)) for label, txt in raw_data[item]),
+                                                     num_ids=len(vocab), with_labels=True, dtype=torch.long)
+                    for item in data_select}
+            tensors = {}
+            for item in data_select:
+                tensors.update({item + '_ids': data[item].ids, item + '_offsets': data[item].offsets,
+                                item + '_labels': data[item].labels})
+            _save_to_dataset_cache(root, key, tensors, vocab)
+        else:
+            data = raw_data
     text_transform = sequential_transforms(
         text_transform, vocab_func(vocab), totensor(dtype=torch.long)
     )
     label_transform = sequential_transforms(totensor(dtype=torch.long))
+    if streaming:
+        # The datasets are read by the DataLoader workers, each of them reads its own shard
+        for item in data_select:
+            data[item].setup_iter()
+        return tuple(
+            TextClassificationIterableDataset(
+                data[item], vocab, (label_transform, text_transform), labels[item]
+            )
+            for item in data_select
+        )
     return tuple(
         TextClassificationDataset(
-            raw_data[item], vocab, (label_transform, text_transform)
+            data[item], vocab, (label_transform, text_transform)
         )
         for item in data_select
     )
@@ -133,6 +245,14 @@ def AG_NEWS(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import AG_NEWS
@@ -141,6 +261,7 @@ def AG_NEWS(*args, **kwargs):
         >>> tokenizer = get_tokenizer("spacy")
         >>> train, test = AG_NEWS(tokenizer=tokenizer)
         >>> train, = AG_NEWS(tokenizer=tokenizer, data_select='train')
+        >>> train, test = AG_NEWS(streaming=True)
 
     """
 
@@ -177,6 +298,14 @@ def SogouNews(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import SogouNews
@@ -230,6 +359,14 @@ def DBpedia(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import DBpedia
@@ -271,6 +408,14 @@ def YelpReviewPolarity(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import YelpReviewPolarity
@@ -311,6 +456,14 @@ def YelpReviewFull(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import YelpReviewFull
@@ -360,6 +513,14 @@ def YahooAnswers(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import YahooAnswers
@@ -401,6 +562,14 @@ def AmazonReviewPolarity(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import AmazonReviewPolarity
@@ -441,6 +610,14 @@ def AmazonReviewFull(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
+        use_cache: reload the processed data from, and save it to, the cache in
+            root/processed (see torchtext.utils.clear_dataset_cache). Only used with
+            `streaming = False` and a tokenizer that can be identified: a named
+            function or a picklable object.
+            (Default: True)
 
     Examples:
         >>> from torchtext.experimental.datasets import AmazonReviewFull
@@ -483,6 +660,9 @@ def IMDB(*args, **kwargs):
             just a string 'train'. If 'train' is not in the tuple or string, a vocab
             object should be provided which will be used to process valid and/or test
             data.
+        streaming: if True, return iterable datasets which read the raw data from
+            disk and transform it on the fly, instead of holding it in memory.
+            The vocab is built in one pass over the train data. Default: False
 
     Examples:
         >>> from torchtext.experimental.datasets import IMDB
@@ -41,6 +41,9 @@ def _setup_datasets(dataset_name,
                                               valid_filenames=valid_filenames,
                                               test_filenames=test_filenames,
                                               root=root)
+    # Every process builds the whole dataset, the raw datasets must not be sharded
+    for raw_dataset in (train, val, test):
+        raw_dataset.setup_iter(shard=False)
     raw_data = {
         "train": [line for line in train],
         "valid": [line for line in val],
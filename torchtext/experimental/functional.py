@@ -23,7 +23,50 @@ def ngrams_func(ngrams):
     return func
 
 
-def sequential_transforms(*transforms):
+def hashed_ngrams_func(ngrams, num_buckets, bucket_offset):
+    r"""Returns a function adding the hashed ids of the 2-grams to `ngrams`-grams of
+    a tensor of token ids after the token ids, the way fastText does. The n-grams are
+    hashed natively into `num_buckets` buckets whose ids start at `bucket_offset`
+    (usually the size of the vocab), so that no n-gram vocab is needed.
+
+    Examples:
+        >>> from torchtext.experimental.functional import hashed_ngrams_func
+        >>> hashed_ngrams = hashed_ngrams_func(2, num_buckets=2000000, bucket_offset=len(vocab))
+        >>> hashed_ngrams(torch.tensor([4, 8, 15]))  # ids 4, 8, 15 then the ids of 2 bigrams
+    """
+    def func(ids):
+        features, _ = torch.ops.torchtext.hashed_ngrams(ids, torch.zeros(1, dtype=torch.long),
+                                                        ngrams, num_buckets, bucket_offset)
+        return features
+
+    return func
+
+
+def sequential_transforms(*transforms, profiler=None):
+    r"""Returns a function applying the transforms one after the other to a single input.
+
+    If a `torchtext.experimental.profiler.StageProfiler` is given as `profiler`, the
+    statistics of every transform are recorded in it.
+
+    Examples:
+        >>> from torchtext.experimental.functional import sequential_transforms
+        >>> from torchtext.experimental.profiler import StageProfiler
+        >>> profiler = StageProfiler()
+        >>> pipeline = sequential_transforms(tokenizer, vocab_func(vocab), profiler=profiler)
+        >>> ids = pipeline('here is an example')
+        >>> print(profiler.summary())
+    """
+    if profiler is not None:
+        names = ['{}:{}'.format(idx, getattr(transform, '__qualname__', type(transform).__name__))
+                 for idx, transform in enumerate(transforms)]
+
+        def profiled_func(txt_input):
+            for name, transform in zip(names, transforms):
+                txt_input = profiler.record(name, transform, txt_input, batch=False)
+            return txt_input
+
+        return profiled_func
+
     def func(txt_input):
         for transform in transforms:
             txt_input = transform(txt_input)
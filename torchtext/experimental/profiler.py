@@ -0,0 +1,150 @@
+import sys
+import time
+from collections import OrderedDict
+
+import torch
+
+
+__all__ = [
+    'StageStats',
+    'StageProfiler'
+]
+
+
+def _measure(data, batch):
+    r"""Return the number of lines, tokens and bytes of the input or output of a stage.
+
+    If `batch`, the top level of `data` is a list of lines, otherwise `data` is a single line.
+    Tokens are the elements of the token sequences (strings or ids), bytes are the UTF-8 size
+    of the strings plus the storage size of the tensors.
+    """
+    if isinstance(data, torch.Tensor):
+        num_lines = data.size(0) if batch and data.dim() > 1 else 1
+        return num_lines, data.numel(), data.numel() * data.element_size()
+    if isinstance(data, str):
+        return 1, 0, len(data.encode('utf-8'))
+    if isinstance(data, (list, tuple)):
+        if not batch:
+            num_tokens, num_bytes = 0, 0
+            for item in data:
+                _, item_tokens, item_bytes = _measure(item, False)
+                num_tokens += max(item_tokens, 1)
+                num_bytes += item_bytes
+            return 1, num_tokens, num_bytes
+        num_tokens, num_bytes = 0, 0
+        for line in data:
+            _, line_tokens, line_bytes = _measure(line, False)
+            num_tokens += line_tokens
+            num_bytes += line_bytes
+        return len(data), num_tokens, num_bytes
+    return 1, 0, 0
+
+
+class StageStats(object):
+    r"""Statistics of a pipeline stage recorded by a `StageProfiler`.
+
+    Attributes:
+        calls (int): the number of calls of the stage.
+        time (float): the total wall time spent in the stage, in seconds.
+        input_lines, input_tokens, input_bytes (int): the total size of the inputs of the stage.
+        output_lines, output_tokens, output_bytes (int): the total size of the outputs of the stage.
+        allocated_blocks (int): the net number of memory blocks allocated by the Python allocator
+            during the calls of the stage (memory allocated natively is not counted).
+    """
+    __slots__ = ['calls', 'time', 'input_lines', 'input_tokens', 'input_bytes',
+                 'output_lines', 'output_tokens', 'output_bytes', 'allocated_blocks']
+
+    def __init__(self):
+        for attr in self.__slots__:
+            setattr(self, attr, 0)
+
+    def __repr__(self):
+        return 'StageStats({})'.format(', '.join('{}={}'.format(attr, getattr(self, attr))
+                                                 for attr in self.__slots__))
+
+
+class StageProfiler(object):
+    r"""Records per-stage statistics of text pipelines.
+
+    A profiler is attached to a pipeline with `TextSequentialTransforms.profile` or the `profiler`
+    argument of `torchtext.experimental.functional.sequential_transforms`. Every stage call is also
+    recorded as a `torch.autograd.profiler.record_function` range, so that the stages show up in
+    `torch.autograd.profiler` traces. Scripted pipelines are never instrumented.
+
+    Examples:
+        >>> from torchtext.experimental.profiler import StageProfiler
+        >>> from torchtext.experimental.transforms import basic_english_normalize, TextSequentialTransforms
+        >>> profiler = StageProfiler()
+        >>> pipeline = TextSequentialTransforms(basic_english_normalize(), vocab_transform)
+        >>> profiled_pipeline = pipeline.profile(profiler)
+        >>> ids = profiled_pipeline(['here is an example'])
+        >>> print(profiler.summary())
+    """
+
+    def __init__(self):
+        self._stats = OrderedDict()
+
+    def record(self, name, stage, data, batch=True):
+        r"""Call `stage` on `data` and record the call under `name`.
+
+        Args:
+            name (str): the name of the stage.
+            stage (Callable): the stage.
+            data: the input of the stage.
+            batch (bool): whether `data` is a list of lines or a single line.
+
+        Returns:
+            the output of the stage.
+        """
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = StageStats()
+        input_lines, input_tokens, input_bytes = _measure(data, batch)
+
+        with torch.autograd.profiler.record_function(name):
+            allocated_blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            output = stage(data)
+            stats.time += time.perf_counter() - start
+            stats.allocated_blocks += sys.getallocatedblocks() - allocated_blocks
+
+        output_lines, output_tokens, output_bytes = _measure(output, batch)
+        stats.calls += 1
+        stats.input_lines += input_lines
+        stats.input_tokens += input_tokens
+        stats.input_bytes += input_bytes
+        stats.output_lines += output_lines
+        stats.output_tokens += output_tokens
+        stats.output_bytes += output_bytes
+        return output
+
+    def stats(self):
+        r"""
+        Returns:
+            Dict[str, StageStats]: the statistics of every stage, in the order they were first called.
+        """
+        return OrderedDict(self._stats)
+
+    def reset(self):
+        r"""Clear the recorded statistics.
+        """
+        self._stats.clear()
+
+    def summary(self):
+        r"""
+        Returns:
+            str: a table of the statistics of every stage.
+        """
+        header = ('stage', 'calls', 'time (s)', 'share', 'lines in', 'tokens in', 'bytes in',
+                  'lines out', 'tokens out', 'bytes out', 'alloc blocks')
+        total_time = sum(stats.time for stats in self._stats.values())
+        rows = [header]
+        for name, stats in self._stats.items():
+            share = stats.time / total_time if total_time > 0 else 0.
+            rows.append((name, str(stats.calls), '{:.6f}'.format(stats.time), '{:.1%}'.format(share),
+                         str(stats.input_lines), str(stats.input_tokens), str(stats.input_bytes),
+                         str(stats.output_lines), str(stats.output_tokens), str(stats.output_bytes),
+                         str(stats.allocated_blocks)))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        return '\n'.join('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+                         for row in rows)
@@ -0,0 +1,291 @@
+import torch
+
+
+__all__ = [
+    'lengths_from_dataset',
+    'BucketBatchSampler',
+    'TokenBatchSampler'
+]
+
+
+def lengths_from_dataset(dataset, length_fn):
+    r"""Compute the lengths of the items of a map-style dataset in one pass.
+
+    Args:
+        dataset: a map-style dataset.
+        length_fn (Callable): a function returning the length of an item, or a tuple of lengths
+            (e.g. of the source and target sentences of a translation dataset).
+
+    Returns:
+        Tensor: the lengths, a 1-D long tensor or a 2-D long tensor of one row per item.
+
+    Examples:
+        >>> from torchtext.experimental.datasets import Multi30k
+        >>> from torchtext.experimental.samplers import lengths_from_dataset
+        >>> train_dataset, valid_dataset, test_dataset = Multi30k()
+        >>> lengths = lengths_from_dataset(train_dataset, lambda item: (len(item[0]), len(item[1])))
+    """
+    return torch.tensor([length_fn(dataset[i]) for i in range(len(dataset))], dtype=torch.long)
+
+
+def _get_replicas(num_replicas, rank):
+    if num_replicas is None:
+        num_replicas = 1
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            num_replicas = torch.distributed.get_world_size()
+    if rank is None:
+        rank = 0
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            rank = torch.distributed.get_rank()
+    if rank < 0 or rank >= num_replicas:
+        raise ValueError('Invalid rank {}, rank should be in the interval [0, {}]'.format(rank, num_replicas - 1))
+    return num_replicas, rank
+
+
+def _sort_keys(lengths):
+    r"""Return the 1-D sort keys of 1-D lengths, or of 2-D lengths (sorted by their first column, then
+    by the next ones).
+    """
+    if lengths.dim() == 1:
+        return lengths
+    keys = torch.zeros(lengths.size(0), dtype=torch.long)
+    if lengths.size(0) == 0:
+        return keys
+    for column in lengths.t():
+        keys = keys * (column.max().item() + 1) + column
+    return keys
+
+
+def _pool_sort(indices, keys, pool_size):
+    r"""Sort the indices by their keys within consecutive pools of `pool_size` indices."""
+    pools = indices.split(pool_size)
+    return torch.cat([pool[torch.argsort(keys[pool])] for pool in pools]) if pools else indices
+
+
+def _shard_batches(batches, num_replicas, rank):
+    r"""Return the batches of a replica. Batches are repeated from the start so that every replica
+    gets the same number of batches.
+    """
+    if num_replicas == 1 or not batches:
+        return batches
+    num_batches = -(-len(batches) // num_replicas) * num_replicas
+    batches = batches * -(-num_batches // len(batches))
+    return batches[rank:num_batches:num_replicas]
+
+
+class BucketBatchSampler(torch.utils.data.Sampler):
+    r"""Batch sampler grouping items of similar lengths, to minimize padding.
+
+    At every epoch, the items are shuffled and split into pools of `pool_size` items, the items are
+    sorted by length within every pool, and cut into batches of `batch_size` items, which are shuffled.
+    The sorts run with `torch.argsort`, without Python key functions.
+
+    With several distributed processes, every rank gets its own batches. Call `set_epoch` at every
+    epoch, with the same seed on every rank, to change the batches while keeping the ranks consistent.
+
+    Args:
+        lengths: the lengths of the items, a 1-D tensor or a 2-D tensor of one row per item (e.g. the
+            source and target lengths). 2-D lengths are sorted by their first column, then the next ones.
+            See `lengths_from_dataset`, or `TokenIdStore.lengths`.
+        batch_size (int): the number of items of a batch.
+        pool_size (int): the number of items sorted together. Default: 100 * batch_size.
+        shuffle (bool): whether to shuffle the items and the batches. Default: True
+        drop_last (bool): whether to drop the last batch if it holds less than `batch_size` items.
+            Default: False
+        num_replicas (int): the number of distributed processes. Default: the world size.
+        rank (int): the rank of the current process. Default: the current rank.
+        seed (int): the random seed, which must be the same on every rank. Default: 0
+
+    Examples:
+        >>> from torch.utils.data import DataLoader
+        >>> from torchtext.experimental.datasets import AG_NEWS
+        >>> from torchtext.experimental.samplers import BucketBatchSampler, lengths_from_dataset
+        >>> train_dataset, test_dataset = AG_NEWS()
+        >>> lengths = lengths_from_dataset(train_dataset, lambda item: len(item[1]))
+        >>> sampler = BucketBatchSampler(lengths, batch_size=16)
+        >>> dataloader = DataLoader(train_dataset, batch_sampler=sampler, collate_fn=generate_batch)
+        >>> for epoch in range(num_epochs):
+        >>>     sampler.set_epoch(epoch)
+        >>>     for batch in dataloader:
+        >>>         ...
+    """
+
+    def __init__(self, lengths, batch_size, pool_size=None, shuffle=True, drop_last=False,
+                 num_replicas=None, rank=None, seed=0):
+        if not isinstance(lengths, torch.Tensor):
+            lengths = torch.tensor(lengths, dtype=torch.long)
+        if lengths.dim() not in (1, 2):
+            raise ValueError('lengths should be a 1-D or 2-D tensor, got a {}-D tensor'.format(lengths.dim()))
+        if batch_size <= 0:
+            raise ValueError('batch_size should be a positive integer, got {}'.format(batch_size))
+        if pool_size is None:
+            pool_size = 100 * batch_size
+        if pool_size <= 0:
+            raise ValueError('pool_size should be a positive integer, got {}'.format(pool_size))
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.num_replicas, self.rank = _get_replicas(num_replicas, rank)
+        self.seed = seed
+        self.epoch = 0
+        self._keys = _sort_keys(lengths)
+
+    def set_epoch(self, epoch):
+        r"""Set the epoch, which seeds the shuffling with the seed of the sampler."""
+        self.epoch = epoch
+
+    def _generator(self):
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        return generator
+
+    def _batches(self):
+        generator = self._generator()
+        num_items = self._keys.numel()
+        if self.shuffle:
+            indices = torch.randperm(num_items, generator=generator)
+        else:
+            indices = torch.arange(num_items)
+        batches = list(_pool_sort(indices, self._keys, self.pool_size).split(self.batch_size))
+        if self.drop_last and batches and batches[-1].numel() < self.batch_size:
+            batches.pop()
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches), generator=generator).tolist()]
+        return _shard_batches(batches, self.num_replicas, self.rank)
+
+    def __iter__(self):
+        for batch in self._batches():
+            yield batch.tolist()
+
+    def __len__(self):
+        num_items = self._keys.numel()
+        if self.drop_last:
+            num_batches = num_items // self.batch_size
+        else:
+            num_batches = -(-num_items // self.batch_size)
+        return -(-num_batches // self.num_replicas)
+
+
+def _pack_tokens(lengths, max_tokens, max_batch_size):
+    r"""Greedily cut the sorted `lengths` (a 2-D tensor of one row per item) into consecutive batches whose
+    padded size, the batch size times the longest item of the batch, fits in `max_tokens` for every column.
+    An item longer than `max_tokens` makes a batch of its own.
+
+    Returns:
+        list: the sizes of the batches.
+    """
+    num_items = lengths.size(0)
+    window = min(num_items, max_batch_size)
+    counts = torch.arange(1, window + 1, dtype=torch.long).unsqueeze(1)
+    sizes = []
+    start = 0
+    while start < num_items:
+        chunk = lengths[start:start + window]
+        longest = torch.cummax(chunk, dim=0)[0]
+        # the padded size grows with every item, so the items that fit make a prefix of the chunk
+        fits = (counts[:chunk.size(0)] * longest <= max_tokens).all(dim=1)
+        size = max(int(fits.sum().item()), 1)
+        sizes.append(size)
+        start += size
+    return sizes
+
+
+class TokenBatchSampler(BucketBatchSampler):
+    r"""Batch sampler forming batches of a budget of tokens instead of a number of items.
+
+    The padded size of a batch, the number of items times the length of the longest item, stays under
+    `max_tokens`. With 2-D lengths (e.g. the source and target lengths of a translation dataset), every
+    column is padded and budgeted separately. As with `BucketBatchSampler`, the items are sorted by length
+    within pools of `pool_size` items, cut into batches and the batches are shuffled. The batches are cut
+    greedily, with one tensor operation per batch.
+
+    The batches only depend on the seed and the epoch, so training can resume in the middle of an epoch
+    with `set_epoch(epoch, start)`.
+
+    Args:
+        lengths: the lengths of the items, a 1-D tensor or a 2-D tensor of one row per item.
+            See `lengths_from_dataset`, or `TokenIdStore.lengths`.
+        max_tokens (int or tuple): the number of padded tokens of a batch, or one number per column of
+            2-D lengths. An item longer than `max_tokens` makes a batch of its own.
+        max_batch_size (int): the maximum number of items of a batch. Default: no limit.
+        pool_size (int): the number of items sorted together. Default: 100 * max_tokens / the mean length.
+        shuffle (bool): whether to shuffle the items and the batches. Default: True
+        num_replicas (int): the number of distributed processes. Default: the world size.
+        rank (int): the rank of the current process. Default: the current rank.
+        seed (int): the random seed, which must be the same on every rank. Default: 0
+
+    Examples:
+        >>> from torch.utils.data import DataLoader
+        >>> from torchtext.experimental.datasets import Multi30k
+        >>> from torchtext.experimental.samplers import TokenBatchSampler, lengths_from_dataset
+        >>> train_dataset, valid_dataset, test_dataset = Multi30k()
+        >>> lengths = lengths_from_dataset(train_dataset, lambda item: (len(item[0]), len(item[1])))
+        >>> sampler = TokenBatchSampler(lengths, max_tokens=4096)
+        >>> dataloader = DataLoader(train_dataset, batch_sampler=sampler, collate_fn=generate_batch)
+        >>> for epoch in range(num_epochs):
+        >>>     sampler.set_epoch(epoch)
+        >>>     for batch in dataloader:
+        >>>         ...
+    """
+
+    def __init__(self, lengths, max_tokens, max_batch_size=None, pool_size=None, shuffle=True,
+                 num_replicas=None, rank=None, seed=0):
+        # the default batch and pool sizes depend on max_tokens and the lengths validated by
+        # BucketBatchSampler, they are set once these are known
+        super(TokenBatchSampler, self).__init__(lengths, 1 if max_batch_size is None else max_batch_size,
+                                                pool_size=1 if pool_size is None else pool_size, shuffle=shuffle,
+                                                num_replicas=num_replicas, rank=rank, seed=seed)
+        columns = self.lengths.view(self.lengths.size(0), -1)
+        max_tokens = torch.tensor(max_tokens, dtype=torch.long)
+        if max_tokens.dim() > 0 and max_tokens.numel() != columns.size(1):
+            raise ValueError('max_tokens should be an integer or hold one integer per column of lengths, '
+                             'got {} for {} columns'.format(max_tokens.tolist(), columns.size(1)))
+        max_tokens = max_tokens.expand(columns.size(1))
+        if (max_tokens <= 0).any():
+            raise ValueError('max_tokens should be positive, got {}'.format(max_tokens.tolist()))
+        if max_batch_size is None:
+            self.batch_size = max(int(max_tokens.max().item()), 1)
+        if pool_size is None:
+            mean_length = max(columns[:, 0].float().mean().item(), 1.0) if columns.size(0) else 1.0
+            self.pool_size = max(int(100 * max_tokens[0].item() / mean_length), 1)
+        self.max_tokens = max_tokens
+        self.max_batch_size = self.batch_size
+        self.start = 0
+        self._columns = columns
+        self._cache = None
+
+    def set_epoch(self, epoch, start=0):
+        r"""Set the epoch, which seeds the shuffling with the seed of the sampler, and the number of
+        batches of the epoch already seen by the current rank, which are skipped.
+        """
+        self.epoch = epoch
+        self.start = start
+
+    def _batches(self):
+        if self._cache is not None and self._cache[0] == self.epoch:
+            return self._cache[1]
+        generator = self._generator()
+        num_items = self._keys.numel()
+        if self.shuffle:
+            indices = torch.randperm(num_items, generator=generator)
+        else:
+            indices = torch.arange(num_items)
+        indices = _pool_sort(indices, self._keys, self.pool_size)
+        batches = []
+        for pool in indices.split(self.pool_size):
+            sizes = _pack_tokens(self._columns[pool], self.max_tokens, self.max_batch_size)
+            batches.extend(pool.split(sizes))
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches), generator=generator).tolist()]
+        batches = _shard_batches(batches, self.num_replicas, self.rank)
+        self._cache = (self.epoch, batches)
+        return batches
+
+    def __iter__(self):
+        for batch in self._batches()[self.start:]:
+            yield batch.tolist()
+
+    def __len__(self):
+        return max(len(self._batches()) - self.start, 0)
@@ -1,13 +1,23 @@
 import torch
 import torch.nn as nn
-from typing import List
-from torchtext._torchtext import RegexTokenizer as RegexTokenizerPybind
+from typing import Dict, List, Optional, Tuple
+from torchtext._torchtext import (
+    BPETokenizer as BPETokenizerPybind,
+    RegexTokenizer as RegexTokenizerPybind,
+    TokenizerCache as TokenizerCachePybind,
+    WordPieceTokenizer as WordPieceTokenizerPybind
+)
 from collections import OrderedDict
 from torch import Tensor
 
 __all__ = [
     'BasicEnglishNormalize',
-    'RegexTokenizer'
+    'RegexTokenizer',
+    'WordPieceTokenizer',
+    'BPETokenizer',
+    'CachedTokenizer',
+    'TokenizeAndLookup',
+    'HashedNGrams'
 ]
 
 
@@ -80,6 +90,66 @@ def regex_tokenizer(patterns_list):
     return RegexTokenizer(RegexTokenizerPybind(patterns, replacements, False))
 
 
+def wordpiece_tokenizer(vocab, to_lower=True, max_input_chars_per_word=100):
+    r"""WordPiece tokenizer, as used by BERT.
+
+    Lines are lowercased (if `to_lower`) and split on whitespace and punctuation. Then every word is
+    split into the longest pieces found in the vocab, from left to right, pieces other than the
+    first one of a word being prefixed by '##'. Words which cannot be split this way, or longer
+    than `max_input_chars_per_word` characters, are replaced by the unknown token of the vocab.
+
+    Args:
+        vocab: an instance of torchtext.experimental.vocab.Vocab class holding the WordPiece vocab.
+        to_lower (bool): lowercase the ASCII characters of the lines. Default: True.
+        max_input_chars_per_word (int): the maximum number of characters of a word. Default: 100.
+
+    Note:
+        The basic tokenization only handles ASCII whitespace and punctuation, and does not strip accents.
+
+    Examples:
+        >>> import torch
+        >>> from torchtext.experimental.transforms import wordpiece_tokenizer
+        >>> from torchtext.experimental.vocab import vocab_from_file
+        >>> f = open('bert_vocab.txt', 'r')
+        >>> tokenizer = wordpiece_tokenizer(vocab_from_file(f, unk_token='[UNK]'))
+        >>> jit_tokenizer = torch.jit.script(tokenizer.to_ivalue())
+        >>> tokens = jit_tokenizer(['Unaffable weather'])
+        >>> ids, offsets = jit_tokenizer.forward_ids(['Unaffable weather'])
+    """
+    cpp_vocab = vocab.vocab
+    return WordPieceTokenizer(WordPieceTokenizerPybind(cpp_vocab.itos_, cpp_vocab.unk_token_, to_lower,
+                                                       max_input_chars_per_word))
+
+
+def bpe_tokenizer(merges_file_object, vocab, cache_max_bytes=2 ** 24):
+    r"""Byte-pair-encoding tokenizer applying the merges of a subword-nmt / fairseq merges (codes) file.
+
+    Lines are split on whitespace. Every word is split into characters, the last one marked with
+    '</w>', and the merges are applied by priority (their order in the file) until none applies.
+    The resulting pieces other than the last one of a word are suffixed with '@@'. The pieces of
+    words already seen are kept in a cache bounded to `cache_max_bytes`.
+
+    Args:
+        merges_file_object (FileObject): a file object holding one merge (two space separated symbols)
+            per line.
+        vocab: an instance of torchtext.experimental.vocab.Vocab class holding the BPE vocab.
+        cache_max_bytes (int): the approximate maximum memory used by the cache of tokenized words,
+            0 to disable it. Default: 16 MB.
+
+    Examples:
+        >>> import torch
+        >>> from torchtext.experimental.transforms import bpe_tokenizer
+        >>> from torchtext.experimental.vocab import vocab_from_file
+        >>> tokenizer = bpe_tokenizer(open('codes.txt', 'r'), vocab_from_file(open('dict.txt', 'r')))
+        >>> jit_tokenizer = torch.jit.script(tokenizer.to_ivalue())
+        >>> tokens = jit_tokenizer(['the lowest newer'])
+        >>> ids, offsets = jit_tokenizer.forward_ids(['the lowest newer'])
+    """
+    merges = [line.rstrip('\r\n') for line in merges_file_object]
+    cpp_vocab = vocab.vocab
+    return BPETokenizer(BPETokenizerPybind(merges, cpp_vocab.itos_, cpp_vocab.unk_token_, cache_max_bytes))
+
+
 class BasicEnglishNormalize(nn.Module):
     r"""Basic normalization for a string sentence.
 
@@ -101,11 +171,26 @@ class BasicEnglishNormalize(nn.Module):
 
         Returns:
             List[List[str]]: a list of token list after normalizing and splitting on whitespace.
+
+        Note:
+            The lines are tokenized in parallel with the intra-op thread pool (see `torch.set_num_threads`).
         """
-        tokens: List[List[str]] = []
+        return self.regex_tokenizer.forward_batch(lines)
+
+    @torch.jit.export
+    def forward_with_offsets(self, lines: List[str]) -> List[Tuple[List[str], List[int], List[int]]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[Tuple[List[str], List[int], List[int]]]: for each line, the token list together with the start
+                and end character offsets of every token in the line.
+        """
+        tokens_offsets: List[Tuple[List[str], List[int], List[int]]] = []
         for line in lines:
-            tokens.append(self.regex_tokenizer.forward(line))
-        return tokens
+            tokens_offsets.append(self.regex_tokenizer.forward_with_offsets(line))
+        return tokens_offsets
 
     def to_ivalue(self):
         r"""Return a JITable BasicEnglishNormalize.
@@ -135,11 +220,26 @@ class RegexTokenizer(nn.Module):
 
         Returns:
             List[List[str]]: a list of token list after normalizing and splitting on whitespace.
+
+        Note:
+            The lines are tokenized in parallel with the intra-op thread pool (see `torch.set_num_threads`).
+        """
+        return self.regex_tokenizer.forward_batch(lines)
+
+    @torch.jit.export
+    def forward_with_offsets(self, lines: List[str]) -> List[Tuple[List[str], List[int], List[int]]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[Tuple[List[str], List[int], List[int]]]: for each line, the token list together with the start
+                and end character offsets of every token in the line.
         """
-        tokens: List[List[str]] = []
+        tokens_offsets: List[Tuple[List[str], List[int], List[int]]] = []
         for line in lines:
-            tokens.append(self.regex_tokenizer.forward(line))
-        return tokens
+            tokens_offsets.append(self.regex_tokenizer.forward_with_offsets(line))
+        return tokens_offsets
 
     def to_ivalue(self):
         r"""Return a JITable RegexTokenizer.
@@ -148,6 +248,310 @@ class RegexTokenizer(nn.Module):
         return RegexTokenizer(regex_tokenizer)
 
 
+class WordPieceTokenizer(nn.Module):
+    r"""WordPiece tokenizer for a string sentence.
+
+    Args:
+        wordpiece_tokenizer (torch.classes.torchtext.WordPieceTokenizer or torchtext._torchtext.WordPieceTokenizer):
+            a cpp WordPiece tokenizer object.
+    """
+    def __init__(self, wordpiece_tokenizer):
+        super(WordPieceTokenizer, self).__init__()
+        self.wordpiece_tokenizer = wordpiece_tokenizer
+
+    @property
+    def is_jitable(self):
+        return not isinstance(self.wordpiece_tokenizer, WordPieceTokenizerPybind)
+
+    def forward(self, lines: List[str]) -> List[List[str]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[List[str]]: a list of WordPiece token list.
+
+        Note:
+            The lines are tokenized in parallel with the intra-op thread pool (see `torch.set_num_threads`).
+        """
+        return self.wordpiece_tokenizer.forward_batch(lines)
+
+    @torch.jit.export
+    def forward_with_offsets(self, lines: List[str]) -> List[Tuple[List[str], List[int], List[int]]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[Tuple[List[str], List[int], List[int]]]: for each line, the token list together with
+                the start and end character offsets of every token in the line.
+        """
+        tokens_offsets: List[Tuple[List[str], List[int], List[int]]] = []
+        for line in lines:
+            tokens_offsets.append(self.wordpiece_tokenizer.forward_with_offsets(line))
+        return tokens_offsets
+
+    @torch.jit.export
+    def forward_ids(self, lines: List[str]) -> Tuple[Tensor, Tensor]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            Tuple[Tensor, Tensor]: the vocab ids of the tokens of all the lines concatenated, and the
+                offset of the first id of every line.
+        """
+        return self.wordpiece_tokenizer.forward_ids(lines)
+
+    def to_ivalue(self):
+        r"""Return a JITable WordPieceTokenizer.
+        """
+        wordpiece_tokenizer = torch.classes.torchtext.WordPieceTokenizer(
+            self.wordpiece_tokenizer.itos_, self.wordpiece_tokenizer.unk_token_,
+            self.wordpiece_tokenizer.to_lower_, self.wordpiece_tokenizer.max_input_chars_per_word_)
+        return WordPieceTokenizer(wordpiece_tokenizer)
+
+
+class BPETokenizer(nn.Module):
+    r"""Byte-pair-encoding tokenizer for a string sentence.
+
+    Args:
+        bpe_tokenizer (torch.classes.torchtext.BPETokenizer or torchtext._torchtext.BPETokenizer):
+            a cpp BPE tokenizer object.
+    """
+    def __init__(self, bpe_tokenizer):
+        super(BPETokenizer, self).__init__()
+        self.bpe_tokenizer = bpe_tokenizer
+
+    @property
+    def is_jitable(self):
+        return not isinstance(self.bpe_tokenizer, BPETokenizerPybind)
+
+    def forward(self, lines: List[str]) -> List[List[str]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[List[str]]: a list of BPE token list.
+
+        Note:
+            The lines are tokenized in parallel with the intra-op thread pool (see `torch.set_num_threads`).
+        """
+        return self.bpe_tokenizer.forward_batch(lines)
+
+    @torch.jit.export
+    def forward_ids(self, lines: List[str]) -> Tuple[Tensor, Tensor]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            Tuple[Tensor, Tensor]: the vocab ids of the tokens of all the lines concatenated, and the
+                offset of the first id of every line.
+        """
+        return self.bpe_tokenizer.forward_ids(lines)
+
+    def to_ivalue(self):
+        r"""Return a JITable BPETokenizer.
+        """
+        bpe_tokenizer = torch.classes.torchtext.BPETokenizer(
+            self.bpe_tokenizer.merges_, self.bpe_tokenizer.itos_, self.bpe_tokenizer.unk_token_,
+            self.bpe_tokenizer.cache_max_bytes())
+        return BPETokenizer(bpe_tokenizer)
+
+
+class _LineTokenizer(nn.Module):
+    r"""Applies a tokenizer taking a single string (e.g. the output of `get_tokenizer`) to a list of lines.
+    """
+    def __init__(self, tokenizer):
+        super(_LineTokenizer, self).__init__()
+        self.tokenizer = tokenizer
+
+    def forward(self, lines: List[str]) -> List[List[str]]:
+        return [self.tokenizer(line) for line in lines]
+
+
+class CachedTokenizer(nn.Module):
+    r"""Memoizes the output of a tokenizer in a thread-safe LRU cache bounded by memory size.
+
+    Args:
+        tokenizer: a tokenizer module taking a list of lines (e.g. BasicEnglishNormalize or RegexTokenizer),
+            or a callable taking a single string (e.g. the output of `get_tokenizer` or
+            `SentencePiece.EncodeAsPieces`). Only the former can be scripted.
+        max_bytes (int): the approximate memory budget of the cached inputs and tokens. Default: 64MB.
+        cache (torch.classes.torchtext.TokenizerCache or torchtext._torchtext.TokenizerCache): a cpp
+            cache object, can be shared between tokenizers producing the same tokens. Default: None.
+
+    Example:
+        >>> import torch
+        >>> from torchtext.experimental.transforms import basic_english_normalize, CachedTokenizer
+        >>> cached_tokenizer = CachedTokenizer(basic_english_normalize())
+        >>> tokens = cached_tokenizer(['the same line', 'the same line'])
+        >>> cached_tokenizer.cache_info()
+            {'hits': 1, 'misses': 1, 'entries': 1, 'bytes': 217, 'max_bytes': 67108864}
+        >>> jit_cached_tokenizer = torch.jit.script(cached_tokenizer.to_ivalue())
+    """
+    def __init__(self, tokenizer, max_bytes: int = 64 * 1024 * 1024, cache=None):
+        super(CachedTokenizer, self).__init__()
+        if not isinstance(tokenizer, nn.Module):
+            tokenizer = _LineTokenizer(tokenizer)
+        self.tokenizer = tokenizer
+        if cache is None:
+            cache = TokenizerCachePybind(max_bytes)
+        self.cache = cache
+        self.max_bytes = max_bytes
+
+    @property
+    def is_jitable(self):
+        return not isinstance(self.cache, TokenizerCachePybind)
+
+    def forward(self, lines: List[str]) -> List[List[str]]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            List[List[str]]: a list of token list. Lines missing from the cache are tokenized in a single
+                call to the wrapped tokenizer.
+        """
+        tokens: List[Optional[List[str]]] = []
+        missing_lines: List[str] = []
+        for line in lines:
+            cached_tokens = self.cache.get(line)
+            if cached_tokens is None:
+                missing_lines.append(line)
+            tokens.append(cached_tokens)
+
+        missing_tokens: List[List[str]] = []
+        if len(missing_lines) > 0:
+            missing_tokens = self.tokenizer(missing_lines)
+
+        results: List[List[str]] = []
+        missing_idx = 0
+        for idx in range(len(tokens)):
+            line_tokens = tokens[idx]
+            if line_tokens is None:
+                new_tokens = missing_tokens[missing_idx]
+                self.cache.put(lines[idx], new_tokens)
+                results.append(new_tokens)
+                missing_idx += 1
+            else:
+                results.append(line_tokens)
+        return results
+
+    @torch.jit.export
+    def cache_info(self) -> Dict[str, int]:
+        r"""
+        Returns:
+            Dict[str, int]: the number of cache hits and misses, the number of cached entries and their
+                approximate size in bytes, and the size limit of the cache.
+        """
+        return {'hits': self.cache.hits(), 'misses': self.cache.misses(), 'entries': len(self.cache),
+                'bytes': self.cache.num_bytes(), 'max_bytes': self.max_bytes}
+
+    @torch.jit.export
+    def cache_clear(self) -> None:
+        r"""Empty the cache and reset its statistics.
+        """
+        self.cache.clear()
+
+    def to_ivalue(self):
+        r"""Return a JITable CachedTokenizer with an empty cache.
+        """
+        tokenizer = self.tokenizer
+        if hasattr(tokenizer, 'to_ivalue'):
+            tokenizer = tokenizer.to_ivalue()
+        cache = torch.classes.torchtext.TokenizerCache(self.max_bytes)
+        return CachedTokenizer(tokenizer, self.max_bytes, cache)
+
+
+class TokenizeAndLookup(nn.Module):
+    r"""Tokenizes lines with a regex tokenizer and looks the tokens up in a vocab in a single native
+    call, without creating the intermediate token strings.
+
+    Args:
+        tokenizer: a BasicEnglishNormalize or RegexTokenizer module.
+        vocab: an instance of torchtext.experimental.vocab.Vocab class.
+
+    Example:
+        >>> import torch
+        >>> from torchtext.experimental.transforms import basic_english_normalize, TokenizeAndLookup
+        >>> from torchtext.experimental.vocab import vocab_from_file
+        >>> f = open('vocab.txt', 'r')
+        >>> tokenize_and_lookup = TokenizeAndLookup(basic_english_normalize(), vocab_from_file(f))
+        >>> jit_tokenize_and_lookup = torch.jit.script(tokenize_and_lookup.to_ivalue())
+        >>> ids, offsets = jit_tokenize_and_lookup(['here is an example', 'and another one'])
+    """
+
+    def __init__(self, tokenizer, vocab):
+        super(TokenizeAndLookup, self).__init__()
+        self.tokenizer = tokenizer
+        self.vocab = vocab
+
+    @property
+    def is_jitable(self):
+        return self.tokenizer.is_jitable and self.vocab.is_jitable
+
+    def forward(self, lines: List[str]) -> Tuple[Tensor, Tensor]:
+        r"""
+        Args:
+            lines (List[str]): a list of text to tokenize.
+
+        Returns:
+            Tuple[Tensor, Tensor]: the ids of the tokens of all the lines concatenated, and the offset
+                of the first id of every line, as expected by `torch.nn.EmbeddingBag`.
+
+        Note:
+            The lines are processed in parallel with the intra-op thread pool (see `torch.set_num_threads`).
+        """
+        return self.tokenizer.regex_tokenizer.forward_ids(lines, self.vocab.vocab)
+
+    def to_ivalue(self):
+        r"""Return a JITable TokenizeAndLookup.
+        """
+        return TokenizeAndLookup(self.tokenizer.to_ivalue(), self.vocab.to_ivalue())
+
+
+class HashedNGrams(nn.Module):
+    r"""Adds the ids of the n-grams of every line after its token ids, the way fastText does. The
+    n-grams are hashed natively into `num_buckets` buckets whose ids start at `bucket_offset`, so that
+    no n-gram vocab is needed.
+
+    Args:
+        ngrams (int): the maximum size of the n-grams.
+        num_buckets (int): the number of buckets the n-grams are hashed into.
+        bucket_offset (int): the id of the first bucket, usually the size of the vocab.
+
+    Example:
+        >>> import torch
+        >>> from torchtext.experimental.transforms import HashedNGrams
+        >>> hashed_ngrams = HashedNGrams(2, num_buckets=2000000, bucket_offset=len(vocab))
+        >>> ids, offsets = tokenize_and_lookup(['here is an example', 'and another one'])
+        >>> features, offsets = hashed_ngrams(ids, offsets)
+        >>> embedding_bag = torch.nn.EmbeddingBag(len(vocab) + 2000000, 64)
+        >>> embeddings = embedding_bag(features, offsets)
+    """
+
+    def __init__(self, ngrams: int, num_buckets: int, bucket_offset: int):
+        super(HashedNGrams, self).__init__()
+        self.ngrams = ngrams
+        self.num_buckets = num_buckets
+        self.bucket_offset = bucket_offset
+
+    def forward(self, ids: Tensor, offsets: Tensor) -> Tuple[Tensor, Tensor]:
+        r"""
+        Args:
+            ids (Tensor): the token ids of all the lines concatenated.
+            offsets (Tensor): the offset of the first id of every line.
+
+        Returns:
+            Tuple[Tensor, Tensor]: the features of all the lines concatenated and the offset of the
+                first feature of every line, as expected by `torch.nn.EmbeddingBag`.
+        """
+        return torch.ops.torchtext.hashed_ngrams(ids, offsets, self.ngrams, self.num_buckets, self.bucket_offset)
+
+
 class TextSequentialTransforms(nn.Sequential):
     r"""A container to host a sequential text transforms.
 
@@ -163,6 +567,22 @@ class TextSequentialTransforms(nn.Sequential):
             input = module(input)
         return input
 
+    def profile(self, profiler):
+        r"""Return a copy of the pipeline recording the statistics of every stage in `profiler`.
+
+        Args:
+            profiler (torchtext.experimental.profiler.StageProfiler): the profiler recording the stages.
+
+        Note:
+            The copy shares the stages of the pipeline and is eager only. Its `to_ivalue` returns
+            the JITable pipeline without instrumentation.
+        """
+        module_list = []
+        for _idx, _module in enumerate(self):
+            name = '{}:{}'.format(_idx, type(_module).__name__)
+            module_list.append((str(_idx), _ProfiledStage(_module, name, profiler)))
+        return TextSequentialTransforms(OrderedDict(module_list))
+
     def to_ivalue(self):
         r"""Return a JITable TextSequentialTransforms.
         """
@@ -174,6 +594,24 @@ class TextSequentialTransforms(nn.Sequential):
         return TextSequentialTransforms(OrderedDict(module_list))
 
 
+class _ProfiledStage(nn.Module):
+    r"""Records the calls of a pipeline stage in a `StageProfiler`.
+    """
+    def __init__(self, module, name, profiler):
+        super(_ProfiledStage, self).__init__()
+        self.module = module
+        self.name = name
+        self.profiler = profiler
+
+    def forward(self, input):
+        return self.profiler.record(self.name, self.module, input)
+
+    def to_ivalue(self):
+        if hasattr(self.module, 'to_ivalue'):
+            return self.module.to_ivalue()
+        return self.module
+
+
 class VocabTransform(nn.Module):
     r"""Vocab transform
 
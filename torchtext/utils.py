@@ -1,5 +1,6 @@
 import requests
 import csv
+import functools
 import hashlib
 from tqdm import tqdm
 import os
@@ -9,6 +10,12 @@ import re
 import sys
 import zipfile
 import gzip
+import pickle
+import shutil
+import types
+
+import numpy
+import torch
 
 
 def reporthook(t):
@@ -272,3 +279,153 @@ def validate_file(file_obj, hash_value, hash_type="sha256"):
             break
         hash_func.update(chunk)
     return hash_func.hexdigest() == hash_value
+
+
+def _file_signature(path):
+    """Return the name, size and modification time of a file, which identify its
+    content in dataset cache keys without reading the whole file."""
+    stat = os.stat(path)
+    return os.path.basename(path), stat.st_size, stat.st_mtime
+
+
+# The version of the layout of the processed data in the dataset cache, part of the cache keys
+_DATASET_CACHE_FORMAT = 1
+# Tokenizers pickled to more bytes than this (e.g. holding a whole model) are not identified, pickling
+# them for every cache key would cost more than it saves
+_TOKENIZER_KEY_MAX_PICKLE_BYTES = 1024 ** 2
+
+
+def _code_constant_key(constant):
+    """Return a deterministic representation of a constant of a code object, and of the code of nested
+    functions."""
+    if isinstance(constant, types.CodeType):
+        return (constant.co_code, constant.co_names, tuple(_code_constant_key(c) for c in constant.co_consts))
+    if isinstance(constant, tuple):
+        return tuple(_code_constant_key(c) for c in constant)
+    if isinstance(constant, frozenset):
+        # the iteration order of sets of strings changes from one process to the other
+        return tuple(sorted(repr(_code_constant_key(c)) for c in constant))
+    return constant
+
+
+def _is_plain_value(value):
+    if isinstance(value, (tuple, list)):
+        return all(_is_plain_value(v) for v in value)
+    return value is None or isinstance(value, (bool, int, float, str, bytes))
+
+
+def _tokenizer_key(tokenizer):
+    """Return a string identifying a tokenizer in dataset cache keys, or None if
+    the tokenizer cannot be identified.
+
+    Functions are identified by their qualified name and the hash of their code,
+    partial functions by the key of their function and their arguments, other
+    tokenizers by the hash of their pickled state.
+    """
+    if isinstance(tokenizer, functools.partial):
+        func_key = _tokenizer_key(tokenizer.func)
+        # the arguments of e.g. get_tokenizer('spacy') hold a whole pipeline
+        arguments = (tokenizer.args, sorted(tokenizer.keywords.items()))
+        if func_key is None or not _is_plain_value(arguments):
+            return None
+        return '{}{!r}'.format(func_key, arguments)
+    if isinstance(tokenizer, (types.FunctionType, types.BuiltinFunctionType)):
+        name = '{}.{}'.format(tokenizer.__module__, tokenizer.__qualname__)
+        # lambdas and nested functions do not have a unique name
+        if '<' in name:
+            return None
+        if isinstance(tokenizer, types.BuiltinFunctionType):
+            return name
+        code_key = repr(_code_constant_key(tokenizer.__code__)).encode('utf-8')
+        return '{}:{}'.format(name, hashlib.sha256(code_key).hexdigest())
+    try:
+        state = pickle.dumps(tokenizer)
+    except Exception:
+        return None
+    if len(state) > _TOKENIZER_KEY_MAX_PICKLE_BYTES:
+        return None
+    return hashlib.sha256(state).hexdigest()
+
+
+def _vocab_key(vocab):
+    """Return a string identifying the tokens of a vocab in dataset cache keys."""
+    itos = vocab.get_itos() if hasattr(vocab, 'get_itos') else vocab.itos
+    return hashlib.sha256('\n'.join(itos).encode('utf-8')).hexdigest()
+
+
+def _dataset_cache_key(dataset_name, files, **config):
+    """Return the key of the processed data of a dataset in the dataset cache.
+
+    Arguments:
+        dataset_name: the name of the dataset.
+        files: the paths of the raw files the data is processed from.
+        config: the processing parameters (e.g. the tokenizer key, ngrams, the
+            vocab key). The key is None if a parameter is None, the data is then
+            not cached.
+
+    The key also holds the torchtext version and the cache format, the data
+    processed by other versions is not reused.
+    """
+    if any(value is None for value in config.values()):
+        return None
+    import torchtext
+    description = repr((_DATASET_CACHE_FORMAT, getattr(torchtext, '__version__', None), dataset_name,
+                        [_file_signature(f) for f in files], sorted(config.items())))
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+def _dataset_cache_dir(root, key):
+    return os.path.join(root, 'processed', key)
+
+
+def _save_to_dataset_cache(root, key, tensors, vocab):
+    """Save tensors as .npy files, which are memory mapped when loaded, and a
+    vocab in the dataset cache."""
+    cache_dir = _dataset_cache_dir(root, key)
+    tmp_dir = '{}.{}.tmp'.format(cache_dir, os.getpid())
+    try:
+        os.makedirs(tmp_dir)
+        for name, tensor in tensors.items():
+            numpy.save(os.path.join(tmp_dir, name + '.npy'), tensor.numpy())
+        torch.save(vocab, os.path.join(tmp_dir, 'vocab.pt'))
+        os.rename(tmp_dir, cache_dir)
+    except OSError as e:
+        logging.warning('Could not cache the processed dataset in {}: {}'.format(cache_dir, e))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_npy(path):
+    try:
+        return numpy.load(path, mmap_mode='c')
+    except ValueError:
+        # empty arrays cannot be memory mapped
+        return numpy.load(path)
+
+
+def _load_from_dataset_cache(root, key, names):
+    """Return the tensors and the vocab saved in the dataset cache under key, or
+    None if they are not in the cache. The tensors are memory mapped copy-on-write."""
+    cache_dir = _dataset_cache_dir(root, key)
+    if not os.path.isdir(cache_dir):
+        return None
+    tensors = {name: torch.from_numpy(_load_npy(os.path.join(cache_dir, name + '.npy'))) for name in names}
+    vocab = torch.load(os.path.join(cache_dir, 'vocab.pt'))
+    logging.info('Loaded the processed dataset from {}'.format(cache_dir))
+    return tensors, vocab
+
+
+def clear_dataset_cache(root='.data'):
+    """Delete the processed datasets cached in a root directory.
+
+    The datasets which process their raw files (e.g. ``torchtext.datasets.AG_NEWS``)
+    cache the result in ``root/processed``, keyed by the raw files and the processing
+    parameters, and reload it on the next call with the same parameters. Changing the
+    raw files invalidates their cached data, this function invalidates all of it.
+
+    Arguments:
+        root: the directory where the datasets are saved. Default: ".data"
+
+    Examples:
+        >>> torchtext.utils.clear_dataset_cache()
+    """
+    shutil.rmtree(os.path.join(root, 'processed'), ignore_errors=True)